@@ -0,0 +1,92 @@
+"""
+Benchmark: linear-scan vs keyed-set duplicate detection while collecting links.
+
+The legacy check compared every candidate against every collected link,
+so collection time grows quadratically. The keyed set on
+(sheet, cell, target_file) should stay flat per link as the count grows.
+
+Usage:
+    python benchmarks/bench_link_dedup.py [legacy_max]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.formula_scanner import cell_address
+from models.external_link import ExternalLink
+
+
+SIZES = (1000, 10000, 100000, 1000000)
+
+
+def build_candidates(count):
+    """Build link candidates where every tenth one repeats an earlier link."""
+    candidates = []
+    for i in range(count):
+        n = i - 5 if i % 10 == 9 else i
+        candidates.append(ExternalLink(
+            source_workbook="Model.xlsx",
+            source_sheet=f"Sheet{n % 7 + 1}",
+            source_cell=cell_address(n // 7 + 1, 3),
+            target_file=f"Source{n % 13}.xlsx",
+            formula="='C:\\Data\\[Source.xlsx]Input'!A1",
+            link_type="Formula"
+        ))
+    return candidates
+
+
+def legacy_collect(candidates):
+    """Original _is_duplicate_link loop over the collected list."""
+    links = []
+    for candidate in candidates:
+        duplicate = False
+        for link in links:
+            if (link.source_sheet == candidate.source_sheet and
+                    link.source_cell == candidate.source_cell and
+                    link.target_file == candidate.target_file):
+                duplicate = True
+                break
+        if not duplicate:
+            links.append(candidate)
+    return links
+
+
+def keyed_collect(candidates):
+    """Keyed set as used by ExternalLinksManager._scan_workbook."""
+    links = []
+    seen_keys = set()
+    for candidate in candidates:
+        if candidate.key not in seen_keys:
+            seen_keys.add(candidate.key)
+            links.append(candidate)
+    return links
+
+
+def run(legacy_max=10000):
+    print(f"{'links':>10}  {'strategy':<12} {'kept':>10}  {'time':>10}  {'per link':>10}")
+    print("-" * 60)
+    for size in SIZES:
+        candidates = build_candidates(size)
+        strategies = [("keyed set", keyed_collect)]
+        if size <= legacy_max:
+            strategies.insert(0, ("linear scan", legacy_collect))
+        kept = {}
+        for label, func in strategies:
+            t0 = time.perf_counter()
+            links = func(candidates)
+            elapsed = time.perf_counter() - t0
+            kept[label] = links
+            print(f"{size:>10,}  {label:<12} {len(links):>10,}  {elapsed:>9.3f}s  "
+                  f"{elapsed / size * 1e6:>8.2f}us")
+        if len(kept) > 1:
+            assert kept["linear scan"] == kept["keyed set"], "strategies disagree"
+        else:
+            print(f"{'':>10}  linear scan skipped (above legacy_max={legacy_max:,})")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
@@ -0,0 +1,103 @@
+"""
+Benchmark: workbook link graph build and query times.
+
+Builds synthetic layered workbook graphs (each workbook links to a few
+files in earlier layers, plus a handful of deliberate cycles) and reports
+build, cycle detection, topological order, reverse lookup and transitive
+closure times. The reverse lookup is compared with rescanning every edge.
+
+Usage:
+    python benchmarks/bench_link_graph.py [max_files]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.link_graph import WorkbookLinkGraph
+
+
+SIZES = (1000, 10000, 50000)
+LINKS_PER_WORKBOOK = 4
+LAYERS = 12
+CYCLES = 5
+QUERIES = 200
+
+
+def build_edges(count, seed=11):
+    """Layered random edges, workbook -> source, with a few back edges."""
+    rng = random.Random(seed)
+    names = [f"\\\\fileserver\\finance\\Layer {i * LAYERS // count:02d}\\Book {i:06d}.xlsx"
+             for i in range(count)]
+    layer_size = max(1, count // LAYERS)
+    edges = []
+    for i in range(layer_size, count):
+        for _ in range(LINKS_PER_WORKBOOK):
+            edges.append((names[i], names[rng.randrange(0, i - i % layer_size)]))
+    for _ in range(CYCLES):
+        upstream = rng.randrange(0, layer_size)
+        edges.append((names[upstream], names[rng.randrange(count - layer_size, count)]))
+    return names, edges
+
+
+def timed(func, repeat=1):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def rescan_dependents(edges, name):
+    """What a change-impact question costs without the reverse index."""
+    key = name.casefold()
+    return sorted({workbook for workbook, source in edges if source.casefold() == key}, key=str.casefold)
+
+
+def build_graph(edges):
+    graph = WorkbookLinkGraph()
+    for workbook, source in edges:
+        graph.add_link(workbook, source)
+    return graph
+
+
+def run(max_files=50000):
+    for size in [s for s in SIZES if s <= max_files]:
+        names, edges = build_edges(size)
+        rng = random.Random(size)
+        sample = [rng.choice(names) for _ in range(QUERIES)]
+
+        build_time, graph = timed(lambda: build_graph(edges))
+        cycle_time, cycles = timed(lambda: graph.find_cycles())
+        graph._components = None  # time the ordering without the cached components
+        order_time, order = timed(lambda: graph.topological_order())
+        assert len(order) == len(graph)
+
+        rescan_time, _ = timed(lambda: [rescan_dependents(edges, name) for name in sample[:5]])
+        lookup_time, _ = timed(lambda: [graph.dependents_of(name) for name in sample], 3)
+        for name in sample[:5]:
+            assert graph.dependents_of(name) == rescan_dependents(edges, name)
+        down_time, down = timed(lambda: [graph.downstream(name) for name in sample])
+        up_time, up = timed(lambda: [graph.upstream(name) for name in sample])
+
+        print(f"\nFiles: {size:,}  edges: {graph.edge_count:,}  cycles: {len(cycles)}")
+        print(f"  build graph            {build_time * 1000:>10.1f} ms")
+        print(f"  find cycles (Tarjan)   {cycle_time * 1000:>10.1f} ms")
+        print(f"  topological order      {order_time * 1000:>10.1f} ms")
+        print(f"  dependents: rescan     {rescan_time / 5 * 1000:>10.3f} ms/query")
+        print(f"  dependents: index      {lookup_time / QUERIES * 1000:>10.3f} ms/query")
+        print(f"  downstream closure     {down_time / QUERIES * 1000:>10.3f} ms/query "
+              f"(avg {sum(map(len, down)) / QUERIES:,.0f} files)")
+        print(f"  upstream closure       {up_time / QUERIES * 1000:>10.3f} ms/query "
+              f"(avg {sum(map(len, up)) / QUERIES:,.0f} files)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
@@ -0,0 +1,79 @@
+"""
+Benchmark: memory per external link for the old, slotted and columnar layouts.
+
+Link fields are built as fresh string objects per link, as they arrive from
+COM, so the plain layouts pay for every copy while the LinkStore pools them.
+
+Usage:
+    python benchmarks/bench_link_memory.py [count]
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.formula_scanner import cell_address
+from models.external_link import ExternalLink
+from models.link_store import LinkStore
+
+
+@dataclass
+class PlainExternalLink:
+    """The original ExternalLink layout: a regular dataclass with a __dict__."""
+    source_workbook: str
+    source_sheet: str
+    source_cell: str
+    target_file: str
+    formula: str
+    link_type: str
+
+
+def iter_link_fields(count):
+    """Yield link fields as new string objects, like values read through COM."""
+    for i in range(count):
+        row = i // 4 + 2
+        yield (
+            "".join(["Model ", str(i % 20), ".xlsx"]),
+            "".join(["Sheet", str(i % 6 + 1)]),
+            cell_address(row, i % 4 + 3),
+            "".join(["Source ", str(i % 40), ".xlsx"]),
+            "".join(["='C:\\Data\\[Source ", str(i % 40), ".xlsx]Input'!$A$", str(i % 500 + 1), "*2"]),
+            "".join(["Form", "ula"])
+        )
+
+
+def measure(build, count):
+    """Return (bytes per link, result) for a builder function."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(count)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count, result
+
+
+def run(count=200000):
+    print(f"Links: {count:,}")
+    print("-" * 60)
+    layouts = [
+        ("dataclass list (before)", lambda n: [PlainExternalLink(*f) for f in iter_link_fields(n)]),
+        ("slotted ExternalLink list", lambda n: [ExternalLink(*f) for f in iter_link_fields(n)]),
+        ("LinkStore (columnar)", lambda n: LinkStore(ExternalLink(*f) for f in iter_link_fields(n))),
+    ]
+    baseline = None
+    for label, build in layouts:
+        per_link, result = measure(build, count)
+        baseline = baseline or per_link
+        print(f"{label:<28} {per_link:>8.1f} bytes/link  ({per_link / baseline:.0%})")
+        del result
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
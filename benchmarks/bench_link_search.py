@@ -0,0 +1,98 @@
+"""
+Benchmark: linear substring search vs the trigram search index.
+
+Builds synthetic link stores of increasing size and reports index build
+time and per-query latency for both strategies.
+
+Usage:
+    python benchmarks/bench_link_search.py [max_links]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.formula_scanner import cell_address
+from core.link_search_index import LinkSearchIndex
+from models.external_link import ExternalLink
+from models.link_store import LinkStore
+
+
+SIZES = (10000, 100000, 500000)
+
+QUERIES = [
+    ('external_file', 'budget 17'),
+    ('external_file', 'xlsx'),
+    ('formula', 'input'),
+    ('formula', "rates'!$b$4"),
+    ('source_workbook', 'model 3'),
+    ('source_sheet', 'calc 1'),
+    ('all', 'forecast'),
+    ('all', 'zz-no-match'),
+]
+
+
+def build_store(count, seed=7):
+    rng = random.Random(seed)
+    targets = [f"{kind} {n}.xlsx" for kind in ("Budget", "Rates", "Forecast", "Actuals") for n in range(50)]
+    store = LinkStore()
+    for i in range(count):
+        target = rng.choice(targets)
+        sheet = rng.choice(["Input", "Rates", "Q1", "Q2", "Q3", "Q4", "Summary"])
+        store.append(ExternalLink(
+            source_workbook=f"Model {i % 40}.xlsx",
+            source_sheet=f"Calc {i % 12}",
+            source_cell=cell_address(i // 8 + 2, i % 8 + 1),
+            target_file=target,
+            formula=f"='C:\\Data\\[{target}]{sheet}'!$B${rng.randint(1, 2000)}*2",
+            link_type="Formula"
+        ))
+    return store
+
+
+def linear_search(store, keyword, search_field):
+    """Original ExternalLinksManager.search_links scan."""
+    keyword_lower = keyword.lower()
+    fields = {
+        'external_file': ('target_file',),
+        'formula': ('formula',),
+        'source_workbook': ('source_workbook',),
+        'source_sheet': ('source_sheet',),
+        'all': ('target_file', 'formula', 'source_workbook', 'source_sheet'),
+    }[search_field]
+    return [link for link in store
+            if any(keyword_lower in getattr(link, name).lower() for name in fields)]
+
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(max_links=500000):
+    for size in [s for s in SIZES if s <= max_links]:
+        store = build_store(size)
+        build_time, index = timed(lambda: LinkSearchIndex(store), 1)
+        print(f"\nLinks: {size:,}  (index build {build_time:.2f} sec, "
+              f"{len(store.pool):,} distinct strings)")
+        print(f"  {'field':<16}{'query':<16}{'hits':>9}  {'linear':>10}  {'index':>10}")
+        for field, keyword in QUERIES:
+            linear_time, expected = timed(lambda: linear_search(store, keyword, field), 1)
+            index_time, found = timed(lambda: index.search(keyword, field), 5)
+            assert list(found) == expected, f"results differ for {field}:{keyword}"
+            print(f"  {field:<16}{keyword:<16}{len(found):>9,}  "
+                  f"{linear_time * 1000:>8.1f}ms  {index_time * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
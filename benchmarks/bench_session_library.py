@@ -0,0 +1,101 @@
+"""
+Benchmark: session library index vs opening session files one by one.
+
+Writes synthetic sessions into a temporary folder tree, then reports the
+first index build, a no-change refresh, a refresh after a few new saves and
+query times, compared with answering "sessions containing X" by reading
+every session file.
+
+Usage:
+    python benchmarks/bench_session_library.py [sessions]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_library import SessionLibrary
+from core.session_store import load_session_file, save_session_file
+from core.workbook_index import normalize_workbook_path
+from models.session import SessionEntry
+
+
+FOLDERS = 12
+WORKBOOKS = 2000
+FILES_PER_SESSION = 25
+QUERIES = 50
+
+
+def workbook_path(index):
+    return f"\\\\fileserver\\finance\\Team {index % 40:02d}\\Model {index:05d}.xlsx"
+
+
+def write_sessions(root, count, seed=5, start=0):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        folder = os.path.join(root, f"{2020 + (start + i) % FOLDERS}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"session_{start + i:06d}.jsonl")
+        members = rng.sample(range(WORKBOOKS), FILES_PER_SESSION)
+        save_session_file(path, [SessionEntry(workbook_path(m)) for m in members])
+        paths.append(path)
+    return paths
+
+
+def scan_containing(session_paths, workbook):
+    """What a search costs without the index: read every session file."""
+    key = normalize_workbook_path(workbook)
+    return [path for path in session_paths
+            if any(normalize_workbook_path(p) == key for p in load_session_file(path).paths)]
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    result = func()
+    return time.perf_counter() - t0, result
+
+
+def run(count=5000):
+    temp_dir = tempfile.mkdtemp(prefix="session_library_bench_")
+    try:
+        root = os.path.join(temp_dir, "Sessions")
+        session_paths = write_sessions(root, count)
+        library = SessionLibrary(os.path.join(temp_dir, "library.sqlite"))
+        rng = random.Random(count)
+        sample = [workbook_path(rng.randrange(WORKBOOKS)) for _ in range(QUERIES)]
+
+        build_time, build = timed(lambda: library.refresh(root))
+        noop_time, _ = timed(lambda: library.refresh(root))
+        session_paths += write_sessions(root, 3, seed=99, start=count * FOLDERS)
+        update_time, update = timed(lambda: library.refresh(root))
+
+        scan_time, scanned = timed(lambda: scan_containing(session_paths, sample[0]))
+        path_time, found = timed(lambda: [library.search(w) for w in sample])
+        assert {s.path for s in found[0]} == set(scanned)
+        name_time, _ = timed(lambda: [library.search(os.path.basename(w)[6:9]) for w in sample])
+        recent_time, _ = timed(lambda: [library.most_recent_with(sample[i:i + 2]) for i in range(QUERIES)])
+
+        print(f"\nSessions: {len(session_paths):,}  members: {len(session_paths) * FILES_PER_SESSION:,}  "
+              f"folders: {build['folders']}")
+        print(f"  first index build      {build_time * 1000:>10.1f} ms")
+        print(f"  refresh, no changes    {noop_time * 1000:>10.1f} ms")
+        print(f"  refresh, 3 new saves   {update_time * 1000:>10.1f} ms "
+              f"({update['listed']} folder(s) listed, {update['indexed']} indexed)")
+        print(f"  containing: read all   {scan_time * 1000:>10.1f} ms/query")
+        print(f"  containing: path       {path_time / QUERIES * 1000:>10.3f} ms/query")
+        print(f"  containing: name part  {name_time / QUERIES * 1000:>10.3f} ms/query")
+        print(f"  most recent with two   {recent_time / QUERIES * 1000:>10.3f} ms/query")
+        library.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
@@ -0,0 +1,212 @@
+"""
+Scripted stand-in for the Excel COM object model.
+
+Models just enough of Application/Workbook/Worksheet/Range for the scan
+engines to run on machines without Excel. Every property read and method
+call on a stand-in object counts as one COM round-trip, so benchmarks can
+compare how chatty different code paths are.
+"""
+
+
+class RoundTripCounter:
+    """Counts simulated COM round-trips."""
+
+    def __init__(self):
+        self.count = 0
+
+    def hit(self, n: int = 1):
+        self.count += n
+
+    def reset(self):
+        self.count = 0
+
+
+class FakeCell:
+    """Single cell as returned by iterating Range.Cells."""
+
+    def __init__(self, sheet, row, col):
+        self._sheet = sheet
+        self._row = row
+        self._col = col
+
+    @property
+    def HasFormula(self):
+        self._sheet.counter.hit()
+        value = self._sheet.cells.get((self._row, self._col))
+        return isinstance(value, str) and value.startswith('=')
+
+    @property
+    def Formula(self):
+        self._sheet.counter.hit()
+        return self._sheet.cells.get((self._row, self._col), "")
+
+    @property
+    def FormulaR1C1(self):
+        self._sheet.counter.hit()
+        return self._sheet.r1c1(self._row, self._col)
+
+    @property
+    def Address(self):
+        from core.formula_scanner import cell_address
+        self._sheet.counter.hit()
+        return cell_address(self._row, self._col)
+
+
+class _Count:
+    def __init__(self, counter, value):
+        self._counter = counter
+        self._value = value
+
+    @property
+    def Count(self):
+        self._counter.hit()
+        return self._value
+
+
+class FakeRange:
+    """Rectangular range on a stand-in worksheet."""
+
+    def __init__(self, sheet, first_row, first_col, last_row, last_col):
+        self._sheet = sheet
+        self._first_row = first_row
+        self._first_col = first_col
+        self._last_row = last_row
+        self._last_col = last_col
+
+    @property
+    def Row(self):
+        self._sheet.counter.hit()
+        return self._first_row
+
+    @property
+    def Column(self):
+        self._sheet.counter.hit()
+        return self._first_col
+
+    @property
+    def Rows(self):
+        self._sheet.counter.hit()
+        return _Count(self._sheet.counter, self._last_row - self._first_row + 1)
+
+    @property
+    def Columns(self):
+        self._sheet.counter.hit()
+        return _Count(self._sheet.counter, self._last_col - self._first_col + 1)
+
+    @property
+    def Cells(self):
+        self._sheet.counter.hit()
+        return [
+            FakeCell(self._sheet, row, col)
+            for row in range(self._first_row, self._last_row + 1)
+            for col in range(self._first_col, self._last_col + 1)
+        ]
+
+    def _array(self, getter):
+        rows = tuple(
+            tuple(getter(row, col) for col in range(self._first_col, self._last_col + 1))
+            for row in range(self._first_row, self._last_row + 1)
+        )
+        if len(rows) == 1 and len(rows[0]) == 1:
+            return rows[0][0]
+        return rows
+
+    @property
+    def Formula(self):
+        self._sheet.counter.hit()
+        return self._array(lambda r, c: self._sheet.cells.get((r, c), ""))
+
+    @property
+    def FormulaR1C1(self):
+        self._sheet.counter.hit()
+        return self._array(self._sheet.r1c1)
+
+    @property
+    def HasFormula(self):
+        """True if every cell has a formula, False if none, None if mixed."""
+        self._sheet.counter.hit()
+        flags = {
+            isinstance(value, str) and value.startswith('=')
+            for value in (self._sheet.cells.get((r, c))
+                          for r in range(self._first_row, self._last_row + 1)
+                          for c in range(self._first_col, self._last_col + 1))
+        }
+        return flags.pop() if len(flags) == 1 else None
+
+    def __bool__(self):
+        return True
+
+
+class FakeWorksheet:
+    """Worksheet holding a sparse {(row, col): formula_or_value} map."""
+
+    def __init__(self, name, cells, counter, r1c1_cells=None):
+        self.Name = name
+        self.cells = cells
+        self.r1c1_cells = r1c1_cells or {}
+        self.counter = counter
+        rows = [r for r, _ in cells] or [1]
+        cols = [c for _, c in cells] or [1]
+        self._bounds = (min(rows), min(cols), max(rows), max(cols))
+
+    def r1c1(self, row, col):
+        return self.r1c1_cells.get((row, col), self.cells.get((row, col), ""))
+
+    @property
+    def UsedRange(self):
+        self.counter.hit()
+        return FakeRange(self, *self._bounds)
+
+    def Cells(self, row, col):
+        self.counter.hit()
+        return FakeCell(self, row, col)
+
+    def Range(self, top_left, bottom_right):
+        self.counter.hit()
+        return FakeRange(self, top_left._row, top_left._col, bottom_right._row, bottom_right._col)
+
+
+class FakeWorkbook:
+    """Workbook made of stand-in worksheets."""
+
+    def __init__(self, name, worksheets, counter, link_sources=None, full_name=None, saved=True):
+        self.Name = name
+        self.FullName = full_name or name
+        self.Saved = saved
+        self.Worksheets = worksheets
+        self._link_sources = link_sources or ()
+        self._counter = counter
+
+    def LinkSources(self, link_type=1):
+        self._counter.hit()
+        return tuple(self._link_sources) or None
+
+
+def build_linked_sheet(name, rows, cols, counter, link_every=10, target="Source.xlsx"):
+    """
+    Build a worksheet where every ``link_every``-th row holds external formulas.
+
+    Args:
+        name: Worksheet name
+        rows: Number of used rows
+        cols: Number of used columns
+        counter: RoundTripCounter shared by the model
+        link_every: Row interval between external-link rows
+        target: External workbook referenced by the linked rows
+
+    Returns:
+        FakeWorksheet
+    """
+    cells = {}
+    r1c1_cells = {}
+    for row in range(1, rows + 1):
+        for col in range(1, cols + 1):
+            if row % link_every == 0:
+                cells[(row, col)] = f"='C:\\Data\\[{target}]Input'!A{row}*2"
+                r1c1_cells[(row, col)] = f"='C:\\Data\\[{target}]Input'!RC1*2"
+            elif col == 1:
+                cells[(row, col)] = row
+            else:
+                cells[(row, col)] = f"=A{row}+{col}"
+                r1c1_cells[(row, col)] = f"=RC1+{col}"
+    return FakeWorksheet(name, cells, counter, r1c1_cells)
@@ -51,6 +51,9 @@ DEFAULT_LOG_DIRECTORY = r"D:\Pzone\Log"
 DEFAULT_LOG_DIR = r"D:\Pzone\Log"  # Alias for compatibility
 DEFAULT_SESSION_DIRECTORY = r"D:\Pzone\Sessions"
 DEFAULT_SESSION_DIR = r"D:\Pzone\Sessions"  # Alias for compatibility
+DEFAULT_LINK_INDEX_FILE = r"D:\Pzone\Log\external_link_index.sqlite"
+DEFAULT_OPEN_HISTORY_FILE = r"D:\Pzone\Log\session_open_history.json"
+DEFAULT_SESSION_LIBRARY_FILE = r"D:\Pzone\Log\session_library.sqlite"
 
 # Button properties
 BUTTON_WIDTH = 20
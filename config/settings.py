@@ -11,7 +11,8 @@ import yaml
 from typing import Any, Dict, Optional
 from .constants import (
     APP_NAME, MONO_FONTS, DEFAULT_CHECK_DAYS, DEFAULT_LOG_DIR, 
-    DEFAULT_SESSION_DIR, DEFAULT_MAX_RETRIES, DEFAULT_RETRY_DELAY
+    DEFAULT_SESSION_DIR, DEFAULT_MAX_RETRIES, DEFAULT_RETRY_DELAY,
+    DEFAULT_LINK_INDEX_FILE, DEFAULT_OPEN_HISTORY_FILE, DEFAULT_SESSION_LIBRARY_FILE
 )
 
 class Settings:
@@ -170,6 +171,21 @@ class Settings:
         """Get log directory path."""
         return self.get("external_links.logging.log_directory", DEFAULT_LOG_DIR)
     
+    @property
+    def link_index_file(self) -> str:
+        """Get the SQLite index file used by the external link crawler."""
+        return self.get("external_links.crawler.index_file", DEFAULT_LINK_INDEX_FILE)
+    
+    @property
+    def compress_link_ranges(self) -> bool:
+        """Get whether filled-down link formulas are reported as one range."""
+        return self.get("external_links.scan.compress_ranges", False)
+    
+    @property
+    def crawler_workers(self) -> int:
+        """Get the number of crawler parser processes (0 = CPU count)."""
+        return self.get("external_links.crawler.workers", 0)
+    
     @property
     def session_save_directory(self) -> str:
         """Get session save directory."""
@@ -190,6 +206,26 @@ class Settings:
         """Whether to include timestamp in session filenames."""
         return self.get("session.file_format.include_timestamp", True)
     
+    @property
+    def session_load_policy(self) -> str:
+        """Get the default order policy for opening session files."""
+        return self.get("session.loading.policy", "session_order")
+    
+    @property
+    def session_open_history_file(self) -> str:
+        """Get the file recording past workbook open durations."""
+        return self.get("session.loading.history_file", DEFAULT_OPEN_HISTORY_FILE)
+    
+    @property
+    def session_library_file(self) -> str:
+        """Get the SQLite index of saved session files."""
+        return self.get("session.library.index_file", DEFAULT_SESSION_LIBRARY_FILE)
+    
+    @property
+    def session_library_enabled(self) -> bool:
+        """Whether loading a session starts from the session library search."""
+        return self.get("session.library.enabled", True)
+    
     @property
     def show_console_by_default(self) -> bool:
         """Whether to show progress console by default."""
@@ -0,0 +1,288 @@
+"""
+COM Worker for Excel Session Manager
+
+This module provides a single long-lived COM worker thread that owns the
+Excel connection. The thread initializes COM once, keeps one warm
+Excel.Application proxy and runs submitted jobs from a queue, so callers no
+longer pay CoInitialize/Dispatch/CoUninitialize on every operation.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+
+# HRESULTs that mean the Application proxy is dead and must be re-dispatched
+RPC_FAILURE_HRESULTS = {
+    -2147417848,  # RPC_E_DISCONNECTED
+    -2147023174,  # RPC_S_SERVER_UNAVAILABLE
+    -2147023170,  # RPC_S_CALL_FAILED
+    -2147417851,  # RPC_E_SERVERFAULT
+    -2147220995,  # CO_E_OBJNOTCONNECTED
+}
+
+# How long the idle worker waits on the queue before pumping COM messages
+_IDLE_PUMP_INTERVAL = 0.1
+
+# How long the UI thread waits for a quick COM query before reporting Excel as busy
+UI_CALL_TIMEOUT = 2.0
+
+
+class ComWorkerBusyError(Exception):
+    """The COM worker did not run a job within the caller's timeout."""
+
+    def __init__(self, operation: str, running: Optional[str] = None):
+        self.operation = operation
+        self.running = running
+        detail = f" while running '{running}'" if running else ""
+        super().__init__(f"Excel is busy{detail}; '{operation}' did not start in time")
+
+
+def is_rpc_failure(error: Exception) -> bool:
+    """
+    Check whether an exception means the Excel connection was lost.
+
+    Args:
+        error: Exception raised by a COM call
+
+    Returns:
+        True if the proxy should be discarded and Excel re-dispatched
+    """
+    hresult = getattr(error, 'hresult', None)
+    if hresult is None and getattr(error, 'args', None):
+        hresult = error.args[0]
+    return hresult in RPC_FAILURE_HRESULTS
+
+
+class _ComJob:
+    """A queued unit of work for the COM worker."""
+
+    __slots__ = ('func', 'args', 'kwargs', 'operation', 'read_only', 'future', 'submitted_at')
+
+    def __init__(self, func, args, kwargs, operation, read_only, future):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.operation = operation
+        self.read_only = read_only
+        self.future = future
+        self.submitted_at = time.time()
+
+
+class ExcelComWorker:
+    """
+    Dedicated COM thread owning the Excel.Application connection.
+
+    Jobs are callables that receive the Excel Application proxy as their
+    first argument. COM objects must not leave the worker thread, so jobs
+    should return plain Python values only.
+
+    Jobs run one at a time, so a long job (a session load, a link update)
+    delays every job queued behind it. Callers on the UI thread should pass
+    a timeout or call from a background thread.
+    """
+
+    def __init__(self, prog_id: str = "Excel.Application", dispatch: Optional[Callable] = None):
+        """
+        Initialize the COM worker.
+
+        Args:
+            prog_id: COM ProgID to dispatch
+            dispatch: Callable creating the Application proxy from the ProgID
+                (defaults to win32com.client.Dispatch)
+        """
+        self.prog_id = prog_id
+        self._dispatch = dispatch
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._excel = None
+        self._running = False
+        self.current_operation: Optional[str] = None
+        self.reconnect_count = 0
+
+    def start(self):
+        """Start the worker thread if it is not already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="ExcelComWorker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the worker thread after pending jobs have run.
+
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        with self._lock:
+            thread = self._thread
+            if not thread:
+                return
+            self._running = False
+            self._jobs.put(None)
+        if thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def submit(self, func: Callable, *args, operation: Optional[str] = None,
+               read_only: bool = False, **kwargs) -> Future:
+        """
+        Queue a job for the COM thread.
+
+        Args:
+            func: Callable invoked as func(excel, *args, **kwargs)
+            operation: Name used for latency metrics (defaults to func name)
+            read_only: The job only reads from Excel, so it is run again
+                after a reconnect; other jobs (Open, Save, Close) are not
+                repeated and fail instead
+
+        Returns:
+            Future resolving to the job's return value
+        """
+        future = Future()
+        job = _ComJob(func, args, kwargs, operation or getattr(func, '__name__', 'job'), read_only, future)
+
+        # A job that submits more work would deadlock waiting on itself
+        if self.is_worker_thread():
+            self._execute(job)
+            return future
+
+        self.start()
+        self._jobs.put(job)
+        return future
+
+    def call(self, func: Callable, *args, operation: Optional[str] = None,
+             timeout: Optional[float] = None, read_only: bool = False, **kwargs) -> Any:
+        """
+        Run a job on the COM thread and wait for its result.
+
+        Args:
+            func: Callable invoked as func(excel, *args, **kwargs)
+            operation: Name used for latency metrics
+            timeout: Optional seconds to wait for the result
+            read_only: The job is safe to run again after a reconnect
+
+        Returns:
+            The job's return value (exceptions are re-raised)
+
+        Raises:
+            ComWorkerBusyError: If the job did not finish within ``timeout``;
+                a job that has not started yet is cancelled
+        """
+        future = self.submit(func, *args, operation=operation, read_only=read_only, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ComWorkerBusyError(operation or getattr(func, '__name__', 'job'), self.current_operation)
+
+    def is_worker_thread(self) -> bool:
+        """Whether the caller is running on the COM worker thread."""
+        return self._thread is threading.current_thread()
+
+    def reset_connection(self):
+        """Drop the cached Application proxy; the next job re-dispatches."""
+        self.submit(self._drop_connection, operation="com_reset_connection")
+
+    def _drop_connection(self, excel=None):
+        """Release the cached Application proxy (worker thread only)."""
+        self._excel = None
+
+    def _get_excel(self):
+        """Return the warm Application proxy, dispatching it if needed."""
+        if self._excel is not None:
+            # Jobs swallow most errors themselves, so probe the cached proxy
+            # with one cheap call instead of relying on the retry path alone
+            try:
+                self._excel.Ready
+            except Exception as e:
+                if is_rpc_failure(e):
+                    self._excel = None
+                    self.reconnect_count += 1
+        if self._excel is None:
+            dispatch = self._dispatch
+            if dispatch is None:
+                import win32com.client
+                dispatch = win32com.client.Dispatch
+            self._excel = dispatch(self.prog_id)
+        return self._excel
+
+    def _run(self):
+        """Worker thread main loop."""
+        import pythoncom
+        pythoncom.CoInitialize()
+        try:
+            while self._running:
+                try:
+                    job = self._jobs.get(timeout=_IDLE_PUMP_INTERVAL)
+                except queue.Empty:
+                    # An STA thread must keep pumping messages while idle
+                    pythoncom.PumpWaitingMessages()
+                    continue
+                if job is None:
+                    break
+                self._execute(job)
+        finally:
+            self._excel = None
+            pythoncom.CoUninitialize()
+
+    def _execute(self, job: _ComJob):
+        """Run one job; if the Excel proxy has died, reconnect and retry read-only jobs once."""
+        if not job.future.set_running_or_notify_cancel():
+            return
+
+        started_at = time.time()
+        outer_operation = self.current_operation
+        self.current_operation = job.operation
+        try:
+            try:
+                result = job.func(self._get_excel(), *job.args, **job.kwargs)
+            except Exception as e:
+                if not is_rpc_failure(e):
+                    raise
+                # Excel went away (crash, user closed it, etc.): the next job reconnects
+                self._excel = None
+                self.reconnect_count += 1
+                if not job.read_only:
+                    # Part of an Open/Save may already have happened; running it again could repeat it
+                    raise
+                result = job.func(self._get_excel(), *job.args, **job.kwargs)
+        except BaseException as e:
+            self._record_timing(job, started_at, success=False)
+            job.future.set_exception(e)
+        else:
+            self._record_timing(job, started_at, success=True)
+            job.future.set_result(result)
+        finally:
+            self.current_operation = outer_operation
+
+    def _record_timing(self, job: _ComJob, started_at: float, success: bool):
+        """Record queue wait and execution latency in the performance monitor."""
+        try:
+            from core.performance_monitor import get_performance_monitor
+            monitor = get_performance_monitor()
+            finished_at = time.time()
+            monitor.record_metric("com_queue_wait", started_at - job.submitted_at, "seconds", "com")
+            monitor.record_metric(f"com_job_{job.operation}", finished_at - started_at, "seconds", "com")
+            if not success:
+                monitor.record_metric("com_job_failures", 1, "count", "com")
+        except Exception:
+            pass
+
+
+# Global COM worker instance
+_global_com_worker: Optional[ExcelComWorker] = None
+_global_com_worker_lock = threading.Lock()
+
+
+def get_com_worker() -> ExcelComWorker:
+    """Get the global COM worker instance."""
+    global _global_com_worker
+    with _global_com_worker_lock:
+        if _global_com_worker is None:
+            _global_com_worker = ExcelComWorker()
+        return _global_com_worker
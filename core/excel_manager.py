@@ -5,8 +5,6 @@ This module handles all Excel COM operations including getting workbook informat
 saving, closing, and activating Excel files.
 """
 
-import pythoncom
-import win32com.client
 import win32gui
 import win32con
 import time
@@ -14,8 +12,90 @@ import gc
 import psutil
 from datetime import datetime
 from utils.file_utils import get_file_mtime_str
-from core.error_handler import handle_error, ErrorCategory, ErrorSeverity, safe_execute
+from core.error_handler import handle_error, ErrorCategory, ErrorSeverity
 from core.performance_monitor import timed_operation
+from core.com_worker import get_com_worker, ComWorkerBusyError
+from core.workbook_index import WorkbookIndex, find_open_workbook
+
+
+# XlCalculation values
+XL_CALCULATION_MANUAL = -4135
+
+
+class ExcelPerformanceMode:
+    """
+    Context manager for bulk Excel operations.
+    
+    On entry it snapshots ScreenUpdating, EnableEvents, DisplayAlerts,
+    Calculation and CalculateBeforeSave, then turns off repainting, events
+    and alerts, switches calculation to manual and disables calculate-before-
+    save. On exit, including after an exception, every setting is restored.
+    Switching calculation back to automatic makes Excel recalculate once,
+    instead of after every step of the operation. Must be used on the
+    thread that owns the Excel proxy.
+    
+    Excel refuses to read or set Calculation while no workbook is open;
+    settings that fail on entry can be applied later with ``refresh``
+    (e.g. after opening the first workbook of a session).
+    
+    Excel stores the application's calculation mode in every workbook it
+    saves, so operations that save should pass ``manual_calculation=False``
+    rather than write manual mode into the files.
+    """
+    
+    # Calculation settings, skipped when manual_calculation is False
+    CALCULATION_SETTINGS = ('Calculation', 'CalculateBeforeSave')
+    
+    # Setting name -> value while the mode is active, in the order applied
+    SETTINGS = (
+        ('ScreenUpdating', False),
+        ('EnableEvents', False),
+        ('DisplayAlerts', False),
+        ('Calculation', XL_CALCULATION_MANUAL),
+        ('CalculateBeforeSave', False),
+    )
+    
+    def __init__(self, excel, manual_calculation: bool = True):
+        """
+        Initialize the performance mode.
+        
+        Args:
+            excel: Excel Application COM object
+            manual_calculation: Also switch calculation to manual
+        """
+        self.excel = excel
+        self.manual_calculation = manual_calculation
+        self._saved = {}
+        
+    def __enter__(self):
+        self.refresh()
+        return self
+        
+    def refresh(self):
+        """Apply any setting that has not been applied yet (snapshotting it first)."""
+        for name, value in self.SETTINGS:
+            if name in self._saved:
+                continue
+            if not self.manual_calculation and name in self.CALCULATION_SETTINGS:
+                continue
+            try:
+                original = getattr(self.excel, name)
+                setattr(self.excel, name, value)
+                self._saved[name] = original
+            except Exception:
+                continue
+                
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Restore in reverse order: calculation recalculates once, repainting resumes last
+        for name, _ in reversed(self.SETTINGS):
+            if name not in self._saved:
+                continue
+            try:
+                setattr(self.excel, name, self._saved.pop(name))
+            except Exception as e:
+                handle_error(e, ErrorSeverity.WARNING, ErrorCategory.EXCEL_COM,
+                             f"Could not restore Excel setting {name}", show_user=False)
+        return False
 
 
 class ExcelManager:
@@ -31,20 +111,25 @@ class ExcelManager:
         pass
     
     @timed_operation("get_open_workbooks")
-    def get_open_workbooks(self):
+    def get_open_workbooks(self, timeout=None):
         """
         Get information about currently open Excel workbooks.
         
+        Args:
+            timeout: Optional seconds to wait for the COM worker, which may
+                     be busy with a long job such as a session load
+        
         Returns:
             tuple: (file_list, sheet_list, cell_list, path_list) containing
                    workbook names, active sheets, selected cells, and file paths
+                   
+        Raises:
+            ComWorkerBusyError: If the COM worker was busy for longer than timeout
         """
-        def _get_workbooks():
-            pythoncom.CoInitialize()
+        def _get_workbooks(excel):
             file_list, sheet_list, cell_list, path_list = [], [], [], []
             
             try:
-                excel = win32com.client.Dispatch("Excel.Application")
                 for wb in excel.Workbooks:
                     try:
                         file_list.append(wb.Name)
@@ -67,15 +152,17 @@ class ExcelManager:
             except Exception as e:
                 handle_error(e, ErrorSeverity.ERROR, ErrorCategory.EXCEL_COM, 
                            "Error connecting to Excel application", show_user=False)
-            finally:
-                pythoncom.CoUninitialize()
                 
             return file_list, sheet_list, cell_list, path_list
         
-        return safe_execute(_get_workbooks, 
-                          context="Getting open Excel workbooks",
-                          category=ErrorCategory.EXCEL_COM,
-                          default_return=([], [], [], []))
+        try:
+            return get_com_worker().call(_get_workbooks, operation="get_open_workbooks",
+                                         timeout=timeout, read_only=True)
+        except ComWorkerBusyError:
+            raise
+        except Exception as e:
+            handle_error(e, ErrorSeverity.ERROR, ErrorCategory.EXCEL_COM, "Getting open Excel workbooks")
+            return [], [], [], []
     
     def save_workbooks(self, selected_workbooks, print_func=None):
         """
@@ -94,84 +181,79 @@ class ExcelManager:
         op_id = monitor.start_operation("save_workbooks", {'workbook_count': len(selected_workbooks)})
         
         try:
-            self._save_workbooks_impl(selected_workbooks, print_func)
+            get_com_worker().call(self._save_workbooks_impl, selected_workbooks, print_func,
+                                  operation="save_workbooks")
             monitor.end_operation(op_id, success=True)
         except Exception as e:
             monitor.end_operation(op_id, success=False)
             raise
     
-    def _save_workbooks_impl(self, selected_workbooks, print_func=None):
-        """Implementation of save workbooks."""
+    def _save_workbooks_impl(self, excel, selected_workbooks, print_func=None):
+        """Implementation of save workbooks (runs on the COM worker thread)."""
             
         def print_msg(msg):
             if print_func:
                 print_func(msg)
             else:
                 print(msg)
-                
-        pythoncom.CoInitialize()
         
         try:
-            excel = win32com.client.Dispatch("Excel.Application")
-            print_msg(f"Saving {len(selected_workbooks)} selected file(s)")
-            print_msg("-" * 80)
+            with ExcelPerformanceMode(excel, manual_calculation=False):
+                workbook_index = WorkbookIndex(excel)
+                print_msg(f"Saving {len(selected_workbooks)} selected file(s)")
+                print_msg("-" * 80)
             
-            for idx, (name, path, sheet, cell) in enumerate(selected_workbooks, 1):
-                print_msg(f"({idx}/{len(selected_workbooks)}) Saving: {name}")
+                for idx, (name, path, sheet, cell) in enumerate(selected_workbooks, 1):
+                    print_msg(f"({idx}/{len(selected_workbooks)}) Saving: {name}")
                 
-                # Get file modification time before save
-                mtime_before = get_file_mtime_str(path) if path else "Unknown"
-                print_msg(f"  File last modified before save: {mtime_before}")
+                    # Get file modification time before save
+                    mtime_before = get_file_mtime_str(path) if path else "Unknown"
+                    print_msg(f"  File last modified before save: {mtime_before}")
                 
-                t0 = time.time()
+                    t0 = time.time()
                 
-                try:
-                    wb = None
-                    for workbook in excel.Workbooks:
-                        if workbook.Name == name:
-                            wb = workbook
-                            break
+                    try:
+                        wb = workbook_index.find(name, path)
                     
-                    if wb:
-                        # Save with retry logic
-                        max_retries = 3
-                        for attempt in range(max_retries):
-                            try:
-                                wb.Save()
-                                break
-                            except Exception as e:
-                                if attempt < max_retries - 1:
-                                    print_msg(f"  Save attempt {attempt + 1} failed, retrying...")
-                                    time.sleep(0.1)
-                                else:
-                                    raise e
+                        if wb:
+                            # Save with retry logic
+                            max_retries = 3
+                            for attempt in range(max_retries):
+                                try:
+                                    wb.Save()
+                                    break
+                                except Exception as e:
+                                    if attempt < max_retries - 1:
+                                        print_msg(f"  Save attempt {attempt + 1} failed, retrying...")
+                                        time.sleep(0.1)
+                                    else:
+                                        raise e
                         
-                        # Get file modification time after save
-                        mtime_after = get_file_mtime_str(path) if path else "Unknown"
-                        print_msg(f"  File last modified after save: {mtime_after}")
+                            # Get file modification time after save
+                            mtime_after = get_file_mtime_str(path) if path else "Unknown"
+                            print_msg(f"  File last modified after save: {mtime_after}")
                         
-                        if mtime_before != mtime_after:
-                            print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved: {name} [SUCCESS] (File timestamp updated)")
+                            if mtime_before != mtime_after:
+                                print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved: {name} [SUCCESS] (File timestamp updated)")
+                            else:
+                                print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved: {name} [WARNING] (File timestamp unchanged)")
                         else:
-                            print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved: {name} [WARNING] (File timestamp unchanged)")
-                    else:
-                        print_msg(f"  Workbook '{name}' not found in open workbooks")
+                            print_msg(f"  Workbook '{name}' not found in open workbooks")
                         
-                except Exception as e:
-                    print_msg(f"  ({idx}/{len(selected_workbooks)}) Failed to save: {name} ({e})")
+                    except Exception as e:
+                        print_msg(f"  ({idx}/{len(selected_workbooks)}) Failed to save: {name} ({e})")
                 
-                t1 = time.time()
-                used_sec = t1 - t0
-                print_msg(f"used time: {used_sec:.2f} sec")
-                print_msg("-" * 80)
+                    t1 = time.time()
+                    used_sec = t1 - t0
+                    print_msg(f"used time: {used_sec:.2f} sec")
+                    print_msg("-" * 80)
                 
-            print_msg(f"Save operation completed. Total: {len(selected_workbooks)}")
+                print_msg(f"Save operation completed. Total: {len(selected_workbooks)}")
             
         except Exception as e:
             print_msg(f"Error during save operation: {str(e)}")
         finally:
             gc.collect()
-            pythoncom.CoUninitialize()
     
     def save_and_close_workbooks(self, selected_workbooks, print_func=None):
         """
@@ -190,86 +272,82 @@ class ExcelManager:
         op_id = monitor.start_operation("save_and_close_workbooks", {'workbook_count': len(selected_workbooks)})
         
         try:
-            self._save_and_close_impl(selected_workbooks, print_func)
+            get_com_worker().call(self._save_and_close_impl, selected_workbooks, print_func,
+                                  operation="save_and_close_workbooks")
             monitor.end_operation(op_id, success=True)
         except Exception as e:
             monitor.end_operation(op_id, success=False)
             raise
     
-    def _save_and_close_impl(self, selected_workbooks, print_func=None):
-        """Implementation of save and close workbooks."""
+    def _save_and_close_impl(self, excel, selected_workbooks, print_func=None):
+        """Implementation of save and close workbooks (runs on the COM worker thread)."""
         def print_msg(msg):
             if print_func:
                 print_func(msg)
             else:
                 print(msg)
-                
-        pythoncom.CoInitialize()
         
         try:
-            excel = win32com.client.Dispatch("Excel.Application")
-            print_msg(f"Saving and closing {len(selected_workbooks)} selected file(s)")
-            print_msg("-" * 80)
+            with ExcelPerformanceMode(excel, manual_calculation=False):
+                workbook_index = WorkbookIndex(excel)
+                print_msg(f"Saving and closing {len(selected_workbooks)} selected file(s)")
+                print_msg("-" * 80)
             
-            for idx, (name, path, sheet, cell) in enumerate(selected_workbooks, 1):
-                print_msg(f"({idx}/{len(selected_workbooks)}) Saving and closing: {name}")
+                for idx, (name, path, sheet, cell) in enumerate(selected_workbooks, 1):
+                    print_msg(f"({idx}/{len(selected_workbooks)}) Saving and closing: {name}")
                 
-                # Get file modification time before save
-                mtime_before = get_file_mtime_str(path) if path else "Unknown"
-                print_msg(f"  File last modified before save: {mtime_before}")
+                    # Get file modification time before save
+                    mtime_before = get_file_mtime_str(path) if path else "Unknown"
+                    print_msg(f"  File last modified before save: {mtime_before}")
                 
-                t0 = time.time()
+                    t0 = time.time()
                 
-                try:
-                    wb = None
-                    for workbook in excel.Workbooks:
-                        if workbook.Name == name:
-                            wb = workbook
-                            break
+                    try:
+                        wb = workbook_index.find(name, path)
                     
-                    if wb:
-                        # Save first
-                        max_retries = 3
-                        for attempt in range(max_retries):
-                            try:
-                                wb.Save()
-                                break
-                            except Exception as e:
-                                if attempt < max_retries - 1:
-                                    print_msg(f"  Save attempt {attempt + 1} failed, retrying...")
-                                    time.sleep(0.1)
-                                else:
-                                    raise e
+                        if wb:
+                            # Save first
+                            max_retries = 3
+                            for attempt in range(max_retries):
+                                try:
+                                    wb.Save()
+                                    break
+                                except Exception as e:
+                                    if attempt < max_retries - 1:
+                                        print_msg(f"  Save attempt {attempt + 1} failed, retrying...")
+                                        time.sleep(0.1)
+                                    else:
+                                        raise e
                         
-                        # Get file modification time after save
-                        mtime_after = get_file_mtime_str(path) if path else "Unknown"
-                        print_msg(f"  File last modified after save: {mtime_after}")
+                            # Get file modification time after save
+                            mtime_after = get_file_mtime_str(path) if path else "Unknown"
+                            print_msg(f"  File last modified after save: {mtime_after}")
                         
-                        # Then close
-                        wb.Close(SaveChanges=False)  # Already saved above
+                            # Then close
+                            wb.Close(SaveChanges=False)  # Already saved above
+                            workbook_index.discard(name, path)
                         
-                        if mtime_before != mtime_after:
-                            print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved and closed: {name} [SUCCESS] (File timestamp updated)")
+                            if mtime_before != mtime_after:
+                                print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved and closed: {name} [SUCCESS] (File timestamp updated)")
+                            else:
+                                print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved and closed: {name} [WARNING] (File timestamp unchanged)")
                         else:
-                            print_msg(f"  ({idx}/{len(selected_workbooks)}) Saved and closed: {name} [WARNING] (File timestamp unchanged)")
-                    else:
-                        print_msg(f"  Workbook '{name}' not found in open workbooks")
+                            print_msg(f"  Workbook '{name}' not found in open workbooks")
                         
-                except Exception as e:
-                    print_msg(f"  ({idx}/{len(selected_workbooks)}) Failed to save/close: {name} ({e})")
+                    except Exception as e:
+                        print_msg(f"  ({idx}/{len(selected_workbooks)}) Failed to save/close: {name} ({e})")
                 
-                t1 = time.time()
-                used_sec = t1 - t0
-                print_msg(f"used time: {used_sec:.2f} sec")
-                print_msg("-" * 80)
+                    t1 = time.time()
+                    used_sec = t1 - t0
+                    print_msg(f"used time: {used_sec:.2f} sec")
+                    print_msg("-" * 80)
                 
-            print_msg(f"Save and close operation completed. Total: {len(selected_workbooks)}")
+                print_msg(f"Save and close operation completed. Total: {len(selected_workbooks)}")
             
         except Exception as e:
             print_msg(f"Error during save and close operation: {str(e)}")
         finally:
             gc.collect()
-            pythoncom.CoUninitialize()
     
     def activate_workbooks(self, selected_workbooks):
         """
@@ -287,26 +365,20 @@ class ExcelManager:
         op_id = monitor.start_operation("activate_workbooks", {'workbook_count': len(selected_workbooks)})
         
         try:
-            self._activate_workbooks_impl(selected_workbooks)
+            get_com_worker().call(self._activate_workbooks_impl, selected_workbooks,
+                                  operation="activate_workbooks")
             monitor.end_operation(op_id, success=True)
         except Exception as e:
             monitor.end_operation(op_id, success=False)
             raise
     
-    def _activate_workbooks_impl(self, selected_workbooks):
-        """Implementation of activate workbooks."""
-        pythoncom.CoInitialize()
-        
+    def _activate_workbooks_impl(self, excel, selected_workbooks):
+        """Implementation of activate workbooks (runs on the COM worker thread)."""
         try:
-            excel = win32com.client.Dispatch("Excel.Application")
-            
             for name, path, sheet, cell in selected_workbooks:
                 try:
-                    wb = None
-                    for workbook in excel.Workbooks:
-                        if workbook.Name == name:
-                            wb = workbook
-                            break
+                    # Usually one double-clicked workbook: look it up directly
+                    wb = find_open_workbook(excel, name, path)
                     
                     if wb:
                         wb.Activate()
@@ -332,25 +404,21 @@ class ExcelManager:
                     
         except Exception as e:
             print(f"Error during activate operation: {str(e)}")
-        finally:
-            pythoncom.CoUninitialize()
     
     @timed_operation("minimize_all_excel")
     def minimize_all_excel(self):
         """Minimize all Excel application windows."""
-        pythoncom.CoInitialize()
-        
-        try:
-            excel = win32com.client.Dispatch("Excel.Application")
+        def _minimize(excel):
             try:
                 hwnd = excel.Hwnd
                 win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
             except Exception as e:
                 print(f"Error minimizing Excel: {e}")
+        
+        try:
+            get_com_worker().call(_minimize, operation="minimize_all_excel")
         except Exception as e:
             print(f"Error connecting to Excel for minimize: {e}")
-        finally:
-            pythoncom.CoUninitialize()
     
     def get_workbook_details(self, file_list, sheet_list, cell_list, path_list):
         """
@@ -5,31 +5,119 @@ This module handles the core logic for managing external links in Excel workbook
 including scanning, searching, and data processing functionality.
 """
 
-import pythoncom
-import win32com.client
-import re
-from typing import Dict, List, Tuple, Set
-from dataclasses import dataclass
-from collections import defaultdict
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Set
+from core.formula_scanner import FormulaScanner, formula_runs, range_address
+from core.com_worker import get_com_worker
+from core.link_graph import WorkbookLinkGraph
+from core.link_search_index import LinkSearchIndex, SearchCancelled
+from utils.formula_tokenizer import cached_external_files, external_files_in_formula, has_external_reference
+from models.external_link import ExternalLink, ExternalFileGroup
+from models.link_store import LinkStore
 
 
-@dataclass
-class ExternalLink:
-    """Data class for external link information."""
-    source_workbook: str
-    source_sheet: str
-    source_cell: str
-    target_file: str
-    formula: str
-    link_type: str  # 'LinkSource' or 'Formula'
+# Maximum number of workbooks kept in the live-scan cache
+SCAN_CACHE_MAX_WORKBOOKS = 500
 
 
-@dataclass
-class ExternalFileGroup:
-    """Data class for grouping links by external file."""
-    external_file: str
-    links: List[ExternalLink]
-    reference_count: int
+class WorkbookScanCache:
+    """
+    Cache of per-workbook scan results for open workbooks.
+    
+    Entries are keyed by workbook FullName and validated against a change
+    signature of (file mtime, file size, Saved state). A workbook with
+    unsaved changes, or one that has never been saved to disk, is always
+    rescanned. Links are kept in a compact LinkStore per workbook.
+    """
+    
+    def __init__(self, max_workbooks: int = SCAN_CACHE_MAX_WORKBOOKS):
+        """
+        Initialize the scan cache.
+        
+        Args:
+            max_workbooks: Maximum number of cached workbooks
+        """
+        self.max_workbooks = max_workbooks
+        self._entries: "OrderedDict[str, Tuple[Tuple, LinkStore]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def signature(workbook) -> Tuple[str, Optional[Tuple]]:
+        """
+        Compute the change signature of an open workbook.
+        
+        Args:
+            workbook: Excel workbook COM object
+            
+        Returns:
+            Tuple of (full_name, signature); signature is None when the
+            workbook is dirty or not on disk and must not be cached
+        """
+        try:
+            full_name = workbook.FullName
+            if not workbook.Saved:
+                return full_name, None
+            stat = os.stat(full_name)
+        except Exception:
+            return getattr(workbook, 'Name', ''), None
+        return full_name, (stat.st_mtime_ns, stat.st_size, True)
+    
+    def get(self, full_name: str, signature: Optional[Tuple]) -> Optional[LinkStore]:
+        """
+        Get cached links if the workbook is unchanged.
+        
+        Args:
+            full_name: Workbook FullName
+            signature: Current change signature
+            
+        Returns:
+            Cached links, or None on a miss
+        """
+        if signature is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(full_name)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(full_name)
+            return entry[1]
+    
+    def put(self, full_name: str, signature: Optional[Tuple], links: List[ExternalLink]):
+        """
+        Store the scan result of a workbook.
+        
+        Args:
+            full_name: Workbook FullName
+            signature: Change signature at scan time (None = do not cache)
+            links: Links found in the workbook
+        """
+        with self._lock:
+            if signature is None:
+                self._entries.pop(full_name, None)
+                return
+            self._entries[full_name] = (signature, links if isinstance(links, LinkStore) else LinkStore(links))
+            self._entries.move_to_end(full_name)
+            while len(self._entries) > self.max_workbooks:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all cached scan results."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global scan cache shared by all dialogs
+_global_scan_cache: Optional[WorkbookScanCache] = None
+
+
+def get_scan_cache() -> WorkbookScanCache:
+    """Get the global workbook scan cache."""
+    global _global_scan_cache
+    if _global_scan_cache is None:
+        _global_scan_cache = WorkbookScanCache()
+    return _global_scan_cache
 
 
 class ExternalLinksManager:
@@ -40,108 +128,298 @@ class ExternalLinksManager:
     and providing search and grouping capabilities.
     """
     
-    def __init__(self):
-        """Initialize the external links manager."""
-        self.external_links: List[ExternalLink] = []
-        self.grouped_links: Dict[str, ExternalFileGroup] = {}
+    def __init__(self, compress_ranges: bool = False):
+        """
+        Initialize the external links manager.
         
-    def scan_open_workbooks(self) -> Tuple[List[ExternalLink], Dict[str, int]]:
+        Args:
+            compress_ranges: Report copied-down formulas as one link per
+                contiguous range (e.g., '$C$2:$C$50001') instead of one per cell
+        """
+        self._store = LinkStore()
+        # Always indexes self._store; the two are replaced together after a scan
+        self._search_index = LinkSearchIndex(self._store)
+        self._grouped_links: Optional[Dict[str, ExternalFileGroup]] = None
+        self._link_graph: Optional[WorkbookLinkGraph] = None
+        self._lock = threading.Lock()
+        self.compress_ranges = compress_ranges
+    
+    @property
+    def external_links(self) -> LinkStore:
+        """All scanned links, as a compact sequence of ExternalLink records."""
+        return self._store
+    
+    @property
+    def grouped_links(self) -> Dict[str, ExternalFileGroup]:
+        """Links grouped by external file, built on first access after a scan."""
+        grouped = self._grouped_links
+        if grouped is None:
+            store = self._store
+            grouped = store.group_by_external_file()
+            with self._lock:
+                # Do not cache a grouping of a store replaced meanwhile
+                if self._store is store:
+                    self._grouped_links = grouped
+        return grouped
+    
+    @property
+    def link_graph(self) -> WorkbookLinkGraph:
+        """Workbook -> external file dependency graph, built on first access after a scan."""
+        graph = self._link_graph
+        if graph is None:
+            store = self._store
+            graph = WorkbookLinkGraph.from_links(store)
+            with self._lock:
+                if self._store is store:
+                    self._link_graph = graph
+        return graph
+        
+    def scan_open_workbooks(self) -> Tuple[LinkStore, Dict[str, int]]:
         """
         Scan all open Excel workbooks for external links.
         
+        Links go into a new LinkStore. When the scan finishes, its search
+        index is built and both replace the previous store and index in one
+        step, so a concurrent search sees either the old pair or the new one.
+        Views handed out from the previous scan keep pointing at intact data.
+        
         Returns:
             Tuple of (external_links_list, statistics_dict)
         """
-        pythoncom.CoInitialize()
-        self.external_links = []
+        store = LinkStore()
         statistics = {
             'total_workbooks': 0,
             'workbooks_with_links': 0,
             'total_links': 0,
-            'unique_external_files': 0
+            'unique_external_files': 0,
+            'cached_workbooks': 0,
+            'formula_cells': 0,
+            'distinct_formulas': 0,
+            'distinct_formula_ratio': 0.0,
+            'analyzer_cache_hit_ratio': 0.0
         }
         
         try:
-            excel = win32com.client.Dispatch("Excel.Application")
+            get_com_worker().call(self._scan_workbooks, store, statistics, operation="scan_external_links")
+        except Exception as e:
+            print(f"Error scanning external links: {e}")
+        
+        # Build the search index here, off the UI thread
+        search_index = LinkSearchIndex(store)
+        
+        with self._lock:
+            self._store = store
+            self._search_index = search_index
+            self._grouped_links = None
+            self._link_graph = None
+        
+        return store, statistics
+    
+    def _scan_workbooks(self, excel, store: LinkStore, statistics: Dict[str, int]):
+        """
+        Scan every open workbook (runs on the COM worker thread).
+        
+        Unchanged workbooks reuse their links from the scan cache.
+        
+        Args:
+            excel: Excel Application proxy owned by the COM worker
+            store: New link store filled by this scan
+            statistics: Statistics dictionary updated in place
+        """
+        try:
+            scanner = FormulaScanner()
+            scan_cache = get_scan_cache()
             workbooks_with_links = set()
             external_files = set()
+            analyzer_before = cached_external_files.cache_info()
             
             for workbook in excel.Workbooks:
                 statistics['total_workbooks'] += 1
                 workbook_name = workbook.Name
-                workbook_links = []
                 
-                # Method 1: Use Excel's LinkSources
-                try:
-                    link_sources = workbook.LinkSources(1)  # xlExcelLinks = 1
-                    if link_sources:
-                        for link_source in link_sources:
-                            external_file = self._extract_filename_from_path(link_source)
-                            link = ExternalLink(
-                                source_workbook=workbook_name,
-                                source_sheet='',
-                                source_cell='',
-                                target_file=external_file,
-                                formula=f'LinkSource: {link_source}',
-                                link_type='LinkSource'
-                            )
-                            workbook_links.append(link)
-                            external_files.add(external_file)
-                except:
-                    pass
-                
-                # Method 2: Scan formulas for external references
-                try:
-                    for worksheet in workbook.Worksheets:
-                        sheet_name = worksheet.Name
-                        
-                        # Get used range to avoid scanning empty cells
-                        used_range = worksheet.UsedRange
-                        if used_range:
-                            for cell in used_range.Cells:
-                                try:
-                                    if cell.HasFormula:
-                                        formula = cell.Formula
-                                        # Check for external references
-                                        if self._has_external_reference(formula):
-                                            external_files_in_formula = self._extract_external_files_from_formula(formula)
-                                            for ext_file in external_files_in_formula:
-                                                # Check for duplicates
-                                                if not self._is_duplicate_link(workbook_links, sheet_name, cell.Address, ext_file):
-                                                    link = ExternalLink(
-                                                        source_workbook=workbook_name,
-                                                        source_sheet=sheet_name,
-                                                        source_cell=cell.Address,
-                                                        target_file=ext_file,
-                                                        formula=formula,
-                                                        link_type='Formula'
-                                                    )
-                                                    workbook_links.append(link)
-                                                    external_files.add(ext_file)
-                                except:
-                                    continue
-                except:
-                    continue
+                full_name, signature = scan_cache.signature(workbook)
+                if signature is not None:
+                    signature += (self.compress_ranges,)
+                workbook_links = scan_cache.get(full_name, signature)
+                if workbook_links is not None:
+                    statistics['cached_workbooks'] += 1
+                else:
+                    try:
+                        workbook_links = LinkStore(self._scan_workbook(workbook, workbook_name, scanner))
+                    except:
+                        continue
+                    scan_cache.put(full_name, signature, workbook_links)
                 
                 # Add workbook links to main list
                 if workbook_links:
                     workbooks_with_links.add(workbook_name)
-                    self.external_links.extend(workbook_links)
+                    store.extend(workbook_links)
+                    external_files.update(workbook_links.pool[target_id]
+                                          for target_id in workbook_links.column('target_file'))
                 
             # Update statistics
             statistics['workbooks_with_links'] = len(workbooks_with_links)
-            statistics['total_links'] = len(self.external_links)
+            statistics['total_links'] = len(store)
             statistics['unique_external_files'] = len(external_files)
+            self._update_formula_statistics(statistics, scanner, analyzer_before)
             
         except Exception as e:
             print(f"Error scanning external links: {e}")
-        finally:
-            pythoncom.CoUninitialize()
+    
+    def _scan_workbook(self, workbook, workbook_name: str, scanner: FormulaScanner) -> List[ExternalLink]:
+        """
+        Scan one workbook for external links.
+        
+        Args:
+            workbook: Excel workbook COM object
+            workbook_name: Workbook name
+            scanner: Bulk formula scanner
+            
+        Returns:
+            List of external links found in the workbook
+        """
+        workbook_links = []
+        
+        # Method 1: Use Excel's LinkSources
+        try:
+            link_sources = workbook.LinkSources(1)  # xlExcelLinks = 1
+            if link_sources:
+                for link_source in link_sources:
+                    external_file = self._extract_filename_from_path(link_source)
+                    link = ExternalLink(
+                        source_workbook=workbook_name,
+                        source_sheet='',
+                        source_cell='',
+                        target_file=external_file,
+                        formula=f'LinkSource: {link_source}',
+                        link_type='LinkSource'
+                    )
+                    workbook_links.append(link)
+        except:
+            pass
+        
+        # Method 2: Scan formulas for external references
+        seen_keys = {link.key for link in workbook_links}
+        for worksheet in workbook.Worksheets:
+            for link in self._scan_sheet_formulas(worksheet, workbook_name, scanner):
+                # Check for duplicates
+                if link.key not in seen_keys:
+                    seen_keys.add(link.key)
+                    workbook_links.append(link)
+        
+        return workbook_links
+    
+    def _scan_sheet_formulas(self, worksheet, workbook_name: str, scanner: FormulaScanner) -> List[ExternalLink]:
+        """
+        Scan one worksheet for formula links.
+        
+        Formulas are fetched in bulk in R1C1 notation and grouped by text, so
+        a formula filled down thousands of rows is analyzed once. Matching
+        cells are confirmed per contiguous run and the displayed (A1) formula
+        is fetched only for the area of each block that contains matches.
+        
+        Args:
+            worksheet: Excel worksheet COM object
+            workbook_name: Workbook name
+            scanner: Bulk formula scanner
+            
+        Returns:
+            List of formula links in row-major order
+        """
+        sheet_name = worksheet.Name
+        groups, blocks = scanner.group_formulas(worksheet)
         
-        # Group links by external file
-        self._group_links_by_external_file()
+        # Analyze each distinct formula once
+        candidates = []
+        for r1c1_formula, cells in groups.items():
+            formula_files = cached_external_files(r1c1_formula)
+            if not formula_files:
+                continue
+            for run in formula_runs(cells):
+                rows = scanner.confirm_run(worksheet, run)
+                if self.compress_ranges:
+                    for confirmed in formula_runs([(row, run.col) for row in rows]):
+                        candidates.append((confirmed.first_row, confirmed.col, confirmed.last_row, formula_files))
+                else:
+                    candidates.extend((row, run.col, row, formula_files) for row in rows)
+        if not candidates:
+            return []
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
         
-        return self.external_links, statistics
+        display_formulas = self._read_display_formulas(
+            worksheet, scanner, blocks, [(row, col) for row, col, _, _ in candidates]
+        )
+        
+        links = []
+        for first_row, col, last_row, formula_files in candidates:
+            address = range_address(first_row, col, last_row, col)
+            formula = display_formulas.get((first_row, col), '')
+            for ext_file in formula_files:
+                links.append(ExternalLink(
+                    source_workbook=workbook_name,
+                    source_sheet=sheet_name,
+                    source_cell=address,
+                    target_file=ext_file,
+                    formula=formula,
+                    link_type='Formula'
+                ))
+        return links
+    
+    def _read_display_formulas(self, worksheet, scanner: FormulaScanner, blocks: List[Tuple[int, int, int, int]],
+                               cells: List[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+        """
+        Fetch the A1 formulas of the given cells.
+        
+        Cells are bucketed into their row blocks in one pass, and each block
+        with matches costs one COM call covering only the bounding box of its
+        matching cells rather than the whole block.
+        
+        Args:
+            worksheet: Excel worksheet COM object
+            scanner: Bulk formula scanner
+            blocks: Fetched block bounds (first_row, first_col, last_row, last_col), top to bottom
+            cells: (row, col) cells sorted by row
+            
+        Returns:
+            Dictionary of (row, col) to A1 formula
+        """
+        buckets: List[List[Tuple[int, int]]] = [[] for _ in blocks]
+        block_index = 0
+        for row, col in cells:
+            while block_index < len(blocks) and row > blocks[block_index][2]:
+                block_index += 1
+            if block_index == len(blocks):
+                break
+            if row >= blocks[block_index][0]:
+                buckets[block_index].append((row, col))
+        
+        formulas = {}
+        for block_cells in buckets:
+            if not block_cells:
+                continue
+            first_row, last_row = block_cells[0][0], block_cells[-1][0]
+            first_col = min(col for _, col in block_cells)
+            last_col = max(col for _, col in block_cells)
+            rows = scanner.read_range(worksheet, first_row, first_col, last_row, last_col)
+            for row, col in block_cells:
+                try:
+                    formulas[(row, col)] = rows[row - first_row][col - first_col]
+                except IndexError:
+                    continue
+        return formulas
+    
+    def _update_formula_statistics(self, statistics: Dict, scanner: FormulaScanner, analyzer_before):
+        """Add formula de-duplication and analyzer cache ratios to the scan statistics."""
+        formula_cells = scanner.stats['formula_cells']
+        distinct_formulas = scanner.stats['distinct_formulas']
+        analyzer_after = cached_external_files.cache_info()
+        hits = analyzer_after.hits - analyzer_before.hits
+        lookups = hits + analyzer_after.misses - analyzer_before.misses
+        
+        statistics['formula_cells'] = formula_cells
+        statistics['distinct_formulas'] = distinct_formulas
+        statistics['distinct_formula_ratio'] = distinct_formulas / formula_cells if formula_cells else 0.0
+        statistics['analyzer_cache_hit_ratio'] = hits / lookups if lookups else 0.0
     
     def _extract_filename_from_path(self, file_path: str) -> str:
         """Extract filename from full path."""
@@ -151,123 +429,69 @@ class ExternalLinksManager:
     
     def _has_external_reference(self, formula: str) -> bool:
         """Check if formula contains external references."""
-        return '[' in formula and ']' in formula and any(ext in formula.lower() for ext in ['.xlsx', '.xls', '.xlsm'])
+        return has_external_reference(formula)
     
     def _extract_external_files_from_formula(self, formula: str) -> List[str]:
-        """Extract external file names from a formula."""
-        external_files = []
-        # Pattern to match [filename.xlsx] or [path\filename.xlsx]
-        pattern = r'\[([^\]]+\.xlsx?m?)\]'
-        matches = re.findall(pattern, formula, re.IGNORECASE)
-        
-        for match in matches:
-            filename = self._extract_filename_from_path(match)
-            external_files.append(filename)
-        
-        return list(set(external_files))  # Remove duplicates
+        """Extract distinct external file names from a formula."""
+        return external_files_in_formula(formula)
     
-    def _is_duplicate_link(self, existing_links: List[ExternalLink], sheet: str, cell: str, target_file: str) -> bool:
-        """Check if a link already exists to avoid duplicates."""
-        for link in existing_links:
-            if (link.source_sheet == sheet and 
-                link.source_cell == cell and 
-                link.target_file == target_file):
-                return True
-        return False
-    
-    def _group_links_by_external_file(self):
-        """Group external links by target external file."""
-        self.grouped_links = {}
-        file_groups = defaultdict(list)
-        
-        # Group links by external file
-        for link in self.external_links:
-            file_groups[link.target_file].append(link)
-        
-        # Create ExternalFileGroup objects
-        for external_file, links in file_groups.items():
-            self.grouped_links[external_file] = ExternalFileGroup(
-                external_file=external_file,
-                links=links,
-                reference_count=len(links)
-            )
-    
-    def search_links(self, keyword: str, search_field: str = 'external_file') -> List[ExternalLink]:
+    def search_links(self, keyword: str, search_field: str = 'external_file',
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> Sequence[ExternalLink]:
         """
         Search external links by keyword in specified field.
         
+        Uses the trigram search index built after the scan; the index and
+        the store it covers are read together, so a query running during a
+        rescan answers from one consistent scan.
+        
         Args:
             keyword: Search keyword
-            search_field: Field to search in ('external_file', 'formula', 'source_workbook', 'all')
+            search_field: Field to search in ('external_file', 'formula', 'source_workbook',
+                'source_sheet', 'all')
+            is_cancelled: Optional callback polled during the lookup; a
+                superseded query stops early with SearchCancelled
             
         Returns:
-            List of matching external links
+            Matching external links, in scan order
         """
+        search_index = self._search_index
         if not keyword:
-            return self.external_links
-        
-        keyword_lower = keyword.lower()
-        results = []
-        
-        for link in self.external_links:
-            match = False
-            
-            if search_field == 'external_file':
-                match = keyword_lower in link.target_file.lower()
-            elif search_field == 'formula':
-                match = keyword_lower in link.formula.lower()
-            elif search_field == 'source_workbook':
-                match = keyword_lower in link.source_workbook.lower()
-            elif search_field == 'all':
-                match = (keyword_lower in link.target_file.lower() or
-                        keyword_lower in link.formula.lower() or
-                        keyword_lower in link.source_workbook.lower())
-            
-            if match:
-                results.append(link)
-        
-        return results
+            return search_index.store
+        return search_index.search(keyword, search_field, is_cancelled)
     
-    def get_grouped_search_results(self, keyword: str, search_field: str = 'external_file') -> Dict[str, ExternalFileGroup]:
+    def get_grouped_search_results(self, keyword: str, search_field: str = 'external_file',
+                                   is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, ExternalFileGroup]:
         """
         Get search results grouped by external file.
         
         Args:
             keyword: Search keyword
             search_field: Field to search in
+            is_cancelled: Optional cancel callback (see search_links)
             
         Returns:
             Dictionary of external file groups matching the search
         """
-        matching_links = self.search_links(keyword, search_field)
+        if not keyword:
+            return self.grouped_links
         
         # Group matching links by external file
-        file_groups = defaultdict(list)
-        for link in matching_links:
-            file_groups[link.target_file].append(link)
-        
-        # Create grouped results
-        grouped_results = {}
-        for external_file, links in file_groups.items():
-            grouped_results[external_file] = ExternalFileGroup(
-                external_file=external_file,
-                links=links,
-                reference_count=len(links)
-            )
-        
-        return grouped_results
+        results = self.search_links(keyword, search_field, is_cancelled)
+        if is_cancelled is not None and is_cancelled():
+            raise SearchCancelled()
+        return results.group_by_external_file()
     
     def get_statistics(self) -> Dict[str, int]:
         """Get statistics about external links."""
-        unique_external_files = len(set(link.target_file for link in self.external_links))
-        unique_source_workbooks = len(set(link.source_workbook for link in self.external_links))
+        store = self._store
+        link_types = Counter(store.pool[type_id] for type_id in store.column('link_type'))
         
         return {
-            'total_links': len(self.external_links),
-            'unique_external_files': unique_external_files,
-            'unique_source_workbooks': unique_source_workbooks,
-            'link_sources': len([link for link in self.external_links if link.link_type == 'LinkSource']),
-            'formula_links': len([link for link in self.external_links if link.link_type == 'Formula'])
+            'total_links': len(store),
+            'unique_external_files': len(set(store.column('target_file'))),
+            'unique_source_workbooks': len(set(store.column('source_workbook'))),
+            'link_sources': link_types['LinkSource'],
+            'formula_links': link_types['Formula']
         }
     
     def export_to_dict(self) -> List[Dict]:
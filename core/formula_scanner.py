@@ -0,0 +1,301 @@
+"""
+Formula Scanner for Excel Session Manager
+
+This module reads worksheet formulas from Excel in bulk. Instead of asking
+COM for HasFormula, Formula and Address on every cell, it fetches the used
+range (or bounded row blocks of it for very large sheets) as a single 2D
+array and computes cell addresses locally from the range origin.
+
+Formulas can also be read in R1C1 notation, where a formula filled down a
+column has the same text in every cell, and grouped by that text so each
+distinct formula only has to be analyzed once.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+
+# Largest number of cells fetched in one COM call. Sheets above this size are
+# read in row blocks so a single transfer never has to marshal the whole sheet.
+DEFAULT_MAX_BLOCK_CELLS = 250000
+
+
+FormulaBlock = namedtuple("FormulaBlock", ["first_row", "first_col", "rows"])
+
+# Contiguous single-column run of cells sharing one R1C1 formula
+FormulaRun = namedtuple("FormulaRun", ["col", "first_row", "last_row"])
+
+
+@lru_cache(maxsize=4096)
+def column_letter(col: int) -> str:
+    """
+    Convert a 1-based column number to its Excel column letters.
+
+    Args:
+        col: Column number (1 = A)
+
+    Returns:
+        Column letters (e.g., 'A', 'AB')
+    """
+    letters = ""
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def cell_address(row: int, col: int) -> str:
+    """
+    Build an absolute A1 address, matching the default of Range.Address.
+
+    Args:
+        row: 1-based row number
+        col: 1-based column number
+
+    Returns:
+        Address string (e.g., '$B$7')
+    """
+    return f"${column_letter(col)}${row}"
+
+
+def range_address(first_row: int, first_col: int, last_row: int, last_col: int) -> str:
+    """
+    Build an absolute A1 address for a rectangular range.
+
+    Args:
+        first_row: 1-based top row
+        first_col: 1-based left column
+        last_row: 1-based bottom row
+        last_col: 1-based right column
+
+    Returns:
+        Address string (e.g., '$C$2:$C$500'), or a single cell address
+    """
+    if first_row == last_row and first_col == last_col:
+        return cell_address(first_row, first_col)
+    return f"{cell_address(first_row, first_col)}:{cell_address(last_row, last_col)}"
+
+
+def formula_runs(cells: List[Tuple[int, int]]) -> List[FormulaRun]:
+    """
+    Compress cells into contiguous vertical runs.
+
+    Args:
+        cells: (row, col) tuples
+
+    Returns:
+        FormulaRun tuples ordered by column, then first row
+    """
+    runs = []
+    for row, col in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+        if runs and runs[-1].col == col and runs[-1].last_row == row - 1:
+            runs[-1] = runs[-1]._replace(last_row=row)
+        else:
+            runs.append(FormulaRun(col, row, row))
+    return runs
+
+
+def _as_rows(value) -> List[Tuple]:
+    """Normalize a COM range value to a list of row tuples."""
+    # A single-cell range comes back as a scalar, larger ranges as tuples of tuples
+    if isinstance(value, (tuple, list)):
+        return [row if isinstance(row, (tuple, list)) else (row,) for row in value]
+    return [(value,)]
+
+
+class FormulaScanner:
+    """
+    Bulk reader for worksheet formulas.
+
+    Fetches formula text as 2D arrays and yields only the cells that hold
+    formulas, keeping the number of COM round-trips proportional to the
+    number of blocks rather than the number of cells.
+    """
+
+    def __init__(self, max_block_cells: int = DEFAULT_MAX_BLOCK_CELLS):
+        """
+        Initialize the formula scanner.
+
+        Args:
+            max_block_cells: Maximum cells fetched per COM call
+        """
+        self.max_block_cells = max(1, max_block_cells)
+        self.stats = {
+            'blocks_fetched': 0,
+            'cells_read': 0,
+            'formula_cells': 0,
+            'distinct_formulas': 0
+        }
+
+    def read_blocks(self, worksheet, formula_property: str = 'Formula') -> Iterator[FormulaBlock]:
+        """
+        Read the used range of a worksheet as one or more 2D blocks.
+
+        Args:
+            worksheet: Excel worksheet COM object
+            formula_property: Range property to fetch ('Formula' or 'FormulaR1C1')
+
+        Yields:
+            FormulaBlock tuples of (first_row, first_col, rows)
+        """
+        used_range = worksheet.UsedRange
+        if not used_range:
+            return
+
+        first_row = used_range.Row
+        first_col = used_range.Column
+        row_count = used_range.Rows.Count
+        col_count = used_range.Columns.Count
+
+        if row_count * col_count <= self.max_block_cells:
+            rows = _as_rows(getattr(used_range, formula_property))
+            self._record_block(rows)
+            yield FormulaBlock(first_row, first_col, rows)
+            return
+
+        # Huge sheet: fetch bounded row blocks spanning the full used width
+        block_rows = max(1, self.max_block_cells // col_count)
+        last_row = first_row + row_count - 1
+        last_col = first_col + col_count - 1
+
+        for block_start in range(first_row, last_row + 1, block_rows):
+            block_end = min(block_start + block_rows - 1, last_row)
+            block_range = worksheet.Range(
+                worksheet.Cells(block_start, first_col),
+                worksheet.Cells(block_end, last_col)
+            )
+            rows = _as_rows(getattr(block_range, formula_property))
+            self._record_block(rows)
+            yield FormulaBlock(block_start, first_col, rows)
+
+    def iter_formulas(self, worksheet) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield every formula cell of a worksheet.
+
+        Args:
+            worksheet: Excel worksheet COM object
+
+        Yields:
+            Tuples of (row, column, formula)
+        """
+        for block in self.read_blocks(worksheet):
+            for row_offset, row_values in enumerate(block.rows):
+                row = block.first_row + row_offset
+                for col_offset, value in enumerate(row_values):
+                    if isinstance(value, str) and value.startswith('='):
+                        self.stats['formula_cells'] += 1
+                        yield row, block.first_col + col_offset, value
+
+    def group_formulas(self, worksheet) -> Tuple[Dict[str, List[Tuple[int, int]]], List[Tuple[int, int, int, int]]]:
+        """
+        Read a worksheet in R1C1 notation and group cells by formula text.
+
+        Copies of a formula filled down or across share the same R1C1 text,
+        so the number of groups is the number of distinct formulas.
+
+        Args:
+            worksheet: Excel worksheet COM object
+
+        Returns:
+            Tuple of (groups, blocks): groups maps R1C1 text to its (row, col)
+            cells in row-major order; blocks lists the fetched block bounds as
+            (first_row, first_col, last_row, last_col)
+        """
+        groups: Dict[str, List[Tuple[int, int]]] = {}
+        blocks = []
+        for block in self.read_blocks(worksheet, 'FormulaR1C1'):
+            width = max((len(row_values) for row_values in block.rows), default=1)
+            blocks.append((block.first_row, block.first_col,
+                           block.first_row + len(block.rows) - 1, block.first_col + width - 1))
+            for row_offset, row_values in enumerate(block.rows):
+                row = block.first_row + row_offset
+                for col_offset, value in enumerate(row_values):
+                    if isinstance(value, str) and value.startswith('='):
+                        self.stats['formula_cells'] += 1
+                        cells = groups.get(value)
+                        if cells is None:
+                            cells = groups[value] = []
+                        cells.append((row, block.first_col + col_offset))
+        self.stats['distinct_formulas'] += len(groups)
+        return groups, blocks
+
+    def read_range(self, worksheet, first_row: int, first_col: int, last_row: int, last_col: int,
+                   formula_property: str = 'Formula') -> List[Tuple]:
+        """
+        Fetch the formulas of a rectangular range in one COM call.
+
+        Args:
+            worksheet: Excel worksheet COM object
+            first_row: 1-based top row
+            first_col: 1-based left column
+            last_row: 1-based bottom row
+            last_col: 1-based right column
+            formula_property: Range property to fetch ('Formula' or 'FormulaR1C1')
+
+        Returns:
+            List of row tuples
+        """
+        block_range = worksheet.Range(
+            worksheet.Cells(first_row, first_col),
+            worksheet.Cells(last_row, last_col)
+        )
+        rows = _as_rows(getattr(block_range, formula_property))
+        self._record_block(rows)
+        return rows
+
+    def confirm_run(self, worksheet, run: FormulaRun) -> List[int]:
+        """
+        Confirm through COM which cells of a run really hold formulas.
+
+        Range.HasFormula answers for the whole run in one call; only a mixed
+        run (text constants among formulas) is checked cell by cell.
+
+        Args:
+            worksheet: Excel worksheet COM object
+            run: Single-column run of candidate cells
+
+        Returns:
+            Rows of the run that have formulas
+        """
+        if run.first_row == run.last_row:
+            return [run.first_row] if self.confirm_formula(worksheet, run.first_row, run.col) else []
+        try:
+            has_formula = worksheet.Range(
+                worksheet.Cells(run.first_row, run.col),
+                worksheet.Cells(run.last_row, run.col)
+            ).HasFormula
+        except Exception:
+            has_formula = None
+        if has_formula is True:
+            return list(range(run.first_row, run.last_row + 1))
+        if has_formula is False:
+            return []
+        return [row for row in range(run.first_row, run.last_row + 1)
+                if self.confirm_formula(worksheet, row, run.col)]
+
+    @staticmethod
+    def confirm_formula(worksheet, row: int, col: int) -> bool:
+        """
+        Confirm through COM that a candidate cell really holds a formula.
+
+        Text constants entered with a leading apostrophe can look like
+        formulas in the bulk array, so matched cells are checked once.
+
+        Args:
+            worksheet: Excel worksheet COM object
+            row: 1-based row number
+            col: 1-based column number
+
+        Returns:
+            True if the cell has a formula
+        """
+        try:
+            return bool(worksheet.Cells(row, col).HasFormula)
+        except Exception:
+            return False
+
+    def _record_block(self, rows: List[Tuple]):
+        """Update block statistics."""
+        self.stats['blocks_fetched'] += 1
+        self.stats['cells_read'] += sum(len(row) for row in rows)
@@ -0,0 +1,360 @@
+"""
+External Link Crawler for Excel Session Manager
+
+This module walks a directory tree of closed workbooks, parses their
+external links in a process pool with OfflineLinkParser and keeps the
+results in a local SQLite index. Files are keyed by (path, size, mtime_ns),
+so a re-crawl only re-parses workbooks that changed since the last run.
+Paths are compared in the platform's normal case, so 'D:\\Share' and
+'d:\\share' are the same folder on Windows. Workbooks that failed to parse
+are stored without a signature and retried on the next crawl.
+
+Usage:
+    python -m core.link_crawler <folder> [--index FILE] [--workers N] [--full]
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.offline_link_parser import OfflineLinkParser, OFFLINE_EXTENSIONS
+from models.external_link import ExternalLink
+
+
+# Number of parsed files written to SQLite per transaction
+_COMMIT_BATCH_SIZE = 200
+
+# Print a progress line every this many files
+_PROGRESS_INTERVAL = 500
+
+# Bumped when the table layout changes; older index files are rebuilt
+_SCHEMA_VERSION = 1
+
+
+def _path_key(path: str) -> str:
+    """Comparison key of a file path (case-folded on Windows, like the file system)."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _parse_file(path: str) -> Tuple[str, List[Tuple[str, str, str, str, str]], Optional[str]]:
+    """
+    Parse one workbook in a worker process.
+
+    Returns plain tuples instead of ExternalLink objects to keep the
+    inter-process payload small.
+    """
+    try:
+        links = OfflineLinkParser().parse_workbook(path)
+    except Exception as e:
+        return path, [], str(e)
+    return path, [
+        (link.source_sheet, link.source_cell, link.target_file, link.formula, link.link_type)
+        for link in links
+    ], None
+
+
+class LinkIndex:
+    """
+    SQLite store of crawled external links.
+
+    Holds one row per workbook with its size/mtime signature and the links
+    parsed from it. Rows are keyed by ``_path_key``; the path as found on
+    disk is kept for display.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the link index.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables and indexes, rebuilding an index file written by an older layout."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            # The index is a cache of the crawled files; the next crawl refills it
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS links;
+                DROP TABLE IF EXISTS files;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path_key TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER,
+                mtime_ns INTEGER,
+                scanned_at TEXT NOT NULL,
+                link_count INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                path_key TEXT NOT NULL,
+                path TEXT NOT NULL,
+                source_sheet TEXT,
+                source_cell TEXT,
+                target_file TEXT,
+                formula TEXT,
+                link_type TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_links_path ON links(path_key);
+            CREATE INDEX IF NOT EXISTS idx_links_target ON links(target_file);
+        """)
+        self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def signatures(self, root: str) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+        """
+        Load the stored (size, mtime_ns) signatures under a folder.
+
+        Args:
+            root: Folder path prefix
+
+        Returns:
+            Dictionary of path key to (size, mtime_ns); (None, None) for
+            workbooks whose last parse failed
+        """
+        prefix = os.path.join(_path_key(root), '')
+        rows = self.conn.execute(
+            "SELECT path_key, size, mtime_ns FROM files WHERE substr(path_key, 1, ?) = ?",
+            (len(prefix), prefix)
+        )
+        return {key: (size, mtime_ns) for key, size, mtime_ns in rows}
+
+    def store_file(self, path: str, size: int, mtime_ns: int,
+                   links: List[Tuple[str, str, str, str, str]], error: Optional[str] = None):
+        """
+        Replace the stored links of one workbook (caller commits).
+
+        Args:
+            path: Workbook path
+            size: File size in bytes
+            mtime_ns: Modification time in nanoseconds
+            links: Link tuples (sheet, cell, target_file, formula, link_type)
+            error: Parse error message, if any; the file is then stored
+                without a signature so the next crawl retries it
+        """
+        key = _path_key(path)
+        if error:
+            size = mtime_ns = None
+        self.conn.execute("DELETE FROM links WHERE path_key = ?", (key,))
+        self.conn.executemany(
+            "INSERT INTO links (path_key, path, source_sheet, source_cell, target_file, formula, link_type) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((key, path) + link for link in links)
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path_key, path, size, mtime_ns, scanned_at, link_count, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, path, size, mtime_ns, datetime.now().isoformat(timespec='seconds'), len(links), error)
+        )
+
+    def remove_files(self, keys: List[str]):
+        """Remove workbooks that no longer exist, by path key (caller commits)."""
+        for key in keys:
+            self.conn.execute("DELETE FROM links WHERE path_key = ?", (key,))
+            self.conn.execute("DELETE FROM files WHERE path_key = ?", (key,))
+
+    def commit(self):
+        """Commit pending changes."""
+        self.conn.commit()
+
+    def iter_links(self, target_file: Optional[str] = None) -> Iterator[ExternalLink]:
+        """
+        Iterate stored links as ExternalLink records.
+
+        Args:
+            target_file: Optional external file name to filter on
+
+        Yields:
+            ExternalLink records
+        """
+        query = "SELECT path, source_sheet, source_cell, target_file, formula, link_type FROM links"
+        params = ()
+        if target_file:
+            query += " WHERE target_file = ? COLLATE NOCASE"
+            params = (target_file,)
+        for path, sheet, cell, target, formula, link_type in self.conn.execute(query, params):
+            yield ExternalLink(
+                source_workbook=os.path.basename(path),
+                source_sheet=sheet or '',
+                source_cell=cell or '',
+                target_file=target or '',
+                formula=formula or '',
+                link_type=link_type or ''
+            )
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+class LinkCrawler:
+    """
+    Parallel, incremental crawler for external links in a folder tree.
+    """
+
+    def __init__(self, index_path: str, workers: Optional[int] = None):
+        """
+        Initialize the crawler.
+
+        Args:
+            index_path: Path to the SQLite link index
+            workers: Number of parser processes (default: CPU count; 1 parses in-process)
+        """
+        self.index = LinkIndex(index_path)
+        self.workers = workers or os.cpu_count() or 1
+
+    def iter_workbooks(self, root: str) -> Iterator[Tuple[str, int, int]]:
+        """
+        Walk a folder tree for workbooks that can be parsed offline.
+
+        Args:
+            root: Folder to walk
+
+        Yields:
+            Tuples of (path, size, mtime_ns)
+        """
+        pending = [os.path.abspath(root)]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif (entry.name.lower().endswith(OFFLINE_EXTENSIONS)
+                          and not entry.name.startswith('~$')):
+                        stat = entry.stat()
+                        yield entry.path, stat.st_size, stat.st_mtime_ns
+                except OSError:
+                    continue
+
+    def crawl(self, root: str, full: bool = False, print_func: Optional[Callable] = None) -> Dict:
+        """
+        Crawl a folder tree and update the link index.
+
+        Args:
+            root: Folder to crawl
+            full: Re-parse every workbook even if unchanged
+            print_func: Optional function to print progress messages
+
+        Returns:
+            Statistics dictionary
+        """
+        def print_msg(msg):
+            if print_func:
+                print_func(msg)
+            else:
+                print(msg)
+
+        t0 = time.time()
+        stored = self.index.signatures(root)
+        known = {} if full else stored
+        stale = set(stored)
+
+        to_parse: Dict[str, Tuple[int, int]] = {}
+        files_seen = 0
+        for path, size, mtime_ns in self.iter_workbooks(root):
+            files_seen += 1
+            key = _path_key(path)
+            stale.discard(key)
+            if known.get(key) != (size, mtime_ns):
+                to_parse[path] = (size, mtime_ns)
+
+        print_msg(f"Found {files_seen} workbook(s), {len(to_parse)} new or changed")
+
+        stats = {
+            'files_seen': files_seen,
+            'files_parsed': 0,
+            'files_unchanged': files_seen - len(to_parse),
+            'files_failed': 0,
+            'files_removed': len(stale),
+            'links_found': 0,
+            'workers': self.workers
+        }
+
+        parse_start = time.time()
+        for path, links, error in self._parse_all(list(to_parse)):
+            size, mtime_ns = to_parse[path]
+            self.index.store_file(path, size, mtime_ns, links, error)
+            stats['files_parsed'] += 1
+            stats['links_found'] += len(links)
+            if error:
+                stats['files_failed'] += 1
+            if stats['files_parsed'] % _COMMIT_BATCH_SIZE == 0:
+                self.index.commit()
+            if stats['files_parsed'] % _PROGRESS_INTERVAL == 0:
+                rate = stats['files_parsed'] / max(time.time() - parse_start, 1e-9)
+                print_msg(f"  Parsed {stats['files_parsed']}/{len(to_parse)} ({rate:.1f} files/sec)")
+
+        self.index.remove_files(sorted(stale))
+        self.index.commit()
+
+        stats['elapsed_seconds'] = time.time() - t0
+        parse_seconds = time.time() - parse_start
+        stats['files_per_second'] = stats['files_parsed'] / parse_seconds if parse_seconds > 0 else 0.0
+
+        print_msg(f"Crawl complete: {stats['files_parsed']} parsed, {stats['files_unchanged']} unchanged, "
+                  f"{stats['files_failed']} failed, {stats['files_removed']} removed, "
+                  f"{stats['links_found']} links")
+        print_msg(f"Elapsed: {stats['elapsed_seconds']:.2f} sec, "
+                  f"{stats['files_per_second']:.1f} files/sec with {self.workers} worker(s)")
+        return stats
+
+    def _parse_all(self, paths: List[str]):
+        """Parse workbooks in a process pool (or in-process for one worker)."""
+        if not paths:
+            return
+        if self.workers <= 1 or len(paths) == 1:
+            for path in paths:
+                yield _parse_file(path)
+            return
+        chunksize = max(1, min(32, len(paths) // (self.workers * 4)))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(_parse_file, paths, chunksize=chunksize)
+
+    def close(self):
+        """Close the link index."""
+        self.index.close()
+
+
+def main(argv=None):
+    """Command line entry point for the crawler."""
+    from config.settings import settings
+
+    parser = argparse.ArgumentParser(description="Crawl a folder tree for Excel external links.")
+    parser.add_argument("root", help="Folder to crawl")
+    parser.add_argument("--index", default=settings.link_index_file, help="SQLite index file")
+    parser.add_argument("--workers", type=int, default=settings.crawler_workers,
+                        help="Number of parser processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="Re-parse every workbook")
+    args = parser.parse_args(argv)
+
+    crawler = LinkCrawler(args.index, workers=args.workers)
+    try:
+        crawler.crawl(args.root, full=args.full)
+    finally:
+        crawler.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
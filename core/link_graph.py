@@ -0,0 +1,329 @@
+"""
+Workbook Link Graph for Excel Session Manager
+
+This module turns external link scan results into a directed graph of
+workbook -> source file edges. Forward and reverse adjacency are both kept,
+so "what does X read from" and "who depends on X" are index lookups rather
+than rescans, and transitive closures walk only the affected part of the
+graph.
+
+Workbooks are interned to integer ids keyed by their normalized path (see
+normalize_workbook_path), so the same file spelled with different case or
+separators is one node.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from core.workbook_index import normalize_workbook_path
+from models.external_link import ExternalLink
+
+
+class WorkbookLinkGraph:
+    """
+    Directed dependency graph between workbooks.
+
+    An edge A -> B means workbook A has external links into B, so B is
+    upstream of A and must be current before A is recalculated. Node names
+    are returned as they were first added.
+    """
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._sources: List[Set[int]] = []     # node -> files it links to
+        self._dependents: List[Set[int]] = []  # node -> workbooks linking to it
+        self._edge_count = 0
+        self._components: Optional[List[List[int]]] = None
+
+    @classmethod
+    def from_links(cls, links: Iterable[ExternalLink]) -> 'WorkbookLinkGraph':
+        """
+        Build a graph from external link records.
+
+        Args:
+            links: ExternalLink records (a LinkStore is read column-wise)
+
+        Returns:
+            Graph with one edge per distinct (source_workbook, target_file)
+        """
+        graph = cls()
+        if hasattr(links, 'column') and hasattr(links, 'pool'):
+            # LinkStore: collect distinct id pairs before touching any strings
+            pool = links.pool
+            pairs = set(zip(links.column('source_workbook'), links.column('target_file')))
+            for workbook_id, target_id in sorted(pairs):
+                graph.add_link(pool[workbook_id], pool[target_id])
+        else:
+            for link in links:
+                graph.add_link(link.source_workbook, link.target_file)
+        return graph
+
+    @classmethod
+    def from_link_sources(cls, link_sources: Mapping[str, Iterable[str]]) -> 'WorkbookLinkGraph':
+        """
+        Build a graph from Workbook.LinkSources results.
+
+        Args:
+            link_sources: Workbook FullName -> its LinkSources paths
+
+        Returns:
+            Graph containing every workbook, including ones without links
+        """
+        graph = cls()
+        for workbook, sources in link_sources.items():
+            graph.add_node(workbook)
+            for source in sources or ():
+                graph.add_link(workbook, source)
+        return graph
+
+    def add_node(self, name: str) -> int:
+        """
+        Add a workbook node if it is not in the graph yet.
+
+        Args:
+            name: Workbook name or path
+
+        Returns:
+            Node id
+        """
+        key = normalize_workbook_path(name)
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._names)
+            self._names.append(name)
+            self._sources.append(set())
+            self._dependents.append(set())
+            self._components = None
+        return node
+
+    def add_link(self, workbook: str, source: str) -> bool:
+        """
+        Add an edge from a workbook to a file it links to.
+
+        Args:
+            workbook: Linking workbook
+            source: Linked (source) file
+
+        Returns:
+            True if the edge is new
+        """
+        node = self.add_node(workbook)
+        target = self.add_node(source)
+        if target in self._sources[node]:
+            return False
+        self._sources[node].add(target)
+        self._dependents[target].add(node)
+        self._edge_count += 1
+        self._components = None
+        return True
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_workbook_path(name) in self._ids
+
+    @property
+    def edge_count(self) -> int:
+        """Number of distinct workbook -> source edges."""
+        return self._edge_count
+
+    @property
+    def nodes(self) -> List[str]:
+        """All node names in insertion order."""
+        return list(self._names)
+
+    def _node(self, name: str) -> Optional[int]:
+        return self._ids.get(normalize_workbook_path(name))
+
+    def _named(self, nodes: Iterable[int]) -> List[str]:
+        names = self._names
+        return sorted((names[node] for node in nodes), key=str.casefold)
+
+    def sources_of(self, name: str) -> List[str]:
+        """
+        Files a workbook links to directly.
+
+        Args:
+            name: Workbook name or path
+
+        Returns:
+            Sorted source names (empty if the workbook is unknown)
+        """
+        node = self._node(name)
+        return [] if node is None else self._named(self._sources[node])
+
+    def dependents_of(self, name: str) -> List[str]:
+        """
+        Workbooks that link directly to a file, from the reverse index.
+
+        Args:
+            name: File name or path
+
+        Returns:
+            Sorted dependent workbook names (empty if the file is unknown)
+        """
+        node = self._node(name)
+        return [] if node is None else self._named(self._dependents[node])
+
+    def upstream(self, name: str) -> List[str]:
+        """
+        Every file a workbook depends on, directly or transitively.
+
+        Args:
+            name: Workbook name or path
+
+        Returns:
+            Sorted names, excluding the workbook itself unless it is on a cycle
+        """
+        return self._closure(name, self._sources)
+
+    def downstream(self, name: str) -> List[str]:
+        """
+        Every workbook affected by a change to a file, directly or transitively.
+
+        Args:
+            name: File name or path
+
+        Returns:
+            Sorted names, excluding the file itself unless it is on a cycle
+        """
+        return self._closure(name, self._dependents)
+
+    def _closure(self, name: str, adjacency: List[Set[int]]) -> List[str]:
+        """Breadth-first reachability over one adjacency direction."""
+        start = self._node(name)
+        if start is None:
+            return []
+        seen = bytearray(len(self._names))
+        reached = []
+        queue = deque(adjacency[start])
+        for node in queue:
+            seen[node] = 1
+        while queue:
+            node = queue.popleft()
+            reached.append(node)
+            for neighbour in adjacency[node]:
+                if not seen[neighbour]:
+                    seen[neighbour] = 1
+                    queue.append(neighbour)
+        return self._named(reached)
+
+    def _strongly_connected_components(self) -> List[List[int]]:
+        """
+        Strongly connected components (iterative Tarjan).
+
+        Tarjan emits a component only after every component reachable from
+        it, so the result is already ordered upstream first.
+        """
+        if self._components is not None:
+            return self._components
+
+        count = len(self._names)
+        sources = self._sources
+        index_of = [-1] * count
+        low = [0] * count
+        on_stack = bytearray(count)
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+
+        for root in range(count):
+            if index_of[root] != -1:
+                continue
+            index_of[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(sources[root]))]
+
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if index_of[child] == -1:
+                        index_of[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = 1
+                        work.append((child, iter(sources[child])))
+                        break
+                    if on_stack[child] and index_of[child] < low[node]:
+                        low[node] = index_of[child]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                    if low[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            component.append(member)
+                            if member == node:
+                                break
+                        component.sort()
+                        components.append(component)
+
+        self._components = components
+        return components
+
+    def find_cycles(self) -> List[List[str]]:
+        """
+        Find circular link chains.
+
+        Returns:
+            One list of workbook names per cycle (strongly connected group,
+            or a workbook linking to itself)
+        """
+        cycles = []
+        for component in self._strongly_connected_components():
+            node = component[0]
+            if len(component) > 1 or node in self._sources[node]:
+                cycles.append([self._names[member] for member in component])
+        return cycles
+
+    def has_cycles(self) -> bool:
+        """Check whether any circular link chain exists."""
+        return bool(self.find_cycles())
+
+    def topological_order(self) -> List[str]:
+        """
+        Order all nodes so every file comes before the workbooks that link to it.
+
+        Members of a cycle cannot be ordered among themselves; they are kept
+        next to each other (see find_cycles).
+
+        Returns:
+            Node names, upstream first
+        """
+        names = self._names
+        return [names[node] for component in self._strongly_connected_components() for node in component]
+
+    def order_subset(self, names: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Topologically order a subset of nodes, e.g. the open workbooks.
+
+        Args:
+            names: Node names to order
+
+        Returns:
+            (ordered names as given, names not in the graph)
+        """
+        position = {}
+        for rank, component in enumerate(self._strongly_connected_components()):
+            for node in component:
+                position[node] = rank
+        ranked = []
+        unknown = []
+        for sequence, name in enumerate(names):
+            node = self._node(name)
+            if node is None:
+                unknown.append(name)
+            else:
+                ranked.append((position[node], node, sequence, name))
+        ranked.sort()
+        return [entry[3] for entry in ranked], unknown
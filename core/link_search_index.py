@@ -0,0 +1,165 @@
+"""
+Link Search Index for Excel Session Manager
+
+This module provides a trigram inverted index over the scanned external
+links. It is built once after a scan and answers case-insensitive substring
+queries by intersecting the posting lists of the query's trigrams, so a
+search touches only the candidate strings instead of every link.
+
+The index works on the distinct strings of each field (a LinkStore pools
+them), which are far fewer than the links for workbook, sheet and file
+names, and for formulas copied across many cells.
+"""
+
+from array import array
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from models.link_store import LinkStore, LinkStoreView
+
+
+# Search field name (as used by the UI) -> ExternalLink attribute
+SEARCH_FIELDS = {
+    'external_file': 'target_file',
+    'source_workbook': 'source_workbook',
+    'source_sheet': 'source_sheet',
+    'formula': 'formula'
+}
+
+# Length of the indexed n-grams
+NGRAM_SIZE = 3
+
+# Strings checked between two polls of a search's cancel callback
+CANCEL_CHECK_INTERVAL = 4096
+
+
+class SearchCancelled(Exception):
+    """Raised when a search is abandoned because a newer query replaced it."""
+
+
+def _checked(items: Iterable, is_cancelled: Optional[Callable[[], bool]]):
+    """Yield items, polling is_cancelled every CANCEL_CHECK_INTERVAL items."""
+    if is_cancelled is None:
+        yield from items
+        return
+    iterator = iter(items)
+    while True:
+        if is_cancelled():
+            raise SearchCancelled()
+        chunk = list(islice(iterator, CANCEL_CHECK_INTERVAL))
+        if not chunk:
+            return
+        yield from chunk
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Distinct n-grams of a lowercase string."""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class _FieldIndex:
+    """Trigram index over the distinct values of one link field."""
+
+    __slots__ = ('links_by_string', 'lowered', 'postings')
+
+    def __init__(self, store: LinkStore, attribute: str):
+        # Link indices per distinct string id, in store order
+        self.links_by_string: Dict[int, array] = {}
+        for index, string_id in enumerate(store.column(attribute)):
+            indices = self.links_by_string.get(string_id)
+            if indices is None:
+                indices = self.links_by_string[string_id] = array('I')
+            indices.append(index)
+
+        self.lowered: Dict[int, str] = {
+            string_id: store.pool[string_id].lower() for string_id in self.links_by_string
+        }
+
+        # Trigram -> ids of the distinct strings that contain it
+        self.postings: Dict[str, array] = {}
+        for string_id, text in self.lowered.items():
+            for gram in _ngrams(text):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(string_id)
+
+    def matching_strings(self, keyword: str, is_cancelled: Optional[Callable[[], bool]] = None) -> List[int]:
+        """Ids of the distinct strings containing a lowercase keyword."""
+        if len(keyword) < NGRAM_SIZE:
+            # Too short for trigrams: scan the distinct strings only
+            return [string_id for string_id, text in _checked(self.lowered.items(), is_cancelled)
+                    if keyword in text]
+
+        postings = []
+        for gram in _ngrams(keyword):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        # Trigrams can all occur without the keyword itself; verify
+        lowered = self.lowered
+        return [string_id for string_id in _checked(candidates, is_cancelled) if keyword in lowered[string_id]]
+
+
+class LinkSearchIndex:
+    """
+    Trigram inverted index over the links of a LinkStore.
+
+    Covers the external_file, source_workbook, source_sheet and formula
+    fields. The store must not change after the index is built.
+    """
+
+    def __init__(self, store: LinkStore):
+        """
+        Build the index.
+
+        Args:
+            store: Link store to index
+        """
+        self.store = store
+        self._fields = {
+            field: _FieldIndex(store, attribute) for field, attribute in SEARCH_FIELDS.items()
+        }
+
+    def search(self, keyword: str, search_field: str = 'external_file',
+               is_cancelled: Optional[Callable[[], bool]] = None) -> LinkStoreView:
+        """
+        Find links whose field contains a keyword (case-insensitive).
+
+        Args:
+            keyword: Search keyword
+            search_field: 'external_file', 'formula', 'source_workbook',
+                'source_sheet' or 'all'
+            is_cancelled: Optional callback polled during the lookup; when it
+                returns True the search stops with SearchCancelled
+
+        Returns:
+            View of the matching links in store order
+        """
+        keyword = keyword.lower()
+        fields = list(self._fields) if search_field == 'all' else [search_field]
+
+        link_lists = []
+        for field in fields:
+            field_index = self._fields.get(field)
+            if field_index is None:
+                continue
+            for string_id in field_index.matching_strings(keyword, is_cancelled):
+                link_lists.append(field_index.links_by_string[string_id])
+
+        if len(link_lists) == 1:
+            return self.store.view(link_lists[0])
+        if is_cancelled is not None and is_cancelled():
+            raise SearchCancelled()
+
+        # Restore store order and drop links matched through several strings
+        return self.store.view(array('I', sorted(set(chain.from_iterable(link_lists)))))
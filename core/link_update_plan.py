@@ -0,0 +1,233 @@
+"""
+Link Update Plan for Excel Session Manager
+
+This module separates deciding what the link updater will do from doing it.
+An UpdatePlan lists every (workbook, link, decision, reason) in execution
+order and serializes to JSON, so it can be reviewed in a dry run. A
+CheckpointJournal records completed work in a JSON-lines file while the plan
+executes, so an interrupted run can resume without re-checking or
+re-updating what already finished. A journal that is too old, or whose
+unfinished workbooks are no longer open, is closed off instead of resumed.
+"""
+
+import os
+import json
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.workbook_index import normalize_workbook_path
+
+
+# Plan item decisions
+DECISION_UPDATE = 'update'   # Link will be updated
+DECISION_SKIP = 'skip'       # Link checked, no update needed
+DECISION_NONE = 'none'       # Workbook has no external links
+DECISION_ERROR = 'error'     # Workbook links could not be read
+
+# Interrupted runs planned longer ago than this are not resumed
+DEFAULT_RESUME_MAX_AGE_HOURS = 24.0
+
+# Journal record types
+_RECORD_PLAN = 'plan'
+_RECORD_LINK = 'link'
+_RECORD_WORKBOOK = 'workbook'
+_RECORD_COMPLETED = 'completed'
+
+
+@dataclass
+class PlanItem:
+    """One planned decision about a workbook link."""
+    workbook: str
+    link: str
+    decision: str
+    reason: str
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class UpdatePlan:
+    """Ordered link update plan for a set of open workbooks."""
+    items: List[PlanItem] = field(default_factory=list)
+    recalculate: List[str] = field(default_factory=list)  # Workbooks that feed other open workbooks
+    check_days: int = 0
+    created: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+    @property
+    def workbooks(self) -> List[str]:
+        """Workbooks in execution order."""
+        return list(dict.fromkeys(item.workbook for item in self.items))
+
+    def items_for(self, workbook: str) -> List[PlanItem]:
+        """Plan items of one workbook, in plan order."""
+        return [item for item in self.items if item.workbook == workbook]
+
+    @property
+    def update_count(self) -> int:
+        """Number of links the plan will update."""
+        return sum(1 for item in self.items if item.decision == DECISION_UPDATE)
+
+    def to_dict(self) -> Dict:
+        """Convert the plan to JSON-serializable data."""
+        return {
+            'created': self.created,
+            'check_days': self.check_days,
+            'recalculate': list(self.recalculate),
+            'items': [asdict(item) for item in self.items]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'UpdatePlan':
+        """Rebuild a plan from to_dict() data."""
+        return cls(
+            items=[PlanItem(**item) for item in data.get('items', [])],
+            recalculate=list(data.get('recalculate', [])),
+            check_days=int(data.get('check_days', 0)),
+            created=data.get('created', '')
+        )
+
+    def save(self, file_path: str):
+        """
+        Write the plan to a JSON file.
+
+        Args:
+            file_path: Output path
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines journal of an executing UpdatePlan.
+
+    The first record holds the plan; each finished link update and each
+    finished workbook appends one record, flushed immediately. A final
+    'completed' record marks the run as done, so it is not resumed.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialize the journal.
+
+        Args:
+            file_path: Journal file path
+        """
+        self.file_path = file_path
+        self._handle = None
+        # Why the last load_unfinished() closed off a stale run, if it did
+        self.discarded_reason: Optional[str] = None
+
+    def load_unfinished(self, max_age_hours: Optional[float] = None,
+                        open_workbooks: Optional[Iterable[str]] = None,
+                        check_days: Optional[int] = None) -> Optional[Tuple[UpdatePlan, Set[Tuple[str, str]], Set[str]]]:
+        """
+        Read an interrupted run from the journal file.
+
+        A run that no longer applies is marked completed, so it is not
+        offered again, and its reason is kept in ``discarded_reason``.
+
+        Args:
+            max_age_hours: Discard runs planned longer ago than this
+            open_workbooks: Paths of the open workbooks; discard the run if
+                none of its unfinished workbooks is among them
+            check_days: Discard runs planned with a different check period
+
+        Returns:
+            (plan, updated (workbook, link) pairs, finished workbooks), or
+            None if there is no journal, its run completed or was discarded
+        """
+        self.discarded_reason = None
+        if not os.path.exists(self.file_path):
+            return None
+        plan = None
+        updated_links: Set[Tuple[str, str]] = set()
+        finished_workbooks: Set[str] = set()
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut off by a crash; everything before it is intact
+                    break
+                record_type = record.get('type')
+                if record_type == _RECORD_PLAN:
+                    plan = UpdatePlan.from_dict(record['plan'])
+                elif record_type == _RECORD_LINK:
+                    updated_links.add((record['workbook'], record['link']))
+                elif record_type == _RECORD_WORKBOOK:
+                    finished_workbooks.add(record['workbook'])
+                elif record_type == _RECORD_COMPLETED:
+                    return None
+        if plan is None:
+            return None
+
+        reason = self._stale_reason(plan, finished_workbooks, max_age_hours, open_workbooks, check_days)
+        if reason:
+            self.discarded_reason = reason
+            self._handle = open(self.file_path, 'a', encoding='utf-8')
+            self._write({'type': _RECORD_COMPLETED, 'discarded': reason})
+            self.close()
+            return None
+        return plan, updated_links, finished_workbooks
+
+    @staticmethod
+    def _stale_reason(plan: UpdatePlan, finished_workbooks: Set[str], max_age_hours: Optional[float],
+                      open_workbooks: Optional[Iterable[str]], check_days: Optional[int]) -> Optional[str]:
+        """Explain why an interrupted run should not be resumed (None if it can be)."""
+        if max_age_hours is not None:
+            try:
+                age = datetime.now() - datetime.fromisoformat(plan.created)
+            except ValueError:
+                return "its plan has no valid creation time"
+            if age > timedelta(hours=max_age_hours):
+                return f"it was planned at {plan.created}, more than {max_age_hours:g} hour(s) ago"
+        if check_days is not None and plan.check_days != check_days:
+            return f"it was planned for links modified within {plan.check_days} days, not {check_days}"
+        if open_workbooks is not None:
+            open_keys = {normalize_workbook_path(path) for path in open_workbooks}
+            remaining = [workbook for workbook in plan.workbooks if workbook not in finished_workbooks]
+            if not any(normalize_workbook_path(workbook) in open_keys for workbook in remaining):
+                return "none of its unfinished workbooks is open"
+        return None
+
+    def start(self, plan: UpdatePlan, resume: bool = False):
+        """
+        Open the journal for writing.
+
+        Args:
+            plan: Plan being executed
+            resume: Append to an interrupted run instead of starting a new journal
+        """
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handle = open(self.file_path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._write({'type': _RECORD_PLAN, 'plan': plan.to_dict()})
+
+    def link_updated(self, workbook: str, link: str):
+        """Record a successful link update."""
+        self._write({'type': _RECORD_LINK, 'workbook': workbook, 'link': link})
+
+    def workbook_finished(self, workbook: str):
+        """Record that all of a workbook's planned work is done."""
+        self._write({'type': _RECORD_WORKBOOK, 'workbook': workbook})
+
+    def complete(self):
+        """Mark the run as finished and close the journal."""
+        self._write({'type': _RECORD_COMPLETED})
+        self.close()
+
+    def close(self):
+        """Close the journal without marking the run as finished."""
+        if self._handle:
+            self._handle.close()
+            self._handle = None
+
+    def _write(self, record: Dict):
+        if self._handle is None:
+            return
+        record['time'] = datetime.now().isoformat(timespec='seconds')
+        self._handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._handle.flush()
@@ -0,0 +1,394 @@
+"""
+Offline External Link Parser for Excel Session Manager
+
+This module reads external links straight from the zip package of a closed
+.xlsx/.xlsm workbook, without launching Excel. It streams the external link
+parts, their relationship targets, the workbook's defined names and every
+sheet's <f> formulas with an incremental XML parser, so memory stays bounded
+regardless of sheet size.
+
+The records produced are the same ExternalLink/ExternalFileGroup objects
+that ExternalLinksManager builds from a live Excel session.
+"""
+
+import os
+import re
+import zipfile
+import posixpath
+from urllib.parse import unquote
+from xml.etree.ElementTree import iterparse
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.external_link import ExternalLink, ExternalFileGroup, group_links_by_external_file
+
+
+# Package formats that can be read without Excel
+OFFLINE_EXTENSIONS = ('.xlsx', '.xlsm', '.xltx', '.xltm')
+
+# External workbook references are stored as 1-based indexes, e.g. [1]Sheet1!A1.
+# String literals are matched first so their contents are skipped.
+_EXTERNAL_INDEX_PATTERN = re.compile(r'"(?:[^"]|"")*"|\[(\d+)\]')
+
+
+def _local_name(tag: str) -> str:
+    """Strip the namespace from an element or attribute name."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _relationship_id(elem) -> Optional[str]:
+    """Get the r:id attribute of an element, whatever its namespace prefix."""
+    for key, value in elem.attrib.items():
+        if key.startswith('{') and _local_name(key) == 'id' and 'relationships' in key:
+            return value
+    return None
+
+
+def _part_path(base_part: str, target: str) -> str:
+    """Resolve a relationship target relative to the part that owns it."""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base_part), target))
+
+
+def _rels_path(part: str) -> str:
+    """Get the relationships part for a package part."""
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, '_rels', f'{name}.rels')
+
+
+def resolve_link_target(target: str, workbook_path: str) -> str:
+    """
+    Turn an externalLinkPath relationship target into a file path.
+
+    Args:
+        target: Relationship Target attribute (file URI, absolute or relative path)
+        workbook_path: Path of the workbook that holds the link
+
+    Returns:
+        Resolved path of the external workbook
+    """
+    path = unquote(target)
+    if path.lower().startswith('file:///'):
+        path = path[8:]
+    elif path.lower().startswith('file:'):
+        path = path[5:]
+
+    # Absolute Windows, UNC or POSIX paths are kept as written
+    if re.match(r'^[A-Za-z]:[\\/]', path) or path.startswith(('\\\\', '//', '/')):
+        return path
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(workbook_path)), path))
+
+
+def _external_filename(path: str) -> str:
+    """Extract the file name from a Windows or POSIX style path."""
+    return path.replace('\\', '/').rstrip('/').split('/')[-1]
+
+
+class OfflineLinkParser:
+    """
+    Parser for external links in closed workbook packages.
+
+    Reads the package with zipfile and xml.etree iterparse; only one row of
+    sheet XML is held in memory at a time.
+    """
+
+    def parse_workbook(self, workbook_path: str) -> List[ExternalLink]:
+        """
+        Parse all external links of a closed workbook.
+
+        Args:
+            workbook_path: Path to an .xlsx/.xlsm file
+
+        Returns:
+            List of ExternalLink records ('LinkSource', 'Formula' and 'DefinedName')
+
+        Raises:
+            ValueError: If the file format cannot be read offline
+            zipfile.BadZipFile: If the file is not a valid package
+        """
+        if not workbook_path.lower().endswith(OFFLINE_EXTENSIONS):
+            raise ValueError(f"Unsupported workbook format for offline parsing: {workbook_path}")
+
+        workbook_name = os.path.basename(workbook_path)
+        links: List[ExternalLink] = []
+        seen = set()
+
+        with zipfile.ZipFile(workbook_path) as package:
+            workbook_part = self._find_workbook_part(package)
+            workbook_rels = self._read_relationships(package, _rels_path(workbook_part))
+            sheets, external_refs, defined_names = self._read_workbook(package, workbook_part)
+            external_paths = self._read_external_paths(package, workbook_part, workbook_rels,
+                                                       external_refs, workbook_path)
+
+            # Method 1: link sources, equivalent to Workbook.LinkSources
+            for link_path in dict.fromkeys(external_paths.values()):
+                links.append(ExternalLink(
+                    source_workbook=workbook_name,
+                    source_sheet='',
+                    source_cell='',
+                    target_file=_external_filename(link_path),
+                    formula=f'LinkSource: {link_path}',
+                    link_type='LinkSource'
+                ))
+
+            if not external_paths:
+                return links
+
+            sheet_names = [name for name, _ in sheets]
+
+            # Method 2: defined names that point at external workbooks
+            for name, local_sheet_id, text in defined_names:
+                sheet_name = ''
+                if local_sheet_id is not None and 0 <= local_sheet_id < len(sheet_names):
+                    sheet_name = sheet_names[local_sheet_id]
+                self._add_formula_links(links, seen, workbook_name, sheet_name, name, text,
+                                        external_paths, 'DefinedName')
+
+            # Method 3: cell formulas
+            for sheet_name, rel_id in sheets:
+                rel = workbook_rels.get(rel_id)
+                if not rel or not rel[0].endswith('/worksheet'):
+                    continue
+                sheet_part = _part_path(workbook_part, rel[1])
+                if sheet_part not in package.NameToInfo:
+                    continue
+                for cell_ref, formula in self._iter_sheet_formulas(package, sheet_part):
+                    self._add_formula_links(links, seen, workbook_name, sheet_name,
+                                            self._absolute_address(cell_ref), formula,
+                                            external_paths, 'Formula')
+
+        return links
+
+    def parse_workbooks(self, workbook_paths: Iterable[str]) -> Tuple[List[ExternalLink], Dict[str, int]]:
+        """
+        Parse several closed workbooks.
+
+        Args:
+            workbook_paths: Paths to .xlsx/.xlsm files
+
+        Returns:
+            Tuple of (external_links_list, statistics_dict) with the same
+            statistics keys as ExternalLinksManager.scan_open_workbooks
+        """
+        all_links: List[ExternalLink] = []
+        statistics = {
+            'total_workbooks': 0,
+            'workbooks_with_links': 0,
+            'total_links': 0,
+            'unique_external_files': 0,
+            'failed_workbooks': 0
+        }
+
+        for path in workbook_paths:
+            statistics['total_workbooks'] += 1
+            try:
+                workbook_links = self.parse_workbook(path)
+            except Exception as e:
+                print(f"Error parsing external links in {path}: {e}")
+                statistics['failed_workbooks'] += 1
+                continue
+            if workbook_links:
+                statistics['workbooks_with_links'] += 1
+                all_links.extend(workbook_links)
+
+        statistics['total_links'] = len(all_links)
+        statistics['unique_external_files'] = len(set(link.target_file for link in all_links))
+        return all_links, statistics
+
+    def group_links(self, links: Iterable[ExternalLink]) -> Dict[str, ExternalFileGroup]:
+        """Group parsed links by external file."""
+        return group_links_by_external_file(links)
+
+    def _find_workbook_part(self, package: zipfile.ZipFile) -> str:
+        """Locate the workbook part through the package relationships."""
+        for rel_type, target in self._read_relationships(package, '_rels/.rels').values():
+            if rel_type.endswith('/officeDocument'):
+                return target.lstrip('/')
+        return 'xl/workbook.xml'
+
+    def _read_relationships(self, package: zipfile.ZipFile, rels_part: str) -> Dict[str, Tuple[str, str]]:
+        """Read a .rels part into {Id: (Type, Target)}."""
+        relationships = {}
+        if rels_part not in package.NameToInfo:
+            return relationships
+        with package.open(rels_part) as stream:
+            for _, elem in iterparse(stream):
+                if _local_name(elem.tag) == 'Relationship':
+                    relationships[elem.get('Id')] = (elem.get('Type', ''), elem.get('Target', ''))
+                elem.clear()
+        return relationships
+
+    def link_sources(self, workbook_path: str) -> List[str]:
+        """
+        Get the resolved paths of a closed workbook's link sources.
+
+        Equivalent to Workbook.LinkSources; only workbook.xml and the
+        external link parts are read, not the sheets.
+
+        Args:
+            workbook_path: Path to an .xlsx/.xlsm file
+
+        Returns:
+            Link source paths, in the workbook's order
+
+        Raises:
+            ValueError: If the file format cannot be read offline
+            zipfile.BadZipFile: If the file is not a valid package
+        """
+        if not workbook_path.lower().endswith(OFFLINE_EXTENSIONS):
+            raise ValueError(f"Unsupported workbook format for offline parsing: {workbook_path}")
+
+        with zipfile.ZipFile(workbook_path) as package:
+            workbook_part = self._find_workbook_part(package)
+            workbook_rels = self._read_relationships(package, _rels_path(workbook_part))
+            _, external_refs, _ = self._read_workbook(package, workbook_part)
+            external_paths = self._read_external_paths(package, workbook_part, workbook_rels,
+                                                       external_refs, workbook_path)
+        return list(dict.fromkeys(external_paths.values()))
+
+    def _read_external_paths(self, package: zipfile.ZipFile, workbook_part: str,
+                             workbook_rels: Dict[str, Tuple[str, str]], external_refs: List[str],
+                             workbook_path: str) -> Dict[int, str]:
+        """Resolve [n] external reference indexes to external workbook paths."""
+        external_paths: Dict[int, str] = {}
+        for index, rel_id in enumerate(external_refs, 1):
+            rel = workbook_rels.get(rel_id)
+            if not rel:
+                continue
+            link_part = _part_path(workbook_part, rel[1])
+            link_path = self._read_external_link_path(package, link_part, workbook_path)
+            if link_path:
+                external_paths[index] = link_path
+        return external_paths
+
+    def _read_workbook(self, package: zipfile.ZipFile, workbook_part: str):
+        """
+        Read sheets, external references and defined names from workbook.xml.
+
+        Returns:
+            Tuple of ([(sheet_name, rel_id)], [external_rel_id], [(name, local_sheet_id, text)])
+        """
+        sheets, external_refs, defined_names = [], [], []
+        with package.open(workbook_part) as stream:
+            for _, elem in iterparse(stream):
+                tag = _local_name(elem.tag)
+                if tag == 'sheet':
+                    sheets.append((elem.get('name', ''), _relationship_id(elem)))
+                elif tag == 'externalReference':
+                    external_refs.append(_relationship_id(elem))
+                elif tag == 'definedName':
+                    local_sheet_id = elem.get('localSheetId')
+                    defined_names.append((
+                        elem.get('name', ''),
+                        int(local_sheet_id) if local_sheet_id is not None else None,
+                        elem.text or ''
+                    ))
+                elif tag in ('sheets', 'externalReferences', 'definedNames'):
+                    elem.clear()
+        return sheets, external_refs, defined_names
+
+    def _read_external_link_path(self, package: zipfile.ZipFile, link_part: str, workbook_path: str) -> Optional[str]:
+        """Resolve the file path of one externalLinkN.xml part."""
+        if link_part not in package.NameToInfo:
+            return None
+
+        book_rel_id = None
+        with package.open(link_part) as stream:
+            for event, elem in iterparse(stream, events=('start',)):
+                if _local_name(elem.tag) == 'externalBook':
+                    book_rel_id = _relationship_id(elem)
+                    break
+        if not book_rel_id:
+            return None  # DDE or OLE link, not a workbook
+
+        rel = self._read_relationships(package, _rels_path(link_part)).get(book_rel_id)
+        if not rel or not rel[1]:
+            return None
+        return resolve_link_target(rel[1], workbook_path)
+
+    def _iter_sheet_formulas(self, package: zipfile.ZipFile, sheet_part: str) -> Iterator[Tuple[str, str]]:
+        """
+        Stream (cell_ref, formula) pairs from a worksheet part.
+
+        A shared formula group stores the formula once, on its master cell,
+        with references relative to that cell. The group is reported once,
+        as the master formula on the group's range (its ref attribute, e.g.
+        'B2:B100'); the other cells of the group are not reported on their
+        own, since the master text would show them the wrong references.
+        """
+        sheet_data = None
+
+        with package.open(sheet_part) as stream:
+            cell_ref = None
+            for event, elem in iterparse(stream, events=('start', 'end')):
+                tag = _local_name(elem.tag)
+                if event == 'start':
+                    if tag == 'sheetData':
+                        sheet_data = elem
+                    elif tag == 'c':
+                        cell_ref = elem.get('r')
+                    continue
+
+                if tag == 'f':
+                    text = elem.text or ''
+                    if elem.get('t') == 'shared' and text:
+                        # Master cell: report the formula on the whole group range
+                        yield elem.get('ref') or cell_ref, '=' + text
+                    elif text and cell_ref:
+                        yield cell_ref, '=' + text
+                elif tag == 'row' and sheet_data is not None:
+                    # Drop processed rows so memory stays bounded
+                    sheet_data.clear()
+
+    def _add_formula_links(self, links: List[ExternalLink], seen: set, workbook_name: str,
+                           sheet_name: str, cell: str, formula: str,
+                           external_paths: Dict[int, str], link_type: str):
+        """Append one link per external workbook referenced by a formula."""
+        if '[' not in formula:
+            return
+        indexes = set()
+        for match in _EXTERNAL_INDEX_PATTERN.finditer(formula):
+            if match.group(1):
+                indexes.add(int(match.group(1)))
+        if not indexes:
+            return
+
+        display_formula = self._display_formula(formula, external_paths)
+        for index in sorted(indexes):
+            path = external_paths.get(index)
+            if not path:
+                continue
+            target_file = _external_filename(path)
+            key = (sheet_name, cell, target_file)
+            if key in seen:
+                continue
+            seen.add(key)
+            links.append(ExternalLink(
+                source_workbook=workbook_name,
+                source_sheet=sheet_name,
+                source_cell=cell,
+                target_file=target_file,
+                formula=display_formula,
+                link_type=link_type
+            ))
+
+    @staticmethod
+    def _display_formula(formula: str, external_paths: Dict[int, str]) -> str:
+        """Replace stored [n] indexes with [filename] as Excel displays them."""
+        def replace(match):
+            if not match.group(1):
+                return match.group(0)
+            path = external_paths.get(int(match.group(1)))
+            return f'[{_external_filename(path)}]' if path else match.group(0)
+        return _EXTERNAL_INDEX_PATTERN.sub(replace, formula)
+
+    @staticmethod
+    def _absolute_address(cell_ref: str) -> str:
+        """Convert 'B7' to '$B$7' (and 'B2:B9' to '$B$2:$B$9') to match Range.Address."""
+        parts = []
+        for part in (cell_ref or '').split(':'):
+            match = re.match(r'^([A-Za-z]+)(\d+)$', part)
+            if not match:
+                return cell_ref or ''
+            parts.append(f"${match.group(1).upper()}${match.group(2)}")
+        return ':'.join(parts)
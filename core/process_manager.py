@@ -6,10 +6,9 @@ process monitoring, and Excel application lifecycle management.
 """
 
 import psutil
-import pythoncom
-import win32com.client
 import time
 from datetime import datetime
+from core.com_worker import get_com_worker, UI_CALL_TIMEOUT
 
 
 class ProcessManager:
@@ -124,23 +123,27 @@ class ProcessManager:
     
     def get_excel_com_connection(self):
         """
-        Get Excel COM connection with proper initialization.
+        Get the COM worker that owns the Excel connection, after checking Excel answers.
+        
+        COM objects must stay on the worker thread, so run Excel calls with
+        ``worker.call(func)`` instead of holding an Application proxy.
         
         Returns:
-            Excel Application object or None if connection fails
+            ExcelComWorker, or None if Excel could not be reached
         """
+        worker = get_com_worker()
         try:
-            pythoncom.CoInitialize()
-            excel = win32com.client.Dispatch("Excel.Application")
-            return excel
+            worker.call(lambda excel: excel.Ready, operation="check_excel_connection",
+                        timeout=UI_CALL_TIMEOUT, read_only=True)
+            return worker
         except Exception as e:
             print(f"Failed to connect to Excel COM: {e}")
             return None
     
     def release_excel_com_connection(self):
-        """Release Excel COM connection and cleanup."""
+        """Drop the worker's cached Excel proxy; the next job reconnects."""
         try:
-            pythoncom.CoUninitialize()
+            get_com_worker().reset_connection()
         except Exception as e:
             print(f"Error releasing COM connection: {e}")
     
@@ -162,19 +165,17 @@ class ProcessManager:
         
         try:
             # First try to close gracefully through COM
+            worker = get_com_worker()
             try:
-                pythoncom.CoInitialize()
-                excel = win32com.client.Dispatch("Excel.Application")
-                excel.Quit()
+                # Don't wait behind a job that may be the reason Excel is being force closed
+                worker.call(lambda excel: excel.Quit(), operation="quit_excel", timeout=UI_CALL_TIMEOUT)
                 print_msg("Sent quit command to Excel application")
                 time.sleep(2)  # Give Excel time to close gracefully
             except Exception:
                 pass
             finally:
-                try:
-                    pythoncom.CoUninitialize()
-                except Exception:
-                    pass
+                # The cached proxy points at the process we just closed
+                worker.reset_connection()
             
             # Then force close any remaining processes
             for proc in psutil.process_iter(['pid', 'name']):
@@ -0,0 +1,183 @@
+"""
+Read-Ahead Prefetcher for Excel Session Manager
+
+This module warms the OS page cache for files that are about to be opened.
+While Excel opens session file N, background threads read files
+N+1..N+k sequentially and discard the data, so the next Workbooks.Open
+finds the file already local instead of pulling it cold over a network
+share. Concurrency and the number of bytes being read at once are bounded,
+so read-ahead does not compete with Excel for the link it is using, and a
+wait for a slow read is bounded too: Excel then opens the file anyway.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+
+# Files read ahead of the one being opened
+DEFAULT_READ_AHEAD_FILES = 4
+
+# Concurrent read-ahead threads
+DEFAULT_READ_AHEAD_WORKERS = 2
+
+# Upper bound on the combined size of files being read at once
+DEFAULT_MAX_BYTES_IN_FLIGHT = 256 * 1024 * 1024
+
+# Read buffer size
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Bounds of the default wait for one file's read: a base time plus the file
+# size at a slow link's throughput, capped
+MIN_WAIT_SECONDS = 2.0
+MAX_WAIT_SECONDS = 30.0
+SLOW_LINK_BYTES_PER_SECOND = 2 * 1024 * 1024
+
+
+class ReadAheadPrefetcher:
+    """
+    Ordered, bounded read-ahead over a list of files.
+
+    The consumer calls ``advance(index)`` before opening file ``index``,
+    which allows files up to ``index + read_ahead`` to be read, then
+    ``wait(index)`` to let that file's read finish. Files are read in list
+    order. A file larger than the byte budget is still read, but alone.
+    The first file is not read ahead: Excel opens it straight away, so a
+    read-ahead would only read it twice.
+    """
+
+    def __init__(self, paths: Sequence[str], sizes: Optional[Dict[str, int]] = None,
+                 read_ahead: int = DEFAULT_READ_AHEAD_FILES,
+                 max_workers: int = DEFAULT_READ_AHEAD_WORKERS,
+                 max_bytes_in_flight: int = DEFAULT_MAX_BYTES_IN_FLIGHT,
+                 skip_first: bool = True):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            paths: Files in the order they will be opened
+            sizes: Optional known file sizes (from a stat pre-check); files
+                with a size of None or missing from the dict are not read
+                when ``sizes`` is given
+            read_ahead: Files to read beyond the one being opened
+            max_workers: Concurrent reads
+            max_bytes_in_flight: Combined size limit of concurrent reads
+            skip_first: Do not read the first file
+        """
+        self.paths = list(paths)
+        self.sizes = [(sizes or {}).get(path, 0 if sizes is None else None) for path in self.paths]
+        self.read_ahead = max(0, read_ahead)
+        self.max_workers = max(1, max_workers)
+        self.max_bytes_in_flight = max_bytes_in_flight
+
+        self._condition = threading.Condition()
+        self._done = [threading.Event() for _ in self.paths]
+        self._next = 0              # Next file to hand to a worker
+        if skip_first and self.paths:
+            self._done[0].set()
+            self._next = 1
+        self._limit = -1            # Highest file index workers may read
+        self._bytes_in_flight = 0
+        self._stopped = False
+
+        self.bytes_read = 0
+        self.files_read = 0
+        self.read_time = 0.0        # Summed over workers
+        self.errors: List[str] = []
+
+    def start(self):
+        """Start the worker threads."""
+        for _ in range(min(self.max_workers, len(self.paths) - self._next)):
+            threading.Thread(target=self._worker, daemon=True, name="ReadAheadWorker").start()
+
+    def advance(self, index: int):
+        """
+        Declare that file ``index`` is about to be opened.
+
+        Args:
+            index: Position in the path list
+        """
+        with self._condition:
+            self._limit = max(self._limit, index + self.read_ahead)
+            self._condition.notify_all()
+
+    def wait(self, index: int, timeout: Optional[float] = None) -> float:
+        """
+        Wait until file ``index`` has been read (or skipped), or the timeout passes.
+
+        Args:
+            index: Position in the path list
+            timeout: Maximum seconds to wait (default: wait_timeout(index))
+
+        Returns:
+            Seconds spent waiting
+        """
+        if timeout is None:
+            timeout = self.wait_timeout(index)
+        started = time.perf_counter()
+        self._done[index].wait(timeout)
+        return time.perf_counter() - started
+
+    def wait_timeout(self, index: int) -> float:
+        """
+        Default bound on waiting for one file, derived from its size.
+
+        Args:
+            index: Position in the path list
+
+        Returns:
+            Seconds
+        """
+        size = self.sizes[index] or 0
+        return min(MAX_WAIT_SECONDS, MIN_WAIT_SECONDS + size / SLOW_LINK_BYTES_PER_SECOND)
+
+    def close(self):
+        """Stop scheduling further reads; reads in progress finish on their own."""
+        with self._condition:
+            self._stopped = True
+            for event in self._done:
+                event.set()
+            self._condition.notify_all()
+
+    def _worker(self):
+        buffer = bytearray(READ_CHUNK_SIZE)
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped or self._next >= len(self.paths):
+                        return
+                    size = self.sizes[self._next]
+                    if size is None:
+                        # Pre-check found no file; nothing to read
+                        self._done[self._next].set()
+                        self._next += 1
+                        continue
+                    within_window = self._next <= self._limit
+                    within_budget = (self._bytes_in_flight == 0
+                                     or self._bytes_in_flight + size <= self.max_bytes_in_flight)
+                    if within_window and within_budget:
+                        break
+                    self._condition.wait()
+                index = self._next
+                self._next += 1
+                self._bytes_in_flight += size
+
+            started = time.perf_counter()
+            read = 0
+            try:
+                with open(self.paths[index], 'rb', buffering=0) as f:
+                    while True:
+                        count = f.readinto(buffer)
+                        if not count:
+                            break
+                        read += count
+            except OSError as e:
+                self.errors.append(f"{self.paths[index]}: {e}")
+
+            with self._condition:
+                self._bytes_in_flight -= size
+                self.bytes_read += read
+                self.files_read += 1 if read else 0
+                self.read_time += time.perf_counter() - started
+                self._done[index].set()
+                self._condition.notify_all()
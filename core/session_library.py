@@ -0,0 +1,456 @@
+"""
+Session Library for Excel Session Manager
+
+This module keeps a local SQLite index of the saved session files under a
+folder: one row per session (path, saved time, entry count) and one row per
+member workbook. Searching for "sessions containing X" or "the most recent
+session with these files" then runs as an indexed query instead of opening
+every session file.
+
+Refreshes are incremental. Each folder's modification time is stored, and a
+folder whose mtime is unchanged is not listed again: files cannot have been
+added, removed or renamed there, so only its indexed files are stat'ed to
+catch sessions rewritten in place (e.g. an .xlsx overwritten by Excel). Only
+session files whose (size, mtime_ns) signature changed are re-read.
+
+Ordinary workbooks kept in the session folders are remembered by signature
+in a separate table, so each is checked for the session headers only once.
+
+Refreshes of the same index are serialized within the process, and other
+processes wait on SQLite's busy timeout instead of failing.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.session_store import LEGACY_SESSION_EXTENSION, is_session_file, is_xlsx_session, load_session_file
+from core.workbook_index import normalize_workbook_path
+from models.session import IndexedSession
+
+
+# Number of re-read session files written to SQLite per transaction
+_COMMIT_BATCH_SIZE = 200
+
+# Default number of search results
+DEFAULT_RESULT_LIMIT = 200
+
+# Bumped when the table layout or what gets indexed changes; older index files are rebuilt
+_SCHEMA_VERSION = 1
+
+# Seconds to wait for another connection's write transaction before failing
+BUSY_TIMEOUT_SECONDS = 30.0
+
+# One refresh lock per index file, shared by every SessionLibrary in the process
+_refresh_locks: Dict[str, threading.Lock] = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def _refresh_lock(db_path: str) -> threading.Lock:
+    """Get the refresh lock of an index file."""
+    key = os.path.normcase(os.path.abspath(db_path))
+    with _refresh_locks_guard:
+        return _refresh_locks.setdefault(key, threading.Lock())
+
+
+class SessionLibrary:
+    """
+    SQLite index of saved session files and their member workbooks.
+
+    Member workbooks are stored by normalized path and by case-folded file
+    name, so a search can match either a full path or part of a name. Name
+    fragments are matched against the table of distinct file names, which
+    stays small however many sessions repeat the same workbooks.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the session library index.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables and indexes, rebuilding an index file written by an older version."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            # The index is a cache of the session files; the next refresh refills it.
+            # Version 0 indexed every .xlsx in the session folders as a session.
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS folders;
+                DROP TABLE IF EXISTS sessions;
+                DROP TABLE IF EXISTS members;
+                DROP TABLE IF EXISTS names;
+                DROP TABLE IF EXISTS other_files;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS folders (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+                path TEXT PRIMARY KEY,
+                folder TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                created TEXT,
+                entry_count INTEGER NOT NULL DEFAULT 0,
+                indexed_at TEXT NOT NULL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS members (
+                session TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                path_key TEXT NOT NULL,
+                name_key TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS names (
+                name_key TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS other_files (
+                path TEXT PRIMARY KEY,
+                folder TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_folders_parent ON folders(parent);
+            CREATE INDEX IF NOT EXISTS idx_sessions_folder ON sessions(folder);
+            CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created);
+            CREATE INDEX IF NOT EXISTS idx_members_session ON members(session);
+            CREATE INDEX IF NOT EXISTS idx_members_path ON members(path_key);
+            CREATE INDEX IF NOT EXISTS idx_members_name ON members(name_key);
+            CREATE INDEX IF NOT EXISTS idx_other_files_folder ON other_files(folder);
+        """)
+        self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def refresh(self, root: str, full: bool = False, print_func: Optional[Callable] = None) -> Dict:
+        """
+        Bring the index up to date with the session files under a folder.
+
+        Blocks while another refresh of the same index file is running in
+        this process.
+
+        Args:
+            root: Session folder
+            full: List every folder, even those whose mtime is unchanged
+            print_func: Optional function for progress messages
+
+        Returns:
+            Dictionary with folder, listed, indexed, removed, errors and elapsed counts
+        """
+        with _refresh_lock(self.db_path):
+            return self._refresh(root, full, print_func)
+
+    def _refresh(self, root: str, full: bool, print_func: Optional[Callable]) -> Dict:
+        """Refresh body; the caller holds the refresh lock."""
+        started = datetime.now()
+        stats = {'folders': 0, 'listed': 0, 'indexed': 0, 'removed': 0, 'errors': 0}
+        root = os.path.abspath(root)
+        if not os.path.isdir(root):
+            stats['removed'] = self._remove_folder_tree(root)
+            self._prune_names()
+            self.conn.commit()
+            stats['elapsed'] = 0.0
+            return stats
+
+        stored_mtimes = {}
+        stored_children: Dict[str, List[str]] = {}
+        for path, parent, mtime_ns in self.conn.execute("SELECT path, parent, mtime_ns FROM folders"):
+            stored_mtimes[path] = mtime_ns
+            stored_children.setdefault(parent, []).append(path)
+        pending = 0
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                stats['removed'] += self._remove_folder_tree(folder)
+                continue
+            stats['folders'] += 1
+
+            known = {
+                path: (size, file_mtime_ns)
+                for path, size, file_mtime_ns in self.conn.execute(
+                    "SELECT path, size, mtime_ns FROM sessions WHERE folder = ?", (folder,))
+            }
+            others = {
+                path: (size, file_mtime_ns)
+                for path, size, file_mtime_ns in self.conn.execute(
+                    "SELECT path, size, mtime_ns FROM other_files WHERE folder = ?", (folder,))
+            }
+            if stored_mtimes.get(folder) == mtime_ns and not full:
+                # Nothing was added, removed or renamed here; only descend, and
+                # check the known files for ones rewritten in place
+                stack.extend(stored_children.get(folder, []))
+                files = self._stat_files(list(known) + list(others))
+                subfolders = None
+            else:
+                stats['listed'] += 1
+                subfolders, files = self._list_folder(folder)
+                stack.extend(subfolders)
+
+            for path, signature in files.items():
+                if known.get(path, others.get(path)) == signature:
+                    continue
+                if path.lower().endswith(LEGACY_SESSION_EXTENSION) and not is_xlsx_session(path):
+                    # An ordinary workbook kept next to the sessions
+                    if path in known:
+                        self._remove_sessions([path])
+                        stats['removed'] += 1
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO other_files (path, folder, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                        (path, folder, *signature))
+                    continue
+                if path in others:
+                    self.conn.execute("DELETE FROM other_files WHERE path = ?", (path,))
+                if not self._index_session(path, folder, *signature):
+                    stats['errors'] += 1
+                stats['indexed'] += 1
+                pending += 1
+                if pending >= _COMMIT_BATCH_SIZE:
+                    self.conn.commit()
+                    pending = 0
+            removed = [path for path in known if path not in files]
+            self._remove_sessions(removed)
+            stats['removed'] += len(removed)
+            self.conn.executemany("DELETE FROM other_files WHERE path = ?",
+                                  ((path,) for path in others if path not in files))
+
+            if subfolders is None:
+                continue
+            for path in stored_children.get(folder, []):
+                if path not in subfolders:
+                    stats['removed'] += self._remove_folder_tree(path)
+            self.conn.execute("INSERT OR REPLACE INTO folders (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                              (folder, os.path.dirname(folder) if folder != root else None, mtime_ns))
+
+        if stats['indexed'] or stats['removed']:
+            self._prune_names()
+        self.conn.commit()
+        stats['elapsed'] = (datetime.now() - started).total_seconds()
+        if print_func:
+            print_func(f"Session library: {stats['folders']} folder(s), {stats['listed']} listed, "
+                       f"{stats['indexed']} session(s) indexed, {stats['removed']} removed "
+                       f"in {stats['elapsed']:.2f}s")
+        return stats
+
+    @staticmethod
+    def _list_folder(folder: str) -> Tuple[List[str], Dict[str, Tuple[int, int]]]:
+        """List subfolders and session file signatures (size, mtime_ns) of one folder."""
+        subfolders = []
+        files = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subfolders.append(entry.path)
+                        elif entry.is_file() and is_session_file(entry.name) and not entry.name.startswith('~$'):
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Could not list session folder {folder}: {e}")
+        return subfolders, files
+
+    @staticmethod
+    def _stat_files(paths: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """Signatures (size, mtime_ns) of already indexed files; missing files are left out."""
+        files = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _index_session(self, path: str, folder: str, size: int, mtime_ns: int) -> bool:
+        """Re-read one session file and replace its rows (caller commits)."""
+        error = None
+        created = datetime.fromtimestamp(mtime_ns / 1e9).isoformat(timespec='seconds')
+        members = []
+        try:
+            session = load_session_file(path)
+            created = session.created or created
+            members = session.paths
+        except Exception as e:
+            error = str(e)
+
+        self.conn.execute("DELETE FROM members WHERE session = ?", (path,))
+        self.conn.executemany(
+            "INSERT INTO members (session, position, path, path_key, name_key) VALUES (?, ?, ?, ?, ?)",
+            ((path, position, member, normalize_workbook_path(member),
+              os.path.basename(member.replace('\\', '/')).casefold())
+             for position, member in enumerate(members))
+        )
+        # Distinct file names, so a name fragment is matched once per workbook, not once per member row
+        self.conn.executemany("INSERT OR IGNORE INTO names (name_key) VALUES (?)",
+                              ((os.path.basename(member.replace('\\', '/')).casefold(),) for member in members))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sessions (path, folder, size, mtime_ns, created, entry_count, indexed_at, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, folder, size, mtime_ns, created, len(members),
+             datetime.now().isoformat(timespec='seconds'), error)
+        )
+        return error is None
+
+    def _remove_sessions(self, paths: List[str]):
+        """Remove sessions that no longer exist (caller commits)."""
+        for path in paths:
+            self.conn.execute("DELETE FROM members WHERE session = ?", (path,))
+            self.conn.execute("DELETE FROM sessions WHERE path = ?", (path,))
+
+    def _prune_names(self):
+        """Drop file names no member row uses any more (caller commits)."""
+        self.conn.execute("DELETE FROM names WHERE name_key NOT IN (SELECT name_key FROM members)")
+
+    def _remove_folder_tree(self, folder: str) -> int:
+        """Remove a deleted folder, its subfolders and their sessions (caller commits); returns sessions removed."""
+        removed = 0
+        prefix = os.path.join(folder, '')
+        folders = [folder] + [
+            path for (path,) in self.conn.execute(
+                "SELECT path FROM folders WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+        ]
+        for path in folders:
+            sessions = [row[0] for row in self.conn.execute("SELECT path FROM sessions WHERE folder = ?", (path,))]
+            self._remove_sessions(sessions)
+            self.conn.execute("DELETE FROM other_files WHERE folder = ?", (path,))
+            self.conn.execute("DELETE FROM folders WHERE path = ?", (path,))
+            removed += len(sessions)
+        return removed
+
+    def search(self, query: str = '', limit: int = DEFAULT_RESULT_LIMIT) -> List[IndexedSession]:
+        """
+        Find sessions containing a workbook, newest first.
+
+        A query with a path separator matches a full workbook path; anything
+        else matches part of a file name, case-insensitively. Several terms
+        separated by ';' must all match. An empty query lists all sessions.
+
+        Args:
+            query: Workbook path or name fragment(s)
+            limit: Maximum number of sessions returned
+
+        Returns:
+            Matching sessions with the member paths that matched
+        """
+        terms = [term.strip() for term in query.split(';') if term.strip()]
+        if not terms:
+            rows = self.conn.execute(
+                "SELECT path, created, entry_count, error FROM sessions "
+                "ORDER BY created DESC, mtime_ns DESC LIMIT ?", (limit,))
+            return [IndexedSession(path, created or '', count, error=error) for path, created, count, error in rows]
+
+        matches: Optional[Dict[str, List[str]]] = None
+        for term in terms:
+            term_matches: Dict[str, List[str]] = {}
+            for session, member in self._match_term(term):
+                term_matches.setdefault(session, []).append(member)
+            if matches is None:
+                matches = term_matches
+            else:
+                matches = {session: members + term_matches[session]
+                           for session, members in matches.items() if session in term_matches}
+            if not matches:
+                return []
+        return self._sessions(matches, limit)
+
+    def sessions_with_all(self, paths: Iterable[str], limit: int = DEFAULT_RESULT_LIMIT) -> List[IndexedSession]:
+        """
+        Find sessions that contain every one of the given workbooks, newest first.
+
+        Args:
+            paths: Workbook paths
+            limit: Maximum number of sessions returned
+
+        Returns:
+            Matching sessions
+        """
+        keys = list(dict.fromkeys(normalize_workbook_path(path) for path in paths if path))
+        if not keys:
+            return []
+        placeholders = ','.join('?' * len(keys))
+        rows = self.conn.execute(
+            f"SELECT session, path FROM members WHERE path_key IN ({placeholders}) "
+            f"AND session IN (SELECT session FROM members WHERE path_key IN ({placeholders}) "
+            f"GROUP BY session HAVING COUNT(DISTINCT path_key) = ?)",
+            keys + keys + [len(keys)]
+        )
+        matches: Dict[str, List[str]] = {}
+        for session, member in rows:
+            matches.setdefault(session, []).append(member)
+        return self._sessions(matches, limit)
+
+    def most_recent_with(self, paths: Iterable[str]) -> Optional[IndexedSession]:
+        """
+        Find the most recently saved session that contains all of the given workbooks.
+
+        Args:
+            paths: Workbook paths
+
+        Returns:
+            The session, or None if no session contains them all
+        """
+        sessions = self.sessions_with_all(paths, limit=1)
+        return sessions[0] if sessions else None
+
+    def members(self, session: str) -> List[str]:
+        """Member workbook paths of an indexed session, in session order."""
+        return [path for (path,) in self.conn.execute(
+            "SELECT path FROM members WHERE session = ? ORDER BY position", (session,))]
+
+    def session_count(self) -> int:
+        """Number of indexed sessions."""
+        return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _match_term(self, term: str) -> Iterable[Tuple[str, str]]:
+        """(session, member path) pairs matching one search term."""
+        if '/' in term or '\\' in term:
+            return self.conn.execute("SELECT session, path FROM members WHERE path_key = ?",
+                                     (normalize_workbook_path(term),))
+        pattern = term.casefold().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return self.conn.execute(
+            "SELECT session, path FROM members WHERE name_key IN "
+            "(SELECT name_key FROM names WHERE name_key LIKE ? ESCAPE '\\')",
+            (f"%{pattern}%",))
+
+    def _sessions(self, matches: Dict[str, List[str]], limit: int) -> List[IndexedSession]:
+        """Load session rows for matched session paths, newest first."""
+        if not matches:
+            return []
+        sessions = []
+        paths = list(matches)
+        # Stay well under SQLite's host parameter limit
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT path, created, entry_count, error, mtime_ns FROM sessions "
+                f"WHERE path IN ({','.join('?' * len(chunk))})", chunk)
+            sessions.extend(rows)
+        sessions.sort(key=lambda row: (row[1] or '', row[4]), reverse=True)
+        return [
+            IndexedSession(path, created or '', count, list(dict.fromkeys(matches[path])), error)
+            for path, created, count, error, _ in sessions[:limit]
+        ]
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
@@ -6,17 +6,25 @@ including file validation and session data management.
 """
 
 import os
-import openpyxl
 from datetime import datetime
 from tkinter import filedialog, messagebox
 import threading
-import pythoncom
-import win32com.client
 import time
 import gc
 from ui.console_popup import ConsolePopup
 from ui.dialogs.file_selector import FileSelectionDialog
+from ui.dialogs.session_search import SessionSearchDialog
 from core.performance_monitor import timed_operation
+from core.com_worker import get_com_worker, ComWorkerBusyError, UI_CALL_TIMEOUT
+from core.session_store import (save_session_file, load_session_file,
+                                SESSION_EXTENSION, SESSION_FILETYPES, SESSION_OPEN_FILETYPES)
+from core.workbook_index import WorkbookIndex
+from models.session import SessionEntry
+from core.excel_manager import ExcelPerformanceMode
+from config.settings import settings
+from core.read_ahead import ReadAheadPrefetcher
+from core.session_scheduler import LOAD_POLICIES, DEFAULT_LOAD_POLICY, OpenHistory, SessionLoadScheduler
+from core.stat_prefetcher import StatPrefetcher
 
 
 class SessionManager:
@@ -66,8 +74,8 @@ class SessionManager:
         """Implementation of save session."""
         file_path = filedialog.asksaveasfilename(
             title="Save Session", 
-            defaultextension=".xlsx",
-            filetypes=[("Excel Session", "*.xlsx"), ("All Files", "*.*")]
+            defaultextension=SESSION_EXTENSION,
+            filetypes=SESSION_FILETYPES
         )
         if not file_path:
             return None
@@ -78,17 +86,8 @@ class SessionManager:
         file_path_with_ts = f"{base}_{timestamp}{ext}"
 
         try:
-            # Create session workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Session"
-            ws.append(["File Path", "Sheet Name", "Cell Address"])
-            
-            # Add workbook data
-            for _, path, sheet, cell in selected_workbooks:
-                ws.append([path, sheet, cell])
-                
-            wb.save(file_path_with_ts)
+            # An .xlsx name exports the legacy format for sharing
+            save_session_file(file_path_with_ts, self._build_session_entries(selected_workbooks))
             messagebox.showinfo("Success", f"Session saved at:\n{file_path_with_ts}")
             return file_path_with_ts
             
@@ -96,6 +95,57 @@ class SessionManager:
             messagebox.showerror("Error", f"Failed to save session:\n{str(e)}")
             return None
     
+    def _build_session_entries(self, selected_workbooks):
+        """
+        Build session entries with file, timing and window metadata.
+        
+        Args:
+            selected_workbooks: List of tuples (name, path, sheet, cell)
+            
+        Returns:
+            list: SessionEntry per workbook
+        """
+        paths = [path for _, path, _, _ in selected_workbooks]
+        try:
+            window_states = get_com_worker().call(self._read_window_states, paths,
+                                                  operation="read_window_states", read_only=True)
+        except Exception:
+            window_states = {}
+        history = OpenHistory(settings.session_open_history_file)
+        
+        entries = []
+        for _, path, sheet, cell in selected_workbooks:
+            try:
+                stat = os.stat(path)
+                size, mtime = stat.st_size, stat.st_mtime
+            except (OSError, TypeError, ValueError):
+                size, mtime = None, None
+            entries.append(SessionEntry(
+                path=path,
+                sheet=sheet or '',
+                cell=cell or '',
+                size=size,
+                mtime=mtime,
+                open_seconds=history.last_duration(path),
+                window_state=window_states.get(path)
+            ))
+        return entries
+    
+    @staticmethod
+    def _read_window_states(excel, paths):
+        """Read the first window's state of each open workbook (runs on the COM worker thread)."""
+        workbook_index = WorkbookIndex(excel)
+        states = {}
+        for path in paths:
+            wb = workbook_index.get_by_path(path)
+            if wb is None:
+                continue
+            try:
+                states[path] = int(wb.Windows(1).WindowState)
+            except Exception:
+                continue
+        return states
+    
     def load_session(self, get_open_files_func, show_console_var=None):
         """
         Load a session file and open selected Excel files.
@@ -104,8 +154,12 @@ class SessionManager:
             get_open_files_func: Function to get currently open Excel files
             show_console_var: BooleanVar for showing progress console
         """
-        # Check if Excel files are already open
-        current_files, _, _, _ = get_open_files_func()
+        # Check if Excel files are already open; don't freeze the UI behind a long COM job
+        try:
+            current_files, _, _, _ = get_open_files_func(timeout=UI_CALL_TIMEOUT)
+        except ComWorkerBusyError as e:
+            messagebox.showwarning("Excel Busy", f"{e}.\n\nPlease try again when it has finished.")
+            return
         if current_files:
             messagebox.showwarning(
                 "Warning", 
@@ -114,28 +168,55 @@ class SessionManager:
             return
             
         # Select session file
-        file_path = filedialog.askopenfilename(
-            title="Load Session", 
-            filetypes=[("Excel Session", "*.xlsx"), ("All Files", "*.*")]
-        )
+        file_path = self._choose_session_file()
         if not file_path or not os.path.exists(file_path):
             return
             
-        # Load and validate session file
+        # Load the session file, then check its files off the UI thread
         try:
-            wb = openpyxl.load_workbook(file_path)
-            ws = wb.active
-            rows = list(ws.iter_rows(min_row=2, values_only=True))
+            rows = load_session_file(file_path).rows()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error reading session file:\n{str(e)}")
+            return
+        
+        self.parent.config(cursor="watch")
+        
+        def precheck_thread():
+            # Check existence and size of all files in parallel, not one network round-trip at a time
+            try:
+                file_sizes, error = self._precheck_files([r[0] for r in rows if r and r[0]]), None
+            except Exception as e:
+                file_sizes, error = None, e
+            self.parent.after(0, lambda: self._select_and_load_files(rows, file_sizes, error, show_console_var))
+        
+        threading.Thread(target=precheck_thread, daemon=True).start()
+    
+    def _select_and_load_files(self, rows, file_sizes, error, show_console_var):
+        """
+        Let the user pick files from a pre-checked session and start loading them (UI thread).
+        
+        Args:
+            rows: Session data rows
+            file_sizes: Sizes from _precheck_files, or None if the check failed
+            error: Exception raised by the check, if any
+            show_console_var: BooleanVar for showing progress console
+        """
+        self.parent.config(cursor="")
+        try:
+            if error is not None:
+                raise error
             all_file_paths = [r[0] for r in rows if r and r[0]]
-            valid_file_paths = [path for path in all_file_paths if os.path.exists(path)]
+            valid_file_paths = [path for path in all_file_paths if path in file_sizes]
             
             if not valid_file_paths:
                 messagebox.showwarning("Warning", "No valid file paths found in session.")
                 return
                 
             # Show file selection dialog
-            dialog = FileSelectionDialog(self.parent, valid_file_paths, "Select Files to Load from Session")
+            dialog = FileSelectionDialog(self.parent, valid_file_paths, "Select Files to Load from Session",
+                                         load_policies=LOAD_POLICIES, load_policy=settings.session_load_policy)
             result, selected_files = dialog.show()
+            load_policy = dialog.load_policy
             
             if result != "ok" or not selected_files:
                 return
@@ -165,7 +246,7 @@ class SessionManager:
                 
         def thread_job():
             try:
-                self._load_files_thread(selected_rows, print_to_popup)
+                self._load_files_thread(selected_rows, print_to_popup, file_sizes, load_policy)
                 monitor.end_operation(op_id, success=True)
             except Exception as e:
                 monitor.end_operation(op_id, success=False)
@@ -173,70 +254,177 @@ class SessionManager:
             
         threading.Thread(target=thread_job, daemon=True).start()
     
-    def _load_files_thread(self, selected_rows, print_func):
+    def _choose_session_file(self):
+        """
+        Let the user pick a session, from the session library search if enabled.
+        
+        Returns:
+            str: Session file path, or None if cancelled
+        """
+        if settings.session_library_enabled:
+            try:
+                dialog = SessionSearchDialog(self.parent, settings.session_library_file,
+                                             settings.session_load_directory)
+            except Exception as e:
+                # An unreadable index must not block loading; fall back to the file dialog
+                print(f"Session library unavailable: {e}")
+            else:
+                result, file_path = dialog.show()
+                if result != "browse":
+                    return file_path
+        
+        return filedialog.askopenfilename(
+            title="Load Session", 
+            initialdir=settings.session_load_directory,
+            filetypes=SESSION_OPEN_FILETYPES
+        )
+    
+    @staticmethod
+    def _precheck_files(paths):
+        """
+        Stat session files concurrently.
+        
+        Args:
+            paths: File paths from the session
+            
+        Returns:
+            dict: Size in bytes of every path that exists
+        """
+        results = StatPrefetcher().prefetch(paths)
+        return {path: result.size for path, result in results.items() if result.exists}
+    
+    def _load_files_thread(self, selected_rows, print_func, file_sizes=None, load_policy=DEFAULT_LOAD_POLICY):
         """
         Thread function to load Excel files from session.
         
         Args:
             selected_rows: List of session data rows
             print_func: Function to print progress messages
+            file_sizes: Optional file sizes from _precheck_files, used to
+                bound read-ahead and estimate open times
+            load_policy: Open order policy (key of LOAD_POLICIES)
         """
-        pythoncom.CoInitialize()
-        excel = None
+        if not selected_rows:
+            print_func("No files selected to load.")
+            self.parent.after(0, lambda: messagebox.showwarning("Warning", "No files selected to load."))
+            return
         
         try:
-            if not selected_rows:
-                print_func("No files selected to load.")
-                self.parent.after(0, lambda: messagebox.showwarning("Warning", "No files selected to load."))
-                return
-                
-            print_func(f"Loading selected files from session ({len(selected_rows)} file(s))")
+            # Order the files here, off the COM thread; dependency order parses the files
+            history = OpenHistory(settings.session_open_history_file)
+            selected_rows = SessionLoadScheduler(history, file_sizes).order(selected_rows, load_policy)
+            get_com_worker().call(self._open_session_files, selected_rows, print_func, file_sizes,
+                                  history, load_policy, operation="load_session_files")
+        except Exception as e:
+            print_func(f"Error loading session: {str(e)}")
+            self.parent.after(0, lambda e=e: messagebox.showerror("Error", f"Error loading session:\n{str(e)}"))
+    
+    def _open_session_files(self, excel, selected_rows, print_func, file_sizes=None, history=None,
+                            load_policy=DEFAULT_LOAD_POLICY):
+        """
+        Open session files in Excel (runs on the COM worker thread).
+        
+        While Excel opens one file, the next few are read ahead into the OS
+        file cache in the background.
+        
+        Args:
+            excel: Excel Application proxy owned by the COM worker
+            selected_rows: List of session data rows
+            print_func: Function to print progress messages
+            file_sizes: Optional file sizes from _precheck_files
+            history: Optional OpenHistory to record open durations in
+            load_policy: Policy the rows were ordered by, for reporting
+        """
+        read_ahead = ReadAheadPrefetcher([r[0] for r in selected_rows], file_sizes)
+        read_ahead.start()
+        io_wait_total = 0.0
+        excel_wait_total = 0.0
+        first_ready = None
+        started = time.time()
+        try:
+            print_func(f"Loading selected files from session ({len(selected_rows)} file(s), "
+                       f"order: {LOAD_POLICIES.get(load_policy, load_policy)})")
             print_func("-" * 80)
             
-            excel = win32com.client.Dispatch("Excel.Application")
             excel.Visible = True
             excel.AskToUpdateLinks = False
             
-            for idx, r in enumerate(selected_rows, 1):
-                path, sheet, cell = (r[0], r[1] if len(r) > 1 else None, r[2] if len(r) > 2 else None)
-                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                print_func(f"{ts} | ({idx}/{len(selected_rows)}) Opening: {path}")
-                t0 = time.time()
+            # Repaint, events and calculation resume once, after the last file
+            with ExcelPerformanceMode(excel) as performance_mode:
+                for idx, r in enumerate(selected_rows, 1):
+                    path, sheet, cell = (r[0], r[1] if len(r) > 1 else None, r[2] if len(r) > 2 else None)
+                    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    print_func(f"{ts} | ({idx}/{len(selected_rows)}) Opening: {path}")
+                    t0 = time.time()
+                
+                    read_ahead.advance(idx - 1)
+                    # Bounded by the file size; after that Excel opens the file anyway
+                    io_wait = read_ahead.wait(idx - 1)
+                    t_excel = time.time()
                 
-                try:
-                    wb_xl = excel.Workbooks.Open(Filename=path, UpdateLinks=0)
-                    if wb_xl.ReadOnly:
-                        ts2 = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        print_func(f'{ts2} |     File "{path}" is opened in read-only mode. Changes may not be saved.')
-                    
                     try:
-                        excel.Visible = True
-                    except Exception:
-                        pass
-                        
-                    if sheet:
+                        wb_xl = excel.Workbooks.Open(Filename=path, UpdateLinks=0)
+                        # Calculation can only be switched once a workbook is open
+                        performance_mode.refresh()
+                        if wb_xl.ReadOnly:
+                            ts2 = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            print_func(f'{ts2} |     File "{path}" is opened in read-only mode. Changes may not be saved.')
+                    
                         try:
-                            sht = wb_xl.Sheets(sheet)
-                            sht.Activate()
-                            if cell:
-                                sht.Range(cell).Select()
-                        except Exception as e:
-                            print_func(f"  (Sheet/Cell select error: {e})")
+                            excel.Visible = True
+                        except Exception:
+                            pass
+                        
+                        if len(r) > 4 and r[4] is not None:
+                            try:
+                                wb_xl.Windows(1).WindowState = r[4]
+                            except Exception:
+                                pass
+                        
+                        if sheet:
+                            try:
+                                sht = wb_xl.Sheets(sheet)
+                                sht.Activate()
+                                if cell:
+                                    sht.Range(cell).Select()
+                            except Exception as e:
+                                print_func(f"  (Sheet/Cell select error: {e})")
                             
-                    ts3 = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    print_func(f"{ts3} | ({idx}/{len(selected_rows)}) Opened: {path}")
+                        if first_ready is None:
+                            first_ready = time.time() - started
+                        if history is not None:
+                            history.record_open(path, time.time() - t_excel, (file_sizes or {}).get(path))
+                    
+                        ts3 = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        print_func(f"{ts3} | ({idx}/{len(selected_rows)}) Opened: {path}")
                     
-                except Exception as e:
-                    ts4 = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    print_func(f"{ts4} | ({idx}/{len(selected_rows)}) Failed to open: {path} ({e})")
+                    except Exception as e:
+                        ts4 = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        print_func(f"{ts4} | ({idx}/{len(selected_rows)}) Failed to open: {path} ({e})")
                     
-                t1 = time.time()
-                used_sec = t1 - t0
-                print_func(f"used time: {used_sec:.2f} sec")
-                print_func("-" * 80)
+                    t1 = time.time()
+                    used_sec = t1 - t0
+                    io_wait_total += io_wait
+                    excel_wait_total += t1 - t_excel
+                    print_func(f"used time: {used_sec:.2f} sec (waiting on file I/O {io_wait:.2f} sec, on Excel {t1 - t_excel:.2f} sec)")
+                    print_func("-" * 80)
                 
             excel.AskToUpdateLinks = True
             print_func(f"All files loaded. Total: {len(selected_rows)}")
+            print_func(f"Total time: {time.time() - started:.2f} sec "
+                       f"(waiting on file I/O {io_wait_total:.2f} sec, on Excel {excel_wait_total:.2f} sec)")
+            print_func(f"Read ahead: {read_ahead.files_read} file(s), "
+                       f"{read_ahead.bytes_read / (1024 * 1024):.1f} MB")
+            if first_ready is not None:
+                print_func(f"Time to first workbook: {first_ready:.2f} sec")
+            if history is not None:
+                history.record_run(load_policy, len(selected_rows), first_ready, time.time() - started)
+                history.save()
+                print_func("Past restores by open order (average):")
+                for policy, (runs, first, total) in sorted(history.policy_summary().items()):
+                    first_text = f"{first:.2f} sec" if first is not None else "n/a"
+                    print_func(f"  {LOAD_POLICIES.get(policy, policy)}: {runs} run(s), "
+                               f"first workbook {first_text}, total {total:.2f} sec")
             self.parent.after(0, lambda: messagebox.showinfo("Complete", f"{len(selected_rows)} file(s) opened."))
             
         except Exception as e:
@@ -244,7 +432,5 @@ class SessionManager:
             self.parent.after(0, lambda e=e: messagebox.showerror("Error", f"Error loading session:\n{str(e)}"))
             
         finally:
-            if excel is not None:
-                del excel
-            gc.collect()
-            pythoncom.CoUninitialize()
\ No newline at end of file
+            read_ahead.close()
+            gc.collect()
\ No newline at end of file
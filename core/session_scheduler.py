@@ -0,0 +1,250 @@
+"""
+Session Load Scheduler for Excel Session Manager
+
+This module decides the order in which a session's files are opened. The
+policies trade total restore time against how soon the first workbook is
+usable: opening the quickest files first, pinned or prioritized files
+first, the most recently used files first, or link sources before the
+workbooks that depend on them so their links refresh once.
+
+Estimates come from an on-disk OpenHistory of past open durations per file,
+falling back to file size. The history also keeps a record of each restore,
+so policies can be compared by time to first workbook and total time.
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.link_graph import WorkbookLinkGraph
+from core.offline_link_parser import OfflineLinkParser
+from core.workbook_index import normalize_workbook_path
+
+
+# Policy id -> display name
+LOAD_POLICIES = {
+    'session_order': 'Session order',
+    'smallest_first': 'Quickest to open first',
+    'priority_first': 'Pinned / priority files first',
+    'recent_first': 'Most recently used first',
+    'dependency_order': 'Link sources before dependents',
+}
+DEFAULT_LOAD_POLICY = 'session_order'
+
+# Open durations kept per file, and restore runs kept in total
+HISTORY_SAMPLES_PER_FILE = 10
+HISTORY_MAX_RUNS = 200
+
+# Estimate for files never opened before: fixed overhead plus size / throughput
+DEFAULT_OPEN_OVERHEAD = 0.5
+DEFAULT_OPEN_THROUGHPUT = 20 * 1024 * 1024  # bytes per second
+
+# Session row column holding an optional priority ("pinned", or a number; higher opens first)
+PRIORITY_COLUMN = 3
+PINNED_PRIORITY = float('inf')
+
+
+def row_priority(row: Sequence) -> float:
+    """
+    Read the optional priority of a session row.
+
+    Args:
+        row: Session row (path, sheet, cell[, priority])
+
+    Returns:
+        Priority, PINNED_PRIORITY for pinned files, 0 when absent
+    """
+    if len(row) <= PRIORITY_COLUMN or row[PRIORITY_COLUMN] in (None, ''):
+        return 0.0
+    value = row[PRIORITY_COLUMN]
+    if value is True or str(value).strip().lower() in ('pinned', 'pin', 'yes', 'true'):
+        return PINNED_PRIORITY
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class OpenHistory:
+    """
+    JSON file of past workbook open durations and session restore runs.
+
+    Files are keyed by normalized path. Load and save failures are reported
+    and otherwise ignored; the history only improves estimates.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialize the history and load it from disk if present.
+
+        Args:
+            file_path: History JSON file
+        """
+        self.file_path = file_path
+        self.files: Dict[str, Dict] = {}
+        self.runs: List[Dict] = []
+        self.load()
+
+    def load(self):
+        """Read the history file."""
+        if not self.file_path or not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data.get('files', {})
+            self.runs = data.get('runs', [])
+        except Exception as e:
+            print(f"Could not read open history {self.file_path}: {e}")
+
+    def save(self):
+        """Write the history file."""
+        try:
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'files': self.files, 'runs': self.runs[-HISTORY_MAX_RUNS:]}, f)
+        except Exception as e:
+            print(f"Could not save open history {self.file_path}: {e}")
+
+    def record_open(self, path: str, seconds: float, size: Optional[int] = None):
+        """
+        Record how long Excel took to open a file.
+
+        Args:
+            path: Workbook path
+            seconds: Open duration
+            size: Optional file size in bytes
+        """
+        entry = self.files.setdefault(normalize_workbook_path(path), {'path': path, 'durations': []})
+        entry['durations'] = (entry['durations'] + [round(seconds, 3)])[-HISTORY_SAMPLES_PER_FILE:]
+        entry['last_opened'] = datetime.now().isoformat(timespec='seconds')
+        if size is not None:
+            entry['size'] = size
+
+    def record_run(self, policy: str, file_count: int, first_seconds: Optional[float], total_seconds: float):
+        """Record one session restore."""
+        self.runs.append({
+            'policy': policy,
+            'files': file_count,
+            'first': None if first_seconds is None else round(first_seconds, 3),
+            'total': round(total_seconds, 3),
+            'time': datetime.now().isoformat(timespec='seconds')
+        })
+
+    def last_duration(self, path: str) -> Optional[float]:
+        """Most recent recorded open duration of a file in seconds (None if never opened)."""
+        durations = self.files.get(normalize_workbook_path(path), {}).get('durations')
+        return durations[-1] if durations else None
+
+    def last_opened(self, path: str) -> str:
+        """ISO time a file was last opened ('' if never)."""
+        return self.files.get(normalize_workbook_path(path), {}).get('last_opened', '')
+
+    def _throughput(self) -> float:
+        """Bytes per second over files with both a size and durations."""
+        total_bytes = total_seconds = 0.0
+        for entry in self.files.values():
+            if entry.get('size') and entry.get('durations'):
+                total_bytes += entry['size']
+                total_seconds += sum(entry['durations']) / len(entry['durations'])
+        return total_bytes / total_seconds if total_bytes and total_seconds else DEFAULT_OPEN_THROUGHPUT
+
+    def estimated_duration(self, path: str, size: Optional[int] = None) -> float:
+        """
+        Estimate how long Excel will take to open a file.
+
+        Args:
+            path: Workbook path
+            size: Optional file size in bytes
+
+        Returns:
+            Seconds: the average of recorded durations, else a size-based estimate
+        """
+        durations = self.files.get(normalize_workbook_path(path), {}).get('durations')
+        if durations:
+            return sum(durations) / len(durations)
+        return DEFAULT_OPEN_OVERHEAD + (size or 0) / self._throughput()
+
+    def policy_summary(self) -> Dict[str, Tuple[int, Optional[float], float]]:
+        """
+        Compare policies over the recorded runs.
+
+        Returns:
+            Policy -> (runs, average seconds to first workbook, average total seconds)
+        """
+        grouped: Dict[str, List[Dict]] = {}
+        for run in self.runs:
+            grouped.setdefault(run.get('policy', DEFAULT_LOAD_POLICY), []).append(run)
+        summary = {}
+        for policy, runs in grouped.items():
+            firsts = [run['first'] for run in runs if run.get('first') is not None]
+            summary[policy] = (
+                len(runs),
+                sum(firsts) / len(firsts) if firsts else None,
+                sum(run['total'] for run in runs) / len(runs)
+            )
+        return summary
+
+
+class SessionLoadScheduler:
+    """Orders session rows according to a load policy."""
+
+    def __init__(self, history: OpenHistory, file_sizes: Optional[Dict[str, int]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            history: Open duration history
+            file_sizes: Optional file sizes in bytes by path
+        """
+        self.history = history
+        self.file_sizes = file_sizes or {}
+
+    def estimate(self, path: str) -> float:
+        """Estimated open duration of a file in seconds."""
+        return self.history.estimated_duration(path, self.file_sizes.get(path))
+
+    def order(self, rows: Sequence[Sequence], policy: str = DEFAULT_LOAD_POLICY) -> List[Sequence]:
+        """
+        Order session rows for opening.
+
+        Args:
+            rows: Session rows (path, sheet, cell[, priority])
+            policy: Key of LOAD_POLICIES
+
+        Returns:
+            Rows in opening order (ties keep session order)
+        """
+        rows = list(rows)
+        if policy == 'smallest_first':
+            return sorted(rows, key=lambda row: self.estimate(row[0]))
+        if policy == 'priority_first':
+            return sorted(rows, key=lambda row: (-row_priority(row), self.estimate(row[0])))
+        if policy == 'recent_first':
+            # ISO timestamps sort chronologically; never-opened files go last
+            return sorted(rows, key=lambda row: self.history.last_opened(row[0]), reverse=True)
+        if policy == 'dependency_order':
+            return self._dependency_order(rows)
+        return rows
+
+    def _dependency_order(self, rows: List[Sequence]) -> List[Sequence]:
+        """Open link sources before their dependents, otherwise quickest first."""
+        rows = sorted(rows, key=lambda row: self.estimate(row[0]))
+        parser = OfflineLinkParser()
+        link_sources = {}
+        for row in rows:
+            path = row[0]
+            try:
+                link_sources[path] = parser.link_sources(path)
+            except Exception:
+                link_sources[path] = []
+
+        graph = WorkbookLinkGraph.from_link_sources(link_sources)
+        ordered, _ = graph.order_subset(row[0] for row in rows)
+        rows_by_path = {}
+        for row in rows:
+            rows_by_path.setdefault(row[0], []).append(row)
+        return [row for path in dict.fromkeys(ordered) for row in rows_by_path[path]]
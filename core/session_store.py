@@ -0,0 +1,201 @@
+"""
+Session Store for Excel Session Manager
+
+This module reads and writes session files. Sessions are saved as JSON
+lines: a header record with the format name, schema version and metadata,
+then one record per workbook. Reading and writing needs only the standard
+library, so saving or loading a session no longer pays for importing
+openpyxl and parsing a zipped workbook.
+
+Older .xlsx session files (File Path / Sheet Name / Cell Address columns)
+are still read, and a session can be exported to .xlsx for sharing; both
+import openpyxl only when used.
+"""
+
+import os
+import json
+from dataclasses import asdict, fields
+from datetime import datetime
+from typing import Iterable, Optional
+
+from config.constants import APP_VERSION
+from models.session import Session, SessionEntry
+
+
+# Session file format identification
+SESSION_FORMAT = 'excel-session'
+SESSION_FORMAT_VERSION = 1
+SESSION_EXTENSION = '.jsonl'
+LEGACY_SESSION_EXTENSION = '.xlsx'
+
+# File dialog types for session files
+SESSION_FILETYPES = [
+    ("Excel Session", f"*{SESSION_EXTENSION}"),
+    ("Excel Session (xlsx)", f"*{LEGACY_SESSION_EXTENSION}"),
+    ("All Files", "*.*")
+]
+SESSION_OPEN_FILETYPES = [
+    ("Excel Session", f"*{SESSION_EXTENSION} *{LEGACY_SESSION_EXTENSION}"),
+    ("All Files", "*.*")
+]
+
+# Column headers of xlsx session files
+XLSX_HEADERS = ["File Path", "Sheet Name", "Cell Address", "Priority"]
+
+_ENTRY_FIELDS = {f.name for f in fields(SessionEntry)}
+
+
+def is_session_file(path: str) -> bool:
+    """Check whether a path has a session file extension."""
+    return path.lower().endswith((SESSION_EXTENSION, LEGACY_SESSION_EXTENSION))
+
+
+def is_xlsx_session(path: str) -> bool:
+    """
+    Check whether an .xlsx file is a session rather than an ordinary workbook.
+
+    Args:
+        path: .xlsx file path
+
+    Returns:
+        True if the active sheet starts with the session column headers
+    """
+    try:
+        import openpyxl
+        wb = openpyxl.load_workbook(path, read_only=True)
+    except Exception:
+        return False
+    try:
+        header = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+    except Exception:
+        return False
+    finally:
+        wb.close()
+    # Older versions wrote only the first three columns
+    names = [str(value).strip() if value is not None else '' for value in header[:3]]
+    return names == XLSX_HEADERS[:3]
+
+
+def save_session_file(path: str, entries: Iterable[SessionEntry], metadata: Optional[dict] = None) -> Session:
+    """
+    Write a session file; the format follows the extension.
+
+    Args:
+        path: Output path (.xlsx exports the legacy format, anything else is JSON lines)
+        entries: Session entries in opening order
+        metadata: Optional extra header fields
+
+    Returns:
+        The saved Session
+    """
+    session = Session(
+        entries=list(entries),
+        version=SESSION_FORMAT_VERSION,
+        created=datetime.now().isoformat(timespec='seconds'),
+        metadata=dict(metadata or {})
+    )
+    if path.lower().endswith(LEGACY_SESSION_EXTENSION):
+        export_session_to_xlsx(session, path)
+        return session
+
+    header = {
+        'format': SESSION_FORMAT,
+        'version': session.version,
+        'created': session.created,
+        'app_version': APP_VERSION,
+        'count': len(session.entries),
+        'metadata': session.metadata
+    }
+    # Write to a temporary file first so an interrupted save never leaves half a session
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header, ensure_ascii=False) + '\n')
+        for entry in session.entries:
+            record = {key: value for key, value in asdict(entry).items() if value not in (None, '')}
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(temp_path, path)
+    return session
+
+
+def load_session_file(path: str) -> Session:
+    """
+    Read a session file in either format.
+
+    Args:
+        path: Session file path (.jsonl, or a legacy .xlsx)
+
+    Returns:
+        Session
+
+    Raises:
+        ValueError: If the file is not a session or was written by a newer version
+    """
+    if path.lower().endswith(LEGACY_SESSION_EXTENSION):
+        return _load_xlsx_session(path)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            raise ValueError(f"Not a session file: {path}")
+        if not isinstance(header, dict) or header.get('format') != SESSION_FORMAT:
+            raise ValueError(f"Not a session file: {path}")
+        version = int(header.get('version', 0))
+        if version > SESSION_FORMAT_VERSION:
+            raise ValueError(f"Session file version {version} is newer than this application supports "
+                             f"({SESSION_FORMAT_VERSION}): {path}")
+
+        entries = []
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('path'):
+                # Ignore fields from newer minor revisions instead of failing
+                entries.append(SessionEntry(**{k: v for k, v in record.items() if k in _ENTRY_FIELDS}))
+
+    return Session(entries=entries, version=version, created=header.get('created', ''),
+                   metadata=header.get('metadata', {}))
+
+
+def _load_xlsx_session(path: str) -> Session:
+    """Read a legacy xlsx session (active sheet, one workbook per row after the header)."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        ws = wb.active
+        entries = []
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            if not row or not row[0]:
+                continue
+            entries.append(SessionEntry(
+                path=str(row[0]),
+                sheet=str(row[1]) if len(row) > 1 and row[1] else '',
+                cell=str(row[2]) if len(row) > 2 and row[2] else '',
+                priority=str(row[3]) if len(row) > 3 and row[3] not in (None, '') else None
+            ))
+    finally:
+        wb.close()
+
+    created = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds')
+    return Session(entries=entries, version=0, created=created, metadata={'source_format': 'xlsx'})
+
+
+def export_session_to_xlsx(session: Session, path: str):
+    """
+    Export a session as an xlsx sheet that older versions can load.
+
+    Args:
+        session: Session to export
+        path: Output .xlsx path
+    """
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Session"
+    ws.append(XLSX_HEADERS)
+    for entry in session.entries:
+        ws.append([entry.path, entry.sheet, entry.cell, entry.priority])
+    wb.save(path)
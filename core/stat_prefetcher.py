@@ -0,0 +1,242 @@
+"""
+Stat Prefetcher for Excel Session Manager
+
+This module stats many files concurrently before they are needed, so the
+link updater does not wait on each source file in turn. Each call has a
+timeout; a stat that hangs (typically a dead UNC server waiting out the SMB
+timeout) is abandoned and its worker replaced. After a few timeouts on the
+same host, a per-host circuit breaker opens and the remaining files on that
+host fail immediately instead of each waiting for the timeout.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+
+# Defaults for the link updater
+DEFAULT_STAT_WORKERS = 8
+DEFAULT_STAT_TIMEOUT = 5.0
+DEFAULT_HOST_FAILURE_THRESHOLD = 2
+
+# How often the waiting thread checks in-flight stats for timeouts
+_TIMEOUT_POLL_INTERVAL = 0.05
+
+
+class StatResult(NamedTuple):
+    """Outcome of one prefetched stat."""
+    path: str
+    exists: bool
+    mtime: Optional[float]
+    size: Optional[int]
+    error: Optional[str]
+    elapsed: float
+
+
+class HostStats:
+    """Latency and failure counts for one host."""
+
+    __slots__ = ('files', 'total_time', 'max_time', 'timeouts', 'skipped')
+
+    def __init__(self):
+        self.files = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.timeouts = 0
+        self.skipped = 0
+
+    @property
+    def average_time(self) -> float:
+        """Average stat time of the completed (not skipped) files."""
+        completed = self.files - self.skipped
+        return self.total_time / completed if completed else 0.0
+
+
+def host_of(path: str) -> str:
+    """
+    Get the host a path lives on, for grouping and circuit breaking.
+
+    Args:
+        path: File path
+
+    Returns:
+        '\\\\server' for UNC paths, the drive ('C:') for drive paths,
+        otherwise 'local'
+    """
+    normalized = path.replace('/', '\\')
+    if normalized.startswith('\\\\'):
+        server = normalized[2:].split('\\', 1)[0]
+        return '\\\\' + server.casefold()
+    if len(normalized) > 1 and normalized[1] == ':':
+        return normalized[:2].upper()
+    return 'local'
+
+
+def _stat_file(path: str):
+    """Return (exists, mtime, size, error) for one path; never raises."""
+    try:
+        stat = os.stat(path)
+        return True, stat.st_mtime, stat.st_size, None
+    except FileNotFoundError:
+        return False, None, None, None
+    except OSError as e:
+        return False, None, None, str(e)
+
+
+class HostCircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    A host's circuit opens after ``threshold`` consecutive timeouts and
+    stays open for the rest of the run; a completed stat resets the count.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_HOST_FAILURE_THRESHOLD):
+        """
+        Initialize the breaker.
+
+        Args:
+            threshold: Consecutive timeouts that open a host's circuit
+        """
+        self.threshold = max(1, threshold)
+        self._failures: Dict[str, int] = {}
+        self.open_hosts = set()
+
+    def is_open(self, host: str) -> bool:
+        """Check whether files on a host should fail fast."""
+        return host in self.open_hosts
+
+    def record_success(self, host: str):
+        """Reset a host's consecutive timeout count."""
+        self._failures.pop(host, None)
+
+    def record_timeout(self, host: str):
+        """Count a timeout, opening the host's circuit at the threshold."""
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if failures >= self.threshold:
+            self.open_hosts.add(host)
+
+
+class StatPrefetcher:
+    """
+    Bounded, timeout-aware concurrent stat of many files.
+
+    Worker threads are daemons, so a stat stuck on a dead server never
+    blocks interpreter exit.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_STAT_WORKERS, timeout: float = DEFAULT_STAT_TIMEOUT,
+                 failure_threshold: int = DEFAULT_HOST_FAILURE_THRESHOLD,
+                 stat_func: Callable[[str], tuple] = _stat_file):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            max_workers: Maximum concurrent stats
+            timeout: Seconds before a single stat is abandoned
+            failure_threshold: Timeouts per host before its circuit opens
+            stat_func: Function returning (exists, mtime, size, error) for a path
+        """
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.breaker = HostCircuitBreaker(failure_threshold)
+        self.stat_func = stat_func
+        self.host_stats: Dict[str, HostStats] = {}
+        self.wall_time = 0.0
+
+    def prefetch(self, paths: Iterable[str]) -> Dict[str, StatResult]:
+        """
+        Stat every distinct path.
+
+        Args:
+            paths: File paths (duplicates are statted once)
+
+        Returns:
+            Dictionary of path to StatResult
+        """
+        started = time.perf_counter()
+        pending = deque(dict.fromkeys(path for path in paths if path))
+        total = len(pending)
+        results: Dict[str, StatResult] = {}
+        in_flight: Dict[str, float] = {}
+        condition = threading.Condition()
+
+        def finish(path, host, exists, mtime, size, error, elapsed, skipped=False):
+            results[path] = StatResult(path, exists, mtime, size, error, elapsed)
+            stats = self.host_stats.get(host)
+            if stats is None:
+                stats = self.host_stats[host] = HostStats()
+            stats.files += 1
+            if skipped:
+                stats.skipped += 1
+            else:
+                stats.total_time += elapsed
+                stats.max_time = max(stats.max_time, elapsed)
+            condition.notify_all()
+
+        def worker():
+            while True:
+                with condition:
+                    if not pending:
+                        return
+                    path = pending.popleft()
+                    host = host_of(path)
+                    if self.breaker.is_open(host):
+                        finish(path, host, False, None, None, f"host {host} not responding (skipped)", 0.0, skipped=True)
+                        continue
+                    call_started = time.perf_counter()
+                    in_flight[path] = call_started
+
+                exists, mtime, size, error = self.stat_func(path)
+
+                with condition:
+                    if in_flight.pop(path, None) is None:
+                        # Timed out meanwhile; a replacement worker has taken this slot
+                        return
+                    self.breaker.record_success(host)
+                    finish(path, host, exists, mtime, size, error, time.perf_counter() - call_started)
+
+        def start_worker():
+            threading.Thread(target=worker, daemon=True, name="StatPrefetchWorker").start()
+
+        with condition:
+            for _ in range(min(self.max_workers, total)):
+                start_worker()
+            while len(results) < total:
+                condition.wait(_TIMEOUT_POLL_INTERVAL)
+                now = time.perf_counter()
+                for path, call_started in list(in_flight.items()):
+                    if now - call_started >= self.timeout:
+                        del in_flight[path]
+                        host = host_of(path)
+                        self.breaker.record_timeout(host)
+                        self.host_stats.setdefault(host, HostStats()).timeouts += 1
+                        finish(path, host, False, None, None, f"timed out after {self.timeout:g} sec", now - call_started)
+                        start_worker()
+
+        self.wall_time += time.perf_counter() - started
+        return results
+
+    def summary_lines(self) -> List[str]:
+        """
+        Describe wall time and per-host latency for a log.
+
+        Returns:
+            Lines without trailing newlines
+        """
+        files = sum(stats.files for stats in self.host_stats.values())
+        lines = [f"Source file checks: {files} file(s) on {len(self.host_stats)} host(s) "
+                 f"in {self.wall_time:.2f} sec"]
+        for host in sorted(self.host_stats):
+            stats = self.host_stats[host]
+            line = (f"  {host}: {stats.files} file(s), avg {stats.average_time * 1000:.0f} ms, "
+                    f"max {stats.max_time * 1000:.0f} ms")
+            if stats.timeouts:
+                line += f", {stats.timeouts} timed out"
+            if stats.skipped:
+                line += f", {stats.skipped} skipped (host not responding)"
+            lines.append(line)
+        return lines
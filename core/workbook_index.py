@@ -0,0 +1,187 @@
+"""
+Workbook Index for Excel Session Manager
+
+This module provides a per-batch lookup index over excel.Workbooks, so
+finding a workbook by name or full path costs one COM enumeration per batch
+instead of one enumeration per selected workbook. A single lookup uses
+find_open_workbook, which asks Workbooks(name) directly and only enumerates
+on a miss.
+"""
+
+import posixpath
+from typing import Dict, Optional
+
+
+def normalize_workbook_path(path: str) -> str:
+    """
+    Normalize a workbook path for case-insensitive comparison.
+
+    Separators are unified so Windows, UNC and POSIX spellings of the same
+    path compare equal on any platform.
+
+    Args:
+        path: Workbook FullName or file path
+
+    Returns:
+        Normalized, case-folded path (empty string for empty input)
+    """
+    if not path:
+        return ""
+    return posixpath.normpath(path.replace('\\', '/')).casefold()
+
+
+def find_open_workbook(excel, name: str, path: str = ""):
+    """
+    Find one open workbook without enumerating all of them.
+
+    Workbooks(name) answers in one COM call (Excel cannot have two open
+    workbooks with the same name); the full index is only built when that
+    misses, to match by full path instead.
+
+    Args:
+        excel: Excel Application COM object
+        name: Workbook name
+        path: Optional workbook FullName to match if the name does not
+
+    Returns:
+        Workbook COM object or None
+    """
+    if name:
+        try:
+            return excel.Workbooks(name)
+        except Exception:
+            pass
+    return WorkbookIndex(excel).find(name, path) if path else None
+
+
+class WorkbookIndex:
+    """
+    Name and FullName index over the workbooks open in one Excel instance.
+
+    The index is built lazily with a single enumeration of excel.Workbooks
+    and then kept for the batch; lookups make no further COM calls. Callers
+    that open or close workbooks during the batch should call
+    ``invalidate`` or ``discard``. Must be used on the thread that owns the
+    Excel proxy.
+    """
+
+    def __init__(self, excel):
+        """
+        Initialize the workbook index.
+
+        Args:
+            excel: Excel Application COM object
+        """
+        self.excel = excel
+        self._by_name: Dict[str, object] = {}
+        self._by_path: Dict[str, object] = {}
+        self._count: Optional[int] = None
+        self.builds = 0
+
+    def invalidate(self):
+        """Drop the index; the next lookup rebuilds it."""
+        self._by_name = {}
+        self._by_path = {}
+        self._count = None
+
+    def discard(self, name: str, path: str = ""):
+        """
+        Remove a workbook that was just closed.
+
+        Args:
+            name: Workbook name
+            path: Optional workbook FullName
+        """
+        wb = self._by_name.pop(name.casefold(), None)
+        if path:
+            self._by_path.pop(normalize_workbook_path(path), None)
+        elif wb is not None:
+            for key, value in list(self._by_path.items()):
+                if value is wb:
+                    del self._by_path[key]
+        if self._count is not None and wb is not None:
+            self._count -= 1
+
+    def get(self, name: str):
+        """
+        Find an open workbook by name.
+
+        Args:
+            name: Workbook name (e.g., 'Book1.xlsx')
+
+        Returns:
+            Workbook COM object or None
+        """
+        if not name:
+            return None
+        self._ensure_current()
+        wb = self._by_name.get(name.casefold())
+        if wb is None:
+            wb = self._direct_lookup(name)
+        return wb
+
+    def get_by_path(self, path: str):
+        """
+        Find an open workbook by full path.
+
+        Args:
+            path: Workbook FullName or file path
+
+        Returns:
+            Workbook COM object or None
+        """
+        if not path:
+            return None
+        self._ensure_current()
+        return self._by_path.get(normalize_workbook_path(path))
+
+    def find(self, name: str, path: str = ""):
+        """
+        Find an open workbook by full path, falling back to its name.
+
+        Args:
+            name: Workbook name
+            path: Optional workbook FullName
+
+        Returns:
+            Workbook COM object or None
+        """
+        wb = self.get_by_path(path) if path else None
+        return wb if wb is not None else self.get(name)
+
+    def has_path(self, path: str) -> bool:
+        """Whether a workbook with the given full path is open."""
+        return self.get_by_path(path) is not None
+
+    def _ensure_current(self):
+        """Build the index on first use in the batch."""
+        if self._count is None:
+            self._build()
+
+    def _build(self):
+        """Enumerate excel.Workbooks once and index every workbook."""
+        self._by_name = {}
+        self._by_path = {}
+        count = 0
+        for wb in self.excel.Workbooks:
+            count += 1
+            try:
+                self._by_name[wb.Name.casefold()] = wb
+                self._by_path[normalize_workbook_path(wb.FullName)] = wb
+            except Exception:
+                continue
+        self._count = count
+        self.builds += 1
+
+    def _direct_lookup(self, name: str):
+        """Fall back to indexing excel.Workbooks(name) directly."""
+        try:
+            wb = self.excel.Workbooks(name)
+        except Exception:
+            return None
+        try:
+            self._by_name[wb.Name.casefold()] = wb
+            self._by_path[normalize_workbook_path(wb.FullName)] = wb
+        except Exception:
+            pass
+        return wb
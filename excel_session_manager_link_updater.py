@@ -1,7 +1,13 @@
 import win32com.client
 import os
 from datetime import datetime, timedelta
-import pythoncom
+from core.com_worker import get_com_worker
+from core.excel_manager import ExcelPerformanceMode
+from core.link_graph import WorkbookLinkGraph
+from core.link_update_plan import (UpdatePlan, PlanItem, CheckpointJournal, DEFAULT_RESUME_MAX_AGE_HOURS,
+                                   DECISION_UPDATE, DECISION_SKIP, DECISION_NONE, DECISION_ERROR)
+from core.stat_prefetcher import StatPrefetcher, DEFAULT_STAT_TIMEOUT, DEFAULT_STAT_WORKERS
+from core.workbook_index import WorkbookIndex, normalize_workbook_path
 
 def get_cutoff_message(check_days):
     threshold_date = datetime.now() - timedelta(days=int(check_days))
@@ -15,6 +21,12 @@ def run_excel_link_update(options: dict, print_func=None):
     SHOW_LAST_MODIFIED = bool(options.get("SHOW_LAST_MODIFIED", False))
     SHOW_STATUS = bool(options.get("SHOW_STATUS", False))
     SAVE_LOG = bool(options.get("SAVE_LOG", True))
+    STAT_WORKERS = int(options.get("STAT_WORKERS", DEFAULT_STAT_WORKERS))
+    STAT_TIMEOUT = float(options.get("STAT_TIMEOUT", DEFAULT_STAT_TIMEOUT))
+    DRY_RUN = bool(options.get("DRY_RUN", False))
+    RESUME = bool(options.get("RESUME", False))
+    RESUME_MAX_AGE_HOURS = float(options.get("RESUME_MAX_AGE_HOURS", DEFAULT_RESUME_MAX_AGE_HOURS))
+    CHECKPOINT_FILE = options.get("CHECKPOINT_FILE") or os.path.join(LOG_DIR, "excel_link_update_checkpoint.jsonl")
     if SAVE_LOG:
         if not os.path.exists(LOG_DIR):
             os.makedirs(LOG_DIR, exist_ok=True)
@@ -34,22 +46,19 @@ def run_excel_link_update(options: dict, print_func=None):
             log_file_handler.write(line + "\n")
             log_file_handler.flush()
 
-    def setup_excel():
-        try:
-            pythoncom.CoInitialize()
-            return win32com.client.Dispatch("Excel.Application")
-        except Exception as e:
-            print_log(f"Excel initialization failed: {e}")
-            raise
+    # Source files are statted up front, concurrently; see check_and_update_links
+    stat_prefetcher = StatPrefetcher(max_workers=STAT_WORKERS, timeout=STAT_TIMEOUT)
+    stat_results = {}
 
     def get_last_modified_date(file_path):
-        try:
-            if os.path.exists(file_path):
-                return datetime.fromtimestamp(os.path.getmtime(file_path))
-            return None
-        except Exception as e:
-            print_log(f"Cannot access {file_path}: {e}")
-            return None
+        result = stat_results.get(file_path)
+        if result is None:
+            result = stat_results[file_path] = stat_prefetcher.prefetch([file_path])[file_path]
+        if result.error:
+            print_log(f"Cannot access {file_path}: {result.error}")
+        if result.exists:
+            return datetime.fromtimestamp(result.mtime)
+        return None
 
     def get_days_ago(last_modified):
         if not last_modified:
@@ -57,18 +66,204 @@ def run_excel_link_update(options: dict, print_func=None):
         days = (datetime.now() - last_modified).days
         return f"({days} days ago)"
 
-    def is_workbook_open(excel, file_path):
-        try:
-            for wb in excel.Workbooks:
-                if os.path.samefile(wb.FullName, file_path):
-                    return True
-            return False
-        except Exception:
-            return False
-
-    def check_and_update_links():
-        excel = setup_excel()
+    # Normalized FullNames of the open workbooks, so link checks need no file I/O.
+    # Rebuilt by order_open_workbooks; rebuild it after opening or closing workbooks.
+    open_paths = set()
+
+    def is_workbook_open(file_path):
+        return normalize_workbook_path(file_path) in open_paths
+
+    def order_open_workbooks(excel):
+        """Read each open workbook's LinkSources once and order the workbooks upstream first."""
+        open_workbooks = {}
+        link_sources = {}
+        errors = {}
+        open_paths.clear()
+        for workbook in excel.Workbooks:
+            full_name = workbook.FullName
+            open_workbooks[full_name] = workbook
+            open_paths.add(normalize_workbook_path(full_name))
+            try:
+                link_sources[full_name] = list(workbook.LinkSources(win32com.client.constants.xlExcelLinks) or ())
+            except Exception as e:
+                link_sources[full_name] = []
+                errors[full_name] = e
+
+        graph = WorkbookLinkGraph.from_link_sources(link_sources)
+        ordered, _ = graph.order_subset(open_workbooks)
+        feeds_open = {
+            name for name in open_workbooks
+            if any(is_workbook_open(dep) for dep in graph.dependents_of(name))
+        }
+        cycles = [cycle for cycle in graph.find_cycles()
+                  if any(is_workbook_open(name) for name in cycle)]
+        order = [(name, link_sources[name], errors.get(name)) for name in ordered]
+        return order, feeds_open, cycles
+
+    def print_workbook_order(order, feeds_open, cycles):
+        print_log("Update order (source workbooks first):")
+        for position, (name, links, error) in enumerate(order, 1):
+            display = name if SHOW_FULL_PATH else os.path.basename(name)
+            notes = [f"{len(links)} link(s)"]
+            if name in feeds_open:
+                notes.append("recalculated before dependents")
+            if error is not None:
+                notes.append("LinkSources failed")
+            print_log(f"  {position}. {display} ({', '.join(notes)})")
+        for cycle in cycles:
+            members = [name if SHOW_FULL_PATH else os.path.basename(name) for name in cycle]
+            print_log(f"  Warning: circular links, no safe order between: {', '.join(members)}")
+
+    def plan_link_updates(order, feeds_open):
+        """Planning phase: decide, without changing anything, which links to update."""
         threshold_date = datetime.now() - timedelta(days=CHECK_DAYS)
+        plan = UpdatePlan(recalculate=[name for name, _, _ in order if name in feeds_open],
+                          check_days=CHECK_DAYS)
+        total_workbooks = len(order)
+
+        for workbook_index, (workbook_name, links, links_error) in enumerate(order, 1):
+            filename = os.path.basename(workbook_name)
+            print_log("")
+            print_log("=" * 50)
+            print_log(f"Scanning ({workbook_index}/{total_workbooks}): {filename}")
+
+            if links_error is not None:
+                print_log(f"Error processing {filename}: {links_error}")
+                plan.items.append(PlanItem(workbook_name, "", DECISION_ERROR, str(links_error)))
+                continue
+            if not links:
+                print_log("")
+                print_log(f"Plan ({workbook_index}/{total_workbooks}): No external links found")
+                plan.items.append(PlanItem(workbook_name, "", DECISION_NONE, "No external links found"))
+                continue
+
+            total_links = len(links)
+            print_log(f"  Found {total_links} external link(s)")
+            print_log("")
+            print_log("-" * 60)
+            update_count = 0
+
+            for link_index, link in enumerate(links, 1):
+                if link_index > 1:
+                    print_log("-" * 60)
+                last_modified = get_last_modified_date(link)
+                last_modified_str = last_modified.strftime('%Y-%m-%d %H:%M:%S') if last_modified else "Not accessible"
+                days_ago = get_days_ago(last_modified)
+                link_display = link if SHOW_FULL_PATH else os.path.basename(link)
+
+                if SHOW_LINK:
+                    print_log(f"  Link ({link_index}/{total_links}): {link_display}")
+                if SHOW_LAST_MODIFIED:
+                    print_log(f"  Last Modified: {last_modified_str} {days_ago}")
+
+                decision = DECISION_SKIP
+                if last_modified and last_modified >= threshold_date:
+                    if is_workbook_open(link):
+                        status = "Source file currently open. Update skipped (data refreshed in open workbook)."
+                    else:
+                        decision = DECISION_UPDATE
+                        update_count += 1
+                        status = "Proceeding to update external link."
+                else:
+                    status = f"No update needed (Source file not modified within {CHECK_DAYS} days)."
+
+                plan.items.append(PlanItem(
+                    workbook_name, link, decision, status,
+                    last_modified.isoformat(timespec='seconds') if last_modified else None
+                ))
+                if SHOW_STATUS:
+                    print_log(f"  Status: {status}")
+
+            print_log("")
+            if update_count:
+                print_log(f"Plan ({workbook_index}/{total_workbooks}): {update_count} link(s) to update")
+            else:
+                print_log(f"Plan ({workbook_index}/{total_workbooks}): No links need updating")
+
+        return plan
+
+    def save_plan_file(plan):
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            plan_file = os.path.join(LOG_DIR, f"excel_link_update_plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            plan.save(plan_file)
+            print_log(f"Update plan saved: {plan_file}")
+        except Exception as e:
+            print_log(f"Failed to save update plan: {e}")
+
+    def recalculate(excel):
+        # Application.Calculate follows Excel's dependency tree across sheets and
+        # workbooks and only evaluates dirty cells; per-sheet Calculate in manual
+        # mode ignores cross-sheet precedents and can leave stale values
+        excel.Calculate()
+
+    def execute_plan(excel, plan, journal, updated_links, finished_workbooks):
+        """Execution phase: apply the plan, journaling each finished step.
+
+        Returns (links updated, workbooks left unfinished).
+        """
+        total_updated = 0
+        unfinished = 0
+        workbook_index = WorkbookIndex(excel)
+        recalculate_names = set(plan.recalculate)
+        workbooks = plan.workbooks
+        # Values changed since the last calculation; starts dirty because
+        # calculation was manual before the run
+        needs_calculation = True
+
+        for position, workbook_name in enumerate(workbooks, 1):
+            # Each workbook's links are updated at most once per run, resumed runs included
+            if workbook_name in finished_workbooks:
+                continue
+            filename = os.path.basename(workbook_name)
+            to_update = [item.link for item in plan.items_for(workbook_name)
+                         if item.decision == DECISION_UPDATE
+                         and (workbook_name, item.link) not in updated_links]
+            if not to_update and workbook_name not in recalculate_names:
+                journal.workbook_finished(workbook_name)
+                continue
+
+            workbook = workbook_index.get_by_path(workbook_name)
+            if workbook is None:
+                print_log(f"Action ({position}/{len(workbooks)}): {filename} is no longer open, skipped")
+                unfinished += 1
+                continue
+
+            failed = False
+            try:
+                if to_update:
+                    print_log("")
+                    print_log(f"Action ({position}/{len(workbooks)}): {filename}")
+                    print_log("  Updating links...")
+                    for link in to_update:
+                        link_display = link if SHOW_FULL_PATH else os.path.basename(link)
+                        try:
+                            workbook.UpdateLink(Name=link, Type=win32com.client.constants.xlExcelLinks)
+                            needs_calculation = True
+                            journal.link_updated(workbook_name, link)
+                            print_log(f"    Updated: {link_display}")
+                            total_updated += 1
+                        except Exception as e:
+                            failed = True
+                            print_log(f"    Failed to update {link_display}: {e}")
+
+                if workbook_name in recalculate_names and needs_calculation:
+                    # Downstream workbooks read this one's values next
+                    recalculate(excel)
+                    needs_calculation = False
+                    print_log(f"  Recalculated open workbooks before those depending on {filename}")
+            except Exception as e:
+                failed = True
+                print_log(f"Error processing {filename}: {e}")
+
+            if failed:
+                unfinished += 1
+            else:
+                journal.workbook_finished(workbook_name)
+
+        return total_updated, unfinished
+
+    def check_and_update_links(excel):
         total_updated = 0
         total_workbooks = 0
 
@@ -76,6 +271,7 @@ def run_excel_link_update(options: dict, print_func=None):
         print_log(f"Checking links modified within {CHECK_DAYS} days")
 
         summary_records = []
+        journal = CheckpointJournal(CHECKPOINT_FILE)
 
         try:
             total_workbooks = excel.Workbooks.Count
@@ -83,86 +279,59 @@ def run_excel_link_update(options: dict, print_func=None):
                 print_log("No open workbooks found")
                 return
 
-            workbook_index = 0
-            for workbook in excel.Workbooks:
-                workbook_index += 1
-                workbook_name = workbook.FullName
-                filename = os.path.basename(workbook_name)
-                folderpath = os.path.dirname(workbook_name)
-                print_log("")
-                print_log("=" * 50)
-                print_log(f"Scanning ({workbook_index}/{total_workbooks}): {filename}")
+            resumed = None
+            if RESUME and not DRY_RUN:
+                # Runs that are too old, planned differently or about closed workbooks are closed off
+                resumed = journal.load_unfinished(max_age_hours=RESUME_MAX_AGE_HOURS,
+                                                  open_workbooks=[wb.FullName for wb in excel.Workbooks],
+                                                  check_days=CHECK_DAYS)
+                if journal.discarded_reason:
+                    print_log(f"Not resuming the checkpointed run: {journal.discarded_reason}")
+            if resumed:
+                plan, updated_links, finished_workbooks = resumed
+                print_log(f"Resuming run planned at {plan.created} from checkpoint: {CHECKPOINT_FILE}")
+                print_log(f"  {len(finished_workbooks)} of {len(plan.workbooks)} workbook(s) and "
+                          f"{len(updated_links)} of {plan.update_count} link update(s) already done")
+            else:
+                if RESUME and not DRY_RUN:
+                    print_log("No interrupted run to resume; planning a new run")
+                updated_links, finished_workbooks = set(), set()
+                order, feeds_open, cycles = order_open_workbooks(excel)
+                print_workbook_order(order, feeds_open, cycles)
+                stat_results.update(stat_prefetcher.prefetch(link for _, links, _ in order for link in links))
+                plan = plan_link_updates(order, feeds_open)
 
-                try:
-                    links = workbook.LinkSources(win32com.client.constants.xlExcelLinks)
-                    if not links:
-                        print_log("")
-                        print_log(f"Action ({workbook_index}/{total_workbooks}): No external links found")
-                        summary_records.append((folderpath, filename, "No external links found"))
-                        continue
-
-                    total_links = len(links)
-                    print_log(f"  Found {total_links} external link(s)")
-                    print_log("")
-                    print_log("-" * 60)
-                    updated_links = []
-
-                    for link_index, link in enumerate(links, 1):
-                        if link_index > 1:
-                            print_log("-" * 60)
-                        last_modified = get_last_modified_date(link)
-                        last_modified_str = last_modified.strftime('%Y-%m-%d %H:%M:%S') if last_modified else "Not accessible"
-                        days_ago = get_days_ago(last_modified)
-                        status = ""
-                        link_display = link if SHOW_FULL_PATH else os.path.basename(link)
+            total_workbooks = len(plan.workbooks)
+            for item in plan.items:
+                summary_records.append((os.path.dirname(item.workbook), os.path.basename(item.workbook),
+                                        item.link or item.reason))
 
-                        summary_records.append((folderpath, filename, link))
-
-                        if SHOW_LINK:
-                            print_log(f"  Link ({link_index}/{total_links}): {link_display}")
-                        if SHOW_LAST_MODIFIED:
-                            print_log(f"  Last Modified: {last_modified_str} {days_ago}")
-
-                        if last_modified and last_modified >= threshold_date:
-                            if is_workbook_open(excel, link):
-                                status = "Source file currently open. Update skipped (data refreshed in open workbook)."
-                            else:
-                                updated_links.append(link)
-                                status = "Proceeding to update external link."
-                        else:
-                            status = f"No update needed (Source file not modified within {CHECK_DAYS} days)."
-
-                        if SHOW_STATUS:
-                            print_log(f"  Status: {status}")
-
-                    if updated_links:
-                        print_log("")
-                        print_log(f"Action ({workbook_index}/{total_workbooks}): {filename}")
-                        print_log("  Updating links...")
-                        for link in updated_links:
-                            try:
-                                workbook.UpdateLink(Name=link, Type=win32com.client.constants.xlExcelLinks)
-                                link_display = link if SHOW_FULL_PATH else os.path.basename(link)
-                                print_log(f"    Updated: {link_display}")
-                                total_updated += 1
-                            except Exception as e:
-                                link_display = link if SHOW_FULL_PATH else os.path.basename(link)
-                                print_log(f"    Failed to update {link_display}: {e}")
-                    else:
-                        print_log("")
-                        print_log(f"Action ({workbook_index}/{total_workbooks}): No links need updating")
+            print_log("")
+            print_log(f"Plan: {plan.update_count} link update(s) across {total_workbooks} workbook(s)")
+            if DRY_RUN:
+                print_log("Dry run: no links were updated")
+                save_plan_file(plan)
+                return
 
-                except Exception as e:
-                    print_log(f"Error processing {filename}: {e}")
+            journal.start(plan, resume=bool(resumed))
+            total_updated, unfinished = execute_plan(excel, plan, journal, updated_links, finished_workbooks)
+            if unfinished:
+                print_log(f"{unfinished} workbook(s) not finished; run again with resume enabled to retry them")
+            else:
+                journal.complete()
 
         except Exception as e:
             print_log(f"Process failed: {e}")
 
         finally:
+            journal.close()
             print_log("\n=== Excel Link Update Completed ===")
             print_log(f"Summary:")
             print_log(f"  Workbooks processed: {total_workbooks}")
             print_log(f"  Links updated: {total_updated}")
+            if stat_prefetcher.host_stats:
+                for line in stat_prefetcher.summary_lines():
+                    print_log(f"  {line}")
             save_scan_summary = options.get("SAVE_SCAN_SUMMARY", False)
             summary_dir = options.get("SUMMARY_DIR", r"D:\Pzone\Log")
             if save_scan_summary and summary_records:
@@ -185,11 +354,20 @@ def run_excel_link_update(options: dict, print_func=None):
                     print_log(f"Scan summary excel saved: {summary_file}")
                 except Exception as e:
                     print_log(f"Failed to save scan summary excel: {e}")
-            pythoncom.CoUninitialize()
             if log_file_handler:
                 log_file_handler.close()
 
-    check_and_update_links()
+    def update_links_in_performance_mode(excel):
+        # Upstream workbooks are still recalculated explicitly; the rest recalculates once at the end
+        with ExcelPerformanceMode(excel, manual_calculation=not DRY_RUN):
+            check_and_update_links(excel)
+
+    try:
+        get_com_worker().call(update_links_in_performance_mode, operation="update_external_links")
+    except Exception as e:
+        print_log(f"External link update failed: {e}")
+        if log_file_handler and not log_file_handler.closed:
+            log_file_handler.close()
 
 if __name__ == "__main__":
     run_excel_link_update({}, print_func=None)
\ No newline at end of file
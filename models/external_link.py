@@ -0,0 +1,65 @@
+"""
+External Link Models for Excel Session Manager
+
+This module contains the data classes shared by the live (COM) and offline
+external link scanners, plus helpers for grouping link records.
+"""
+
+from dataclasses import dataclass
+from collections import defaultdict
+from typing import Dict, Iterable, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ExternalLink:
+    """Data class for external link information (immutable, hashable and slotted)."""
+    __slots__ = ('source_workbook', 'source_sheet', 'source_cell', 'target_file', 'formula', 'link_type')
+    
+    source_workbook: str
+    source_sheet: str
+    source_cell: str
+    target_file: str
+    formula: str
+    link_type: str  # 'LinkSource', 'Formula' or 'DefinedName'
+    
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        """Identity of the link within its workbook: (sheet, cell, target_file)."""
+        return (self.source_sheet, self.source_cell, self.target_file)
+    
+    def __reduce__(self):
+        # Frozen slotted instances cannot be restored by setting attributes
+        return (ExternalLink, (self.source_workbook, self.source_sheet, self.source_cell,
+                               self.target_file, self.formula, self.link_type))
+
+
+@dataclass
+class ExternalFileGroup:
+    """Data class for grouping links by external file."""
+    external_file: str
+    links: Sequence[ExternalLink]
+    reference_count: int
+
+
+def group_links_by_external_file(links: Iterable[ExternalLink]) -> Dict[str, ExternalFileGroup]:
+    """
+    Group external links by target external file.
+
+    Args:
+        links: External link records
+
+    Returns:
+        Dictionary of external file name to ExternalFileGroup
+    """
+    file_groups = defaultdict(list)
+    for link in links:
+        file_groups[link.target_file].append(link)
+
+    return {
+        external_file: ExternalFileGroup(
+            external_file=external_file,
+            links=file_links,
+            reference_count=len(file_links)
+        )
+        for external_file, file_links in file_groups.items()
+    }
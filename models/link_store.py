@@ -0,0 +1,243 @@
+"""
+Compact Link Store for Excel Session Manager
+
+This module keeps large numbers of external links in a columnar layout:
+every field is stored as an index into a shared string pool, so a link costs
+a few array slots instead of a Python object holding its own copies of the
+workbook, sheet, file and formula text. ExternalLink records are only
+materialized when an entry is read.
+"""
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from models.external_link import ExternalLink, ExternalFileGroup
+
+
+# ExternalLink fields in column order
+LINK_FIELDS = ('source_workbook', 'source_sheet', 'source_cell', 'target_file', 'formula', 'link_type')
+
+
+class StringPool:
+    """
+    Pool of distinct strings addressed by integer id.
+
+    Equal strings are stored once, whichever object they came from.
+    """
+
+    __slots__ = ('_ids', '_strings')
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def add(self, value: str) -> int:
+        """
+        Add a string to the pool.
+
+        Args:
+            value: String to pool
+
+        Returns:
+            Id of the pooled string
+        """
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._strings)
+
+
+class LinkStore(Sequence):
+    """
+    Columnar, string-pooled sequence of ExternalLink records.
+
+    Supports len(), indexing, slicing and iteration like a list of
+    ExternalLink; entries are immutable once appended.
+    """
+
+    def __init__(self, links: Iterable[ExternalLink] = ()):
+        """
+        Initialize the store.
+
+        Args:
+            links: Optional initial links
+        """
+        self.pool = StringPool()
+        self._columns = {name: array('I') for name in LINK_FIELDS}
+        self.extend(links)
+
+    def append(self, link: ExternalLink):
+        """Append one link."""
+        add = self.pool.add
+        for name in LINK_FIELDS:
+            self._columns[name].append(add(getattr(link, name)))
+
+    def extend(self, links: Iterable[ExternalLink]):
+        """
+        Append several links.
+
+        Links from another LinkStore are copied column by column, with its
+        pool ids remapped into this pool, without materializing records.
+
+        Args:
+            links: ExternalLink records or a LinkStore
+        """
+        if isinstance(links, LinkStore):
+            add = self.pool.add
+            remap = [add(value) for value in links.pool]
+            for name in LINK_FIELDS:
+                self._columns[name].extend(remap[string_id] for string_id in links.column(name))
+            return
+        for link in links:
+            self.append(link)
+
+    def clear(self):
+        """Remove all links and pooled strings."""
+        self.pool = StringPool()
+        self._columns = {name: array('I') for name in LINK_FIELDS}
+
+    def column(self, name: str) -> array:
+        """
+        Get the string-id column of one field.
+
+        Args:
+            name: ExternalLink field name
+
+        Returns:
+            Array of pool ids, one per link
+        """
+        return self._columns[name]
+
+    def value(self, index: int, name: str) -> str:
+        """Get one field of one link without materializing the record."""
+        return self.pool[self._columns[name][index]]
+
+    def __len__(self) -> int:
+        return len(self._columns['source_workbook'])
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        pool = self.pool
+        columns = self._columns
+        return ExternalLink(*(pool[columns[name][index]] for name in LINK_FIELDS))
+
+    def __iter__(self) -> Iterator[ExternalLink]:
+        pool = self.pool
+        columns = [self._columns[name] for name in LINK_FIELDS]
+        for ids in zip(*columns):
+            yield ExternalLink(*(pool[string_id] for string_id in ids))
+
+    def view(self, indices: Iterable[int]) -> 'LinkStoreView':
+        """Get a lazy view over a subset of the links."""
+        return LinkStoreView(self, indices)
+
+    def rank_keys(self, name: str, key: Callable[[str], Any] = str.lower,
+                  indices: Optional[Iterable[int]] = None) -> array:
+        """
+        Compute integer sort keys for one field without materializing links.
+
+        Only the distinct pooled values are sorted with ``key``; each link
+        then gets the rank of its value. Values with equal keys share a rank.
+
+        Args:
+            name: ExternalLink field name
+            key: Sort key applied to the field's string values
+            indices: Optional subset of store indices (default: all, in order)
+
+        Returns:
+            Array with one rank per link, in the order of ``indices``
+        """
+        column = self._columns[name]
+        ids = column if indices is None else array('I', (column[index] for index in indices))
+        pool = self.pool
+        ranks: Dict[int, int] = {}
+        rank = -1
+        previous = object()
+        for string_id, value_key in sorted(((string_id, key(pool[string_id])) for string_id in set(ids)),
+                                           key=lambda item: item[1]):
+            if value_key != previous:
+                rank += 1
+                previous = value_key
+            ranks[string_id] = rank
+        return array('I', map(ranks.__getitem__, ids))
+
+    def group_by_external_file(self, indices: Optional[Iterable[int]] = None) -> Dict[str, ExternalFileGroup]:
+        """
+        Group links by target file without materializing them.
+
+        Args:
+            indices: Optional subset of store indices to group (default: all)
+
+        Returns:
+            Dictionary of external file name to ExternalFileGroup whose
+            links are lazy views into this store
+        """
+        targets = self._columns['target_file']
+        if indices is None:
+            indices = range(len(targets))
+        groups: Dict[int, array] = {}
+        for index in indices:
+            target_id = targets[index]
+            members = groups.get(target_id)
+            if members is None:
+                members = groups[target_id] = array('I')
+            members.append(index)
+
+        return {
+            self.pool[target_id]: ExternalFileGroup(
+                external_file=self.pool[target_id],
+                links=LinkStoreView(self, members),
+                reference_count=len(members)
+            )
+            for target_id, members in groups.items()
+        }
+
+
+class LinkStoreView(Sequence):
+    """Lazy, read-only view of selected entries of a LinkStore."""
+
+    def __init__(self, store: LinkStore, indices: Iterable[int]):
+        """
+        Initialize the view.
+
+        Args:
+            store: Backing link store
+            indices: Store indices in view order
+        """
+        self.store = store
+        self.indices = indices if isinstance(indices, array) else array('I', indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.store[i] for i in self.indices[index]]
+        return self.store[self.indices[index]]
+
+    def __iter__(self) -> Iterator[ExternalLink]:
+        store = self.store
+        for index in self.indices:
+            yield store[index]
+
+    def group_by_external_file(self) -> Dict[str, ExternalFileGroup]:
+        """Group the viewed links by target file (see LinkStore.group_by_external_file)."""
+        return self.store.group_by_external_file(self.indices)
+
+    def rank_keys(self, name: str, key: Callable[[str], Any] = str.lower) -> array:
+        """Integer sort keys of the viewed links (see LinkStore.rank_keys)."""
+        return self.store.rank_keys(name, key, self.indices)
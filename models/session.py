@@ -0,0 +1,61 @@
+"""
+Session Models for Excel Session Manager
+
+This module contains the data classes for a saved session: one entry per
+workbook with where to reopen it and metadata captured when it was saved,
+and the summary of a session file held by the session library index.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class SessionEntry:
+    """One workbook in a saved session."""
+    path: str
+    sheet: str = ''
+    cell: str = ''
+    size: Optional[int] = None             # File size in bytes when saved
+    mtime: Optional[float] = None          # File modification time when saved
+    open_seconds: Optional[float] = None   # Last recorded open duration
+    window_state: Optional[int] = None     # XlWindowState of the first window
+    priority: Optional[str] = None         # 'pinned' or a number as text; see session_scheduler
+
+    def as_row(self) -> Tuple:
+        """Session row as used by the loader: (path, sheet, cell, priority, window_state)."""
+        return (self.path, self.sheet, self.cell, self.priority, self.window_state)
+
+
+@dataclass
+class Session:
+    """A saved session: its entries plus file-level metadata."""
+    entries: List[SessionEntry] = field(default_factory=list)
+    version: int = 1
+    created: str = ''
+    metadata: Dict = field(default_factory=dict)
+
+    @property
+    def paths(self) -> List[str]:
+        """Workbook paths in session order."""
+        return [entry.path for entry in self.entries]
+
+    def rows(self) -> List[Tuple]:
+        """Loader rows for every entry."""
+        return [entry.as_row() for entry in self.entries]
+
+
+@dataclass
+class IndexedSession:
+    """A session file found in the session library index."""
+    path: str
+    created: str = ''
+    entry_count: int = 0
+    matches: List[str] = field(default_factory=list)  # Member paths that matched the search
+    error: Optional[str] = None                       # Why the file could not be read, if it failed
+
+    @property
+    def name(self) -> str:
+        """Session file name."""
+        return os.path.basename(self.path)
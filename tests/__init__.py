@@ -0,0 +1 @@
+# Unit tests for the non-COM components of Excel Session Manager
@@ -0,0 +1,140 @@
+"""
+Tests for the COM worker thread, against a fake Excel dispatch.
+"""
+
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.com_worker import ComWorkerBusyError, ExcelComWorker, RPC_FAILURE_HRESULTS
+
+RPC_E_DISCONNECTED = -2147417848
+
+
+class FakeExcel:
+    def __init__(self, number):
+        self.number = number
+        self.Ready = True
+
+
+class FakeDispatch:
+    """Creates a new fake Application per call, like re-dispatching after Excel restarts."""
+
+    def __init__(self):
+        self.created = []
+
+    def __call__(self, prog_id):
+        excel = FakeExcel(len(self.created) + 1)
+        self.created.append(prog_id)
+        return excel
+
+
+def disconnected():
+    return Exception(RPC_E_DISCONNECTED, "The object invoked has disconnected from its clients.", None, None)
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    # The worker thread initializes COM; record the calls instead
+    com = SimpleNamespace(calls=[])
+    com.CoInitialize = lambda: com.calls.append("init")
+    com.CoUninitialize = lambda: com.calls.append("uninit")
+    com.PumpWaitingMessages = lambda: None
+    monkeypatch.setitem(sys.modules, "pythoncom", com)
+    dispatch = FakeDispatch()
+    worker = ExcelComWorker(dispatch=dispatch)
+    worker.com = com
+    worker.dispatch = dispatch
+    yield worker
+    worker.stop()
+    assert com.calls == ["init", "uninit"]
+
+
+def test_jobs_share_one_warm_connection(worker):
+    assert worker.call(lambda excel: excel.number) == 1
+    assert worker.call(lambda excel, offset: excel.number + offset, 10) == 11
+    assert worker.dispatch.created == ["Excel.Application"]
+
+
+def test_busy_worker_raises_and_cancels_the_waiting_job(worker):
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def long_job(excel):
+        started.set()
+        release.wait(5)
+
+    running = worker.submit(long_job, operation="load_session")
+    assert started.wait(5)
+    with pytest.raises(ComWorkerBusyError) as error:
+        worker.call(lambda excel: ran.append(True), operation="get_open_workbooks", timeout=0.05)
+    release.set()
+    running.result(5)
+
+    assert error.value.operation == "get_open_workbooks"
+    assert error.value.running == "load_session"
+    assert worker.call(lambda excel: "after") == "after"
+    assert ran == []
+
+
+def test_read_only_jobs_reconnect_and_retry_after_an_rpc_failure(worker):
+    assert RPC_E_DISCONNECTED in RPC_FAILURE_HRESULTS
+    seen = []
+
+    def read_workbooks(excel):
+        seen.append(excel.number)
+        if excel.number == 1:
+            raise disconnected()
+        return "workbooks"
+
+    assert worker.call(read_workbooks, read_only=True) == "workbooks"
+    assert seen == [1, 2]
+    assert worker.reconnect_count == 1
+
+
+def test_other_jobs_fail_after_an_rpc_failure_without_running_again(worker):
+    seen = []
+
+    def save_workbook(excel):
+        seen.append(excel.number)
+        raise disconnected()
+
+    with pytest.raises(Exception) as error:
+        worker.call(save_workbook)
+    assert error.value.args[0] == RPC_E_DISCONNECTED
+    assert seen == [1]
+    # The next job gets a new connection
+    assert worker.call(lambda excel: excel.number) == 2
+
+
+def test_dead_cached_proxy_is_replaced_before_the_next_job(worker):
+    first = worker.call(lambda excel: excel)
+
+    class DeadExcel:
+        @property
+        def Ready(self):
+            raise disconnected()
+
+    worker.call(lambda excel: setattr(worker, "_excel", DeadExcel()))
+    assert worker.call(lambda excel: excel.number) == 2
+    assert first.number == 1
+    assert worker.reconnect_count == 1
+
+
+def test_nested_submit_runs_inline_on_the_worker_thread(worker):
+    def outer(excel):
+        operations = [worker.current_operation]
+        inner = worker.call(lambda excel: (worker.current_operation, worker.is_worker_thread()),
+                            operation="inner", timeout=1)
+        operations.append(worker.current_operation)
+        return operations, inner
+
+    operations, inner = worker.call(outer, operation="outer", timeout=5)
+
+    assert operations == ["outer", "outer"]
+    assert inner == ("inner", True)
+    assert worker.current_operation is None
+    assert not worker.is_worker_thread()
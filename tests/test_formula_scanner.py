@@ -0,0 +1,124 @@
+"""
+Tests for the bulk formula scanner, run against the scripted COM stand-in.
+"""
+
+from benchmarks.com_standin import FakeWorksheet, RoundTripCounter, build_linked_sheet
+from core.external_links_manager import ExternalLinksManager
+from core.formula_scanner import (FormulaRun, FormulaScanner, cell_address, column_letter,
+                                  formula_runs, range_address)
+
+
+def test_column_letter():
+    assert column_letter(1) == "A"
+    assert column_letter(26) == "Z"
+    assert column_letter(27) == "AA"
+    assert column_letter(702) == "ZZ"
+    assert column_letter(703) == "AAA"
+    assert column_letter(16384) == "XFD"
+
+
+def test_addresses_match_range_address_format():
+    assert cell_address(7, 2) == "$B$7"
+    assert range_address(2, 3, 500, 3) == "$C$2:$C$500"
+    assert range_address(4, 4, 4, 4) == "$D$4"
+
+
+def test_formula_runs_merge_vertical_neighbours_only():
+    cells = [(3, 1), (1, 1), (2, 1), (5, 1), (1, 2)]
+    assert formula_runs(cells) == [FormulaRun(1, 1, 3), FormulaRun(1, 5, 5), FormulaRun(2, 1, 1)]
+
+
+def test_iter_formulas_reads_used_range_in_one_block():
+    counter = RoundTripCounter()
+    sheet = FakeWorksheet("Sheet1", {(2, 2): "=A1", (2, 3): 5, (4, 3): "=B2*2", (3, 2): "text"}, counter)
+    scanner = FormulaScanner()
+
+    formulas = list(scanner.iter_formulas(sheet))
+
+    assert formulas == [(2, 2, "=A1"), (4, 3, "=B2*2")]
+    assert scanner.stats['blocks_fetched'] == 1
+    assert scanner.stats['cells_read'] == 6
+    assert scanner.stats['formula_cells'] == 2
+
+
+def test_single_cell_used_range_is_a_scalar():
+    sheet = FakeWorksheet("Sheet1", {(3, 4): "=Z1"}, RoundTripCounter())
+    assert list(FormulaScanner().iter_formulas(sheet)) == [(3, 4, "=Z1")]
+
+
+def test_large_sheet_is_read_in_row_blocks_with_correct_coordinates():
+    counter = RoundTripCounter()
+    sheet = build_linked_sheet("Big", rows=50, cols=4, counter=counter)
+    expected = sorted((row, col, value) for (row, col), value in sheet.cells.items()
+                      if isinstance(value, str) and value.startswith('='))
+    scanner = FormulaScanner(max_block_cells=40)
+
+    formulas = sorted(scanner.iter_formulas(sheet))
+
+    assert formulas == expected
+    assert scanner.stats['blocks_fetched'] == 5  # 10 rows x 4 columns per block
+    assert scanner.stats['cells_read'] == 200
+
+
+def test_bulk_read_round_trips_do_not_grow_with_cells():
+    counter = RoundTripCounter()
+    sheet = build_linked_sheet("Sheet1", rows=200, cols=5, counter=counter)
+    list(FormulaScanner().iter_formulas(sheet))
+    assert counter.count < 10
+
+
+def test_group_formulas_groups_filled_down_copies():
+    counter = RoundTripCounter()
+    sheet = build_linked_sheet("Sheet1", rows=20, cols=3, counter=counter, link_every=10)
+    scanner = FormulaScanner()
+
+    groups, blocks = scanner.group_formulas(sheet)
+
+    assert blocks == [(1, 1, 20, 3)]
+    external = groups["='C:\\Data\\[Source.xlsx]Input'!RC1*2"]
+    assert external == [(10, 1), (10, 2), (10, 3), (20, 1), (20, 2), (20, 3)]
+    assert groups["=RC1+2"] == [(row, 2) for row in range(1, 21) if row % 10]
+    assert scanner.stats['distinct_formulas'] == len(groups) == 3
+
+
+def test_confirm_run_uses_one_call_for_uniform_runs():
+    counter = RoundTripCounter()
+    cells = {(row, 1): "=B1" for row in range(1, 11)}
+    cells[(12, 1)] = "'=not a formula"
+    sheet = FakeWorksheet("Sheet1", cells, counter)
+    scanner = FormulaScanner()
+
+    counter.reset()
+    assert scanner.confirm_run(sheet, FormulaRun(1, 1, 10)) == list(range(1, 11))
+    assert counter.count <= 4
+    assert scanner.confirm_run(sheet, FormulaRun(1, 12, 12)) == []
+    assert scanner.confirm_run(sheet, FormulaRun(1, 9, 12)) == [9, 10]
+
+
+def test_display_formulas_read_only_the_matching_area_of_each_block():
+    counter = RoundTripCounter()
+    sheet = build_linked_sheet("Big", rows=50, cols=4, counter=counter, link_every=10)
+    scanner = FormulaScanner(max_block_cells=40)
+
+    links = ExternalLinksManager()._scan_sheet_formulas(sheet, "Book.xlsx", scanner)
+
+    assert [link.source_cell for link in links] == [f"${col}${row}" for row in range(10, 51, 10) for col in "ABCD"]
+    assert all(link.formula == sheet.cells[(int(link.source_cell.split("$")[2]), 1)] for link in links)
+    # 5 R1C1 blocks of 10x4 cells, then one 1x4 A1 read per block with links
+    assert scanner.stats['blocks_fetched'] == 10
+    assert scanner.stats['cells_read'] == 200 + 5 * 4
+
+
+def test_compress_ranges_reports_filled_down_formulas_once():
+    counter = RoundTripCounter()
+    cells = {(row, 3): f"='C:\\Data\\[Source.xlsx]Input'!A{row}" for row in range(2, 7)}
+    cells[(1, 1)] = "label"
+    r1c1 = {cell: "='C:\\Data\\[Source.xlsx]Input'!RC1" for cell in cells if cell[1] == 3}
+    sheet = FakeWorksheet("Data", cells, counter, r1c1)
+
+    manager = ExternalLinksManager(compress_ranges=True)
+    [link] = manager._scan_sheet_formulas(sheet, "Book.xlsx", FormulaScanner())
+
+    assert link.source_cell == "$C$2:$C$6"
+    assert link.formula == "='C:\\Data\\[Source.xlsx]Input'!A2"
+    assert len(ExternalLinksManager()._scan_sheet_formulas(sheet, "Book.xlsx", FormulaScanner())) == 5
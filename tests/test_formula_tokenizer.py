@@ -0,0 +1,46 @@
+"""
+Tests for the single-pass external reference tokenizer.
+"""
+
+from utils.formula_tokenizer import (ExternalReference, cached_external_files, external_files_in_formula,
+                                     has_external_reference, tokenize_external_references)
+
+
+def test_unquoted_reference_with_path():
+    [ref] = tokenize_external_references(r"=C:\Data\[Source.xlsx]Input!$A$1*2")
+    assert ref == ExternalReference("Source.xlsx", "C:\\Data\\", "Input", "$A$1", "Source.xlsx")
+
+
+def test_quoted_path_with_spaces_and_escaped_quote():
+    [ref] = tokenize_external_references(r"='C:\My Dir\[Bob''s Book.xlsx]Sheet 1'!A1:B5")
+    assert ref.filename == "Bob's Book.xlsx"
+    assert ref.path == "C:\\My Dir\\"
+    assert ref.sheet == "Sheet 1"
+    assert ref.range == "A1:B5"
+
+
+def test_unc_path_inside_brackets_and_r1c1_range():
+    [ref] = tokenize_external_references(r"='[\\server\share\Rates.xlsm]Q1'!R[-1]C2")
+    assert (ref.filename, ref.path, ref.sheet, ref.range) == ("Rates.xlsm", "\\\\server\\share\\", "Q1", "R[-1]C2")
+
+
+def test_workbook_level_name_and_stored_index():
+    [name] = tokenize_external_references(r"='C:\Data\Rates.xlsx'!ExtRate")
+    assert (name.filename, name.path, name.sheet, name.range) == ("Rates.xlsx", "C:\\Data\\", "", "ExtRate")
+    [stored] = tokenize_external_references("=[1]Input!B2")
+    assert (stored.filename, stored.sheet, stored.range) == ("1", "Input", "B2")
+
+
+def test_string_literals_and_local_references_are_ignored():
+    assert tokenize_external_references('="[a.xlsx]Sheet1!A1"&Sheet2!A1') == []
+    assert tokenize_external_references("='Local Sheet'!A1+SUM(B:B)") == []
+    assert tokenize_external_references("") == []
+    assert not has_external_reference("=A1+1")
+
+
+def test_distinct_files_in_formula_order():
+    formula = "=[b.xlsx]S!A1+[a.xlsx]S!A1+'[b.xlsx]S 2'!B:B+[a.xlsx]S!#REF!"
+    assert [ref.range for ref in tokenize_external_references(formula)] == ["A1", "A1", "B:B", "#REF!"]
+    assert external_files_in_formula(formula) == ["b.xlsx", "a.xlsx"]
+    assert cached_external_files(formula) == ("b.xlsx", "a.xlsx")
+    assert has_external_reference(formula)
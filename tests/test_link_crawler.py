@@ -0,0 +1,114 @@
+"""
+Tests for the incremental link crawler and its SQLite index.
+"""
+
+import os
+
+import pytest
+
+from core.link_crawler import LinkCrawler, LinkIndex
+
+openpyxl = pytest.importorskip("openpyxl")
+from tests.test_offline_link_parser import add_external_book
+
+
+def write_linked_workbook(path, target, rows=1):
+    wb = openpyxl.Workbook()
+    index = add_external_book(wb, target)
+    for row in range(1, rows + 1):
+        wb.active[f"A{row}"] = f"=[{index}]Input!A{row}"
+    wb.save(path)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "Share"
+    (root / "Team").mkdir(parents=True)
+    for i in range(4):
+        write_linked_workbook(str(root / f"Book{i}.xlsx"), r"C:\Data\Source.xlsx")
+    write_linked_workbook(str(root / "Team" / "Rates.xlsx"), r"C:\Data\Rates.xlsx", rows=3)
+    return root
+
+
+def crawl(crawler, root):
+    return crawler.crawl(str(root), print_func=lambda msg: None)
+
+
+def test_parallel_crawl_indexes_every_workbook(tmp_path, tree):
+    crawler = LinkCrawler(str(tmp_path / "links.sqlite"), workers=2)
+    try:
+        stats = crawl(crawler, tree)
+        assert (stats['files_seen'], stats['files_parsed'], stats['files_failed']) == (5, 5, 0)
+        # One LinkSource and one formula per book, three formulas in Rates.xlsx
+        assert stats['links_found'] == 4 * 2 + 4
+        rates = list(crawler.index.iter_links("rates.XLSX"))
+        assert {link.source_workbook for link in rates} == {"Rates.xlsx"}
+        assert len(rates) == 4
+    finally:
+        crawler.close()
+
+
+def test_recrawl_parses_only_changed_files_and_drops_deleted_ones(tmp_path, tree):
+    crawler = LinkCrawler(str(tmp_path / "links.sqlite"), workers=1)
+    try:
+        crawl(crawler, tree)
+        stats = crawl(crawler, tree)
+        assert (stats['files_parsed'], stats['files_unchanged']) == (0, 5)
+
+        write_linked_workbook(str(tree / "Book0.xlsx"), r"C:\Data\Other.xlsx")
+        bump_mtime(str(tree / "Book0.xlsx"))
+        os.remove(str(tree / "Team" / "Rates.xlsx"))
+        stats = crawl(crawler, tree)
+        assert (stats['files_parsed'], stats['files_removed']) == (1, 1)
+        assert list(crawler.index.iter_links("Rates.xlsx")) == []
+        assert [link.source_workbook for link in crawler.index.iter_links("Other.xlsx")] == ["Book0.xlsx"] * 2
+
+        assert crawler.crawl(str(tree), full=True, print_func=lambda msg: None)['files_parsed'] == 4
+    finally:
+        crawler.close()
+
+
+def test_failed_parse_is_retried_on_the_next_crawl(tmp_path, tree):
+    broken = tree / "Broken.xlsx"
+    broken.write_bytes(b"not a zip file")
+    crawler = LinkCrawler(str(tmp_path / "links.sqlite"), workers=1)
+    try:
+        assert crawl(crawler, tree)['files_failed'] == 1
+        stats = crawl(crawler, tree)
+        assert (stats['files_parsed'], stats['files_failed']) == (1, 1)
+
+        write_linked_workbook(str(broken), r"C:\Data\Fixed.xlsx")
+        stats = crawl(crawler, tree)
+        assert (stats['files_parsed'], stats['files_failed']) == (1, 0)
+        assert crawl(crawler, tree)['files_parsed'] == 0
+    finally:
+        crawler.close()
+
+
+def test_signatures_match_the_root_in_any_case(tmp_path, monkeypatch):
+    # Emulate Windows path comparison on any platform
+    monkeypatch.setattr(os.path, "normcase", lambda path: path.lower())
+    index = LinkIndex(str(tmp_path / "links.sqlite"))
+    try:
+        index.store_file("/Share/Team/Book.xlsx", 10, 20, [])
+        index.store_file("/Share/Team/Broken.xlsx", 30, 40, [], error="bad zip")
+        index.store_file("/Share/Teamwork/Other.xlsx", 50, 60, [])
+        index.commit()
+
+        signatures = index.signatures("/SHARE/team")
+        assert signatures == {
+            os.path.normcase(os.path.abspath("/Share/Team/Book.xlsx")): (10, 20),
+            os.path.normcase(os.path.abspath("/Share/Team/Broken.xlsx")): (None, None),
+        }
+
+        index.store_file("/share/TEAM/book.xlsx", 11, 21, [])
+        index.remove_files([os.path.normcase(os.path.abspath("/Share/Team/Broken.xlsx"))])
+        index.commit()
+        assert list(index.signatures("/Share/Team").values()) == [(11, 21)]
+    finally:
+        index.close()
@@ -0,0 +1,74 @@
+"""
+Tests for the workbook dependency graph.
+"""
+
+from core.link_graph import WorkbookLinkGraph
+from models.external_link import ExternalLink
+from models.link_store import LinkStore
+
+
+def graph_of(*edges):
+    graph = WorkbookLinkGraph()
+    for workbook, source in edges:
+        graph.add_link(workbook, source)
+    return graph
+
+
+def test_self_loop_is_a_cycle():
+    graph = graph_of(("Loop.xlsx", "Loop.xlsx"), ("Report.xlsx", "Loop.xlsx"))
+
+    assert graph.find_cycles() == [["Loop.xlsx"]]
+    assert graph.upstream("Loop.xlsx") == ["Loop.xlsx"]
+    assert graph.downstream("Loop.xlsx") == ["Loop.xlsx", "Report.xlsx"]
+    assert graph.topological_order() == ["Loop.xlsx", "Report.xlsx"]
+
+
+def test_multi_node_cycle_is_kept_together_and_ordered_after_its_sources():
+    graph = graph_of(("A.xlsx", "B.xlsx"), ("B.xlsx", "C.xlsx"), ("C.xlsx", "A.xlsx"),
+                     ("C.xlsx", "Rates.xlsx"), ("Report.xlsx", "A.xlsx"))
+
+    assert graph.has_cycles()
+    assert [sorted(cycle) for cycle in graph.find_cycles()] == [["A.xlsx", "B.xlsx", "C.xlsx"]]
+    order = graph.topological_order()
+    assert order[0] == "Rates.xlsx" and order[-1] == "Report.xlsx"
+    assert sorted(order[1:4]) == ["A.xlsx", "B.xlsx", "C.xlsx"]
+    assert graph.upstream("A.xlsx") == ["A.xlsx", "B.xlsx", "C.xlsx", "Rates.xlsx"]
+    assert graph.downstream("Rates.xlsx") == ["A.xlsx", "B.xlsx", "C.xlsx", "Report.xlsx"]
+
+
+def test_disconnected_components():
+    graph = graph_of(("Sales.xlsx", "Prices.xlsx"), ("Payroll.xlsx", "Staff.xlsx"))
+    graph.add_node("Alone.xlsx")
+
+    assert len(graph) == 5 and graph.edge_count == 2
+    assert not graph.has_cycles()
+    assert graph.downstream("Prices.xlsx") == ["Sales.xlsx"]
+    assert graph.upstream("Payroll.xlsx") == ["Staff.xlsx"]
+    assert graph.upstream("Alone.xlsx") == [] and graph.downstream("Alone.xlsx") == []
+    order = graph.topological_order()
+    assert order.index("Prices.xlsx") < order.index("Sales.xlsx")
+    assert order.index("Staff.xlsx") < order.index("Payroll.xlsx")
+    assert graph.order_subset(["Sales.xlsx", "Missing.xlsx", "Prices.xlsx"]) == (
+        ["Prices.xlsx", "Sales.xlsx"], ["Missing.xlsx"])
+
+
+def test_case_and_separator_variants_are_one_node():
+    graph = graph_of((r"C:\Models\Report.xlsx", r"\\server\share\Rates.xlsx"),
+                     ("c:/models/REPORT.xlsx", "//SERVER/share/rates.xlsx"),
+                     (r"C:\Models\.\Summary.xlsx", r"c:\models\report.XLSX"))
+
+    assert len(graph) == 3 and graph.edge_count == 2
+    assert "C:/MODELS/report.xlsx" in graph
+    # Names are kept as first added
+    assert graph.sources_of("c:/models/report.xlsx") == [r"\\server\share\Rates.xlsx"]
+    assert graph.downstream(r"\\Server\Share\RATES.xlsx") == [r"C:\Models\.\Summary.xlsx", r"C:\Models\Report.xlsx"]
+
+
+def test_from_links_reads_a_store_and_a_list_alike():
+    links = [ExternalLink("Report.xlsx", "S", f"$A${row}", "Rates.xlsx", "=x", "Formula") for row in range(1, 4)]
+    links.append(ExternalLink("Rates.xlsx", "", "", "FX.xlsx", "LinkSource: FX.xlsx", "LinkSource"))
+
+    for source in (links, LinkStore(links)):
+        graph = WorkbookLinkGraph.from_links(source)
+        assert graph.edge_count == 2
+        assert graph.upstream("Report.xlsx") == ["FX.xlsx", "Rates.xlsx"]
@@ -0,0 +1,59 @@
+"""
+Tests for the trigram link search index.
+"""
+
+import pytest
+
+from core.link_search_index import LinkSearchIndex, SearchCancelled
+from models.external_link import ExternalLink
+from models.link_store import LinkStore
+
+
+def make_store():
+    return LinkStore([
+        ExternalLink("Budget.xlsx", "Input", "$A$1", "Rates 2024.xlsx", "=[Rates 2024.xlsx]Input!A1", "Formula"),
+        ExternalLink("Budget.xlsx", "Summary", "$B$2", "abcxbcd.xlsx", "=[abcxbcd.xlsx]Summary!B2", "Formula"),
+        ExternalLink("Forecast.xlsx", "Rates", "$C$3", "Rates 2024.xlsx", "=[Rates 2024.xlsx]Rates!C3", "Formula"),
+        ExternalLink("Forecast.xlsx", "", "", "FX.xlsx", r"LinkSource: C:\Data\FX.xlsx", "LinkSource"),
+    ])
+
+
+def cells(view):
+    return [link.source_cell for link in view]
+
+
+def test_substring_search_is_case_insensitive():
+    index = LinkSearchIndex(make_store())
+    assert cells(index.search("RATES 20")) == ["$A$1", "$C$3"]
+    assert cells(index.search("forecast", "source_workbook")) == ["$C$3", ""]
+    assert cells(index.search("data\\fx", "formula")) == [""]
+
+
+def test_trigram_candidates_are_verified():
+    index = LinkSearchIndex(make_store())
+    # 'abcxbcd' contains every trigram of 'abcd' but not 'abcd' itself
+    assert cells(index.search("abcd")) == []
+    assert cells(index.search("xbc")) == ["$B$2"]
+
+
+def test_short_keywords_scan_distinct_strings():
+    index = LinkSearchIndex(make_store())
+    assert cells(index.search("fx")) == [""]
+    assert cells(index.search("u", "source_sheet")) == ["$A$1", "$B$2"]
+
+
+def test_all_fields_returns_each_link_once_in_store_order():
+    index = LinkSearchIndex(make_store())
+    # Matches the sheet of the third link and the file of the first and third
+    assert cells(index.search("rates", "all")) == ["$A$1", "$C$3"]
+    assert cells(index.search("no such text", "all")) == []
+    assert cells(index.search("rates", "unknown_field")) == []
+
+
+def test_superseded_search_stops_with_search_cancelled():
+    index = LinkSearchIndex(make_store())
+    with pytest.raises(SearchCancelled):
+        index.search("rates", "all", is_cancelled=lambda: True)
+    with pytest.raises(SearchCancelled):
+        index.search("x", "formula", is_cancelled=lambda: True)
+    assert cells(index.search("rates", "all", is_cancelled=lambda: False)) == ["$A$1", "$C$3"]
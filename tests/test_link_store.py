@@ -0,0 +1,121 @@
+"""
+Tests for the columnar link store and the manager scans that fill it.
+"""
+
+from types import SimpleNamespace
+
+import core.external_links_manager as external_links_manager
+from benchmarks.com_standin import FakeWorkbook, FakeWorksheet, RoundTripCounter
+from core.external_links_manager import ExternalLinksManager
+from models.external_link import ExternalLink
+from models.link_store import LINK_FIELDS, LinkStore
+
+
+def link(workbook, target, cell="$A$1", sheet="Sheet1", link_type="Formula"):
+    return ExternalLink(workbook, sheet, cell, target, f"=[{target}]{sheet}!A1", link_type)
+
+
+def test_store_pools_strings_and_behaves_like_a_list():
+    links = [link("Book.xlsx", "A.xlsx", f"$A${row}") for row in range(1, 4)] + [link("Book.xlsx", "B.xlsx")]
+    store = LinkStore(links)
+
+    assert list(store) == links
+    assert store[-1] == links[-1]
+    assert store[1:3] == links[1:3]
+    assert store.value(2, 'source_cell') == "$A$3"
+    # Book.xlsx, Sheet1, Formula and the shared formula text are stored once
+    assert len(store.pool) == len({getattr(item, name) for item in links for name in LINK_FIELDS})
+
+
+def test_extend_from_another_store_remaps_pool_ids():
+    store = LinkStore([link("Main.xlsx", "Z.xlsx")])
+    other = LinkStore([link("Other.xlsx", "A.xlsx"), link("Main.xlsx", "Z.xlsx", "$B$2")])
+
+    store.extend(other)
+
+    assert list(store) == [link("Main.xlsx", "Z.xlsx"), link("Other.xlsx", "A.xlsx"), link("Main.xlsx", "Z.xlsx", "$B$2")]
+    assert store.column('target_file')[0] == store.column('target_file')[2]
+    assert len(other) == 2
+
+
+def test_group_by_external_file_returns_lazy_views():
+    store = LinkStore([link("Book.xlsx", "A.xlsx"), link("Book.xlsx", "B.xlsx"), link("Other.xlsx", "A.xlsx")])
+
+    groups = store.group_by_external_file()
+
+    assert {name: group.reference_count for name, group in groups.items()} == {"A.xlsx": 2, "B.xlsx": 1}
+    assert [item.source_workbook for item in groups["A.xlsx"].links] == ["Book.xlsx", "Other.xlsx"]
+    subset = store.view([1, 2]).group_by_external_file()
+    assert sorted(subset) == ["A.xlsx", "B.xlsx"]
+
+
+class InlineWorker:
+    """COM worker stand-in that runs jobs on the calling thread."""
+
+    def __init__(self, excel):
+        self.excel = excel
+
+    def call(self, func, *args, operation=None, **kwargs):
+        return func(self.excel, *args, **kwargs)
+
+
+def open_workbooks(monkeypatch, targets):
+    counter = RoundTripCounter()
+    workbooks = [
+        FakeWorkbook(f"Book{i}.xlsx",
+                     [FakeWorksheet("Sheet1", {(1, 1): f"=[{target}]Input!A1"}, counter)], counter)
+        for i, target in enumerate(targets)
+    ]
+    worker = InlineWorker(SimpleNamespace(Workbooks=workbooks))
+    monkeypatch.setattr(external_links_manager, "get_com_worker", lambda: worker)
+
+
+def test_rescan_replaces_the_store_without_touching_earlier_views(monkeypatch):
+    manager = ExternalLinksManager()
+    open_workbooks(monkeypatch, ["A.xlsx", "B.xlsx"])
+    first, statistics = manager.scan_open_workbooks()
+    view = manager.get_grouped_search_results("a.x")["A.xlsx"].links
+    assert statistics['total_links'] == 2
+
+    open_workbooks(monkeypatch, ["C.xlsx"])
+    second, _ = manager.scan_open_workbooks()
+
+    assert second is not first
+    assert [item.target_file for item in first] == ["A.xlsx", "B.xlsx"]
+    assert [item.source_cell for item in view] == ["$A$1"]
+    assert [item.target_file for item in manager.search_links("c.xlsx")] == ["C.xlsx"]
+    assert list(manager.search_links("a.xlsx")) == []
+
+
+def test_search_during_a_rescan_answers_from_one_scan(monkeypatch):
+    manager = ExternalLinksManager()
+    open_workbooks(monkeypatch, ["A.xlsx"])
+    first, _ = manager.scan_open_workbooks()
+    open_workbooks(monkeypatch, ["A.xlsx", "A2.xlsx"])
+    worker = external_links_manager.get_com_worker()
+    during = []
+
+    def scan_then_search(func, *args, **kwargs):
+        result = InlineWorker.call(worker, func, *args, **kwargs)
+        during.append(manager.search_links("a"))
+        return result
+
+    monkeypatch.setattr(worker, "call", scan_then_search)
+    second, _ = manager.scan_open_workbooks()
+
+    assert during[0].store is first and len(during[0]) == 1
+    assert manager.search_links("a").store is second and len(manager.search_links("a")) == 2
+    assert manager.search_links("") is second
+
+
+def test_rank_keys_sort_like_the_values_without_materializing_links():
+    store = LinkStore([link("b.xlsx", "X.xlsx"), link("A.xlsx", "X.xlsx"), link("a.xlsx", "Y.xlsx"),
+                       link("C.xlsx", "Y.xlsx")])
+
+    ranks = store.rank_keys('source_workbook')
+    assert list(ranks) == [1, 0, 0, 2]  # case-insensitive; equal keys share a rank
+    assert sorted(range(len(store)), key=ranks.__getitem__) == [1, 2, 0, 3]
+
+    view = store.view([3, 0])
+    assert list(view.rank_keys('source_workbook')) == [1, 0]
+    assert list(view.rank_keys('source_workbook', key=len)) == [0, 0]
@@ -0,0 +1,103 @@
+"""
+Tests for the link update plan and its checkpoint journal.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from core.link_update_plan import (DECISION_NONE, DECISION_SKIP, DECISION_UPDATE, CheckpointJournal, PlanItem,
+                                   UpdatePlan)
+
+
+def make_plan(created=None):
+    plan = UpdatePlan(items=[
+        PlanItem(r"C:\Models\Rates.xlsx", r"C:\Data\FX.xlsx", DECISION_UPDATE, "modified 1 day ago"),
+        PlanItem(r"C:\Models\Report.xlsx", r"C:\Models\Rates.xlsx", DECISION_SKIP, "source is open"),
+        PlanItem(r"C:\Models\Report.xlsx", r"C:\Data\Old.xlsx", DECISION_UPDATE, "modified today", "2026-10-18"),
+        PlanItem(r"C:\Models\Notes.xlsx", "", DECISION_NONE, "no external links"),
+    ], recalculate=[r"C:\Models\Rates.xlsx"], check_days=14)
+    if created:
+        plan.created = created
+    return plan
+
+
+OPEN = [r"C:\Models\Rates.xlsx", r"C:\Models\Report.xlsx", r"C:\Models\Notes.xlsx"]
+
+
+def interrupted_journal(tmp_path, plan):
+    journal = CheckpointJournal(str(tmp_path / "checkpoint.jsonl"))
+    journal.start(plan)
+    journal.link_updated(r"C:\Models\Rates.xlsx", r"C:\Data\FX.xlsx")
+    journal.workbook_finished(r"C:\Models\Rates.xlsx")
+    journal.close()
+    return journal
+
+
+def test_plan_order_counts_and_round_trip(tmp_path):
+    plan = make_plan()
+    assert plan.workbooks == [r"C:\Models\Rates.xlsx", r"C:\Models\Report.xlsx", r"C:\Models\Notes.xlsx"]
+    assert plan.update_count == 2
+    assert [item.link for item in plan.items_for(r"C:\Models\Report.xlsx")] == [r"C:\Models\Rates.xlsx",
+                                                                               r"C:\Data\Old.xlsx"]
+    path = str(tmp_path / "plan.json")
+    plan.save(path)
+    with open(path, encoding="utf-8") as f:
+        assert UpdatePlan.from_dict(json.load(f)) == plan
+
+
+def test_interrupted_run_resumes_with_finished_work(tmp_path):
+    journal = interrupted_journal(tmp_path, make_plan())
+
+    plan, updated, finished = journal.load_unfinished(max_age_hours=24, open_workbooks=OPEN, check_days=14)
+
+    assert plan == make_plan(plan.created)
+    assert updated == {(r"C:\Models\Rates.xlsx", r"C:\Data\FX.xlsx")}
+    assert finished == {r"C:\Models\Rates.xlsx"}
+    assert journal.discarded_reason is None
+
+
+def test_resumed_run_appends_and_completes(tmp_path):
+    journal = interrupted_journal(tmp_path, make_plan())
+    plan, _, _ = journal.load_unfinished()
+    journal.start(plan, resume=True)
+    journal.workbook_finished(r"C:\Models\Report.xlsx")
+    journal.complete()
+
+    assert journal.load_unfinished() is None
+    assert journal.discarded_reason is None
+
+
+def test_line_cut_off_by_a_crash_is_ignored(tmp_path):
+    journal = interrupted_journal(tmp_path, make_plan())
+    with open(journal.file_path, "a", encoding="utf-8") as f:
+        f.write('{"type": "workbook", "workb')
+
+    _, _, finished = journal.load_unfinished()
+    assert finished == {r"C:\Models\Rates.xlsx"}
+
+
+def test_old_journal_expires_and_is_marked_completed(tmp_path):
+    created = (datetime.now() - timedelta(hours=30)).isoformat(timespec="seconds")
+    journal = interrupted_journal(tmp_path, make_plan(created))
+
+    assert journal.load_unfinished(max_age_hours=24, open_workbooks=OPEN) is None
+    assert "more than 24 hour(s) ago" in journal.discarded_reason
+    # Closed off for good, even without an age limit
+    assert journal.load_unfinished() is None
+    assert journal.discarded_reason is None
+
+
+def test_journal_for_a_different_check_period_is_not_resumed(tmp_path):
+    journal = interrupted_journal(tmp_path, make_plan())
+    assert journal.load_unfinished(check_days=7) is None
+    assert "within 14 days, not 7" in journal.discarded_reason
+
+
+def test_journal_whose_unfinished_workbooks_are_closed_is_not_resumed(tmp_path):
+    journal = interrupted_journal(tmp_path, make_plan())
+    # Only the finished workbook is still open
+    assert journal.load_unfinished(open_workbooks=[r"c:/models/rates.xlsx"]) is None
+    assert journal.discarded_reason == "none of its unfinished workbooks is open"
+
+    journal = interrupted_journal(tmp_path, make_plan())
+    assert journal.load_unfinished(open_workbooks=[r"c:/MODELS/report.xlsx"]) is not None
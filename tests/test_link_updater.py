@@ -0,0 +1,87 @@
+"""
+Tests for executing a link update plan against open workbooks.
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("win32com.client")
+pytest.importorskip("win32gui")
+pytest.importorskip("psutil")
+
+import excel_session_manager_link_updater as link_updater
+from core.link_update_plan import CheckpointJournal
+
+
+class InlineWorker:
+    """Runs COM jobs on the calling thread against a fake Excel."""
+
+    def __init__(self, excel):
+        self.excel = excel
+
+    def call(self, func, *args, operation=None, **kwargs):
+        return func(self.excel, *args, **kwargs)
+
+
+class FakeWorkbook:
+    def __init__(self, full_name, link_sources=()):
+        self.FullName = full_name
+        self.Name = os.path.basename(full_name)
+        self.link_sources = list(link_sources)
+        self.updated = []
+
+    def LinkSources(self, link_type):
+        return tuple(self.link_sources)
+
+    def UpdateLink(self, Name, Type):
+        self.updated.append(Name)
+
+
+class FakeWorkbooks(list):
+    @property
+    def Count(self):
+        return len(self)
+
+
+class FakeExcel:
+    def __init__(self, workbooks):
+        self.Workbooks = FakeWorkbooks(workbooks)
+        self.ScreenUpdating = True
+        self.EnableEvents = True
+        self.DisplayAlerts = True
+        self.Calculation = -4105
+        self.CalculateBeforeSave = True
+        self.calculations = 0
+
+    def Calculate(self):
+        self.calculations += 1
+
+
+def test_upstream_workbooks_are_recalculated_and_the_run_completes(tmp_path, monkeypatch):
+    source = tmp_path / "Data" / "Rates.xlsx"
+    source.parent.mkdir()
+    source.write_bytes(b"closed source")
+    upstream = FakeWorkbook(str(tmp_path / "Models" / "Inputs.xlsx"), [str(source)])
+    downstream = FakeWorkbook(str(tmp_path / "Models" / "Report.xlsx"), [upstream.FullName])
+    excel = FakeExcel([downstream, upstream])
+    monkeypatch.setattr(link_updater, "get_com_worker", lambda: InlineWorker(excel))
+    monkeypatch.setattr(link_updater, "win32com",
+                        SimpleNamespace(client=SimpleNamespace(constants=SimpleNamespace(xlExcelLinks=1))))
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    messages = []
+
+    link_updater.run_excel_link_update({"LOG_DIR": str(tmp_path), "SAVE_LOG": False,
+                                        "CHECKPOINT_FILE": checkpoint}, print_func=messages.append)
+
+    assert not [message for message in messages if "Error" in message or "failed" in message]
+    assert upstream.updated == [str(source)]
+    assert downstream.updated == []
+    assert excel.calculations == 1
+    assert excel.Calculation == -4105
+    with open(checkpoint, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["type"] for record in records] == ["plan", "link", "workbook", "workbook", "completed"]
+    assert CheckpointJournal(checkpoint).load_unfinished() is None
@@ -0,0 +1,169 @@
+"""
+Tests for the offline external-link parser, against workbooks written by openpyxl.
+"""
+
+import os
+import re
+import zipfile
+
+import pytest
+
+from core.offline_link_parser import OfflineLinkParser, resolve_link_target
+
+openpyxl = pytest.importorskip("openpyxl")
+from openpyxl.packaging.relationship import Relationship
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.workbook.external_link.external import (ExternalBook, ExternalCell, ExternalLink,
+                                                      ExternalRow, ExternalSheetData,
+                                                      ExternalSheetDataSet, ExternalSheetNames)
+
+
+def add_external_book(wb, target, cached_values=None):
+    """Add an externalLink part pointing at ``target``; it becomes [n] in formulas."""
+    sheet_data = None
+    if cached_values:
+        rows = [ExternalRow(r=int(re.sub(r'\D', '', ref)), cell=[ExternalCell(r=ref, v=str(value))])
+                for ref, value in cached_values.items()]
+        sheet_data = ExternalSheetDataSet(sheetData=[ExternalSheetData(sheetId=0, row=rows)])
+    link = ExternalLink(externalBook=ExternalBook(sheetNames=ExternalSheetNames(["Input"]),
+                                                  sheetDataSet=sheet_data, id="rId1"))
+    link.file_link = Relationship(Id="rId1", type="externalLinkPath", Target=target, TargetMode="External")
+    wb._external_links.append(link)
+    return len(wb._external_links)
+
+
+def share_formulas(path, sheet_part, first_row, last_row, column):
+    """Rewrite a column of formulas as one shared formula group, the way Excel saves fill-downs."""
+    with zipfile.ZipFile(path) as package:
+        parts = {name: package.read(name) for name in package.namelist()}
+    xml = parts[sheet_part].decode("utf-8")
+    for row in range(first_row, last_row + 1):
+        cell = re.search(rf'<c r="{column}{row}"[^>]*>.*?</c>', xml).group(0)
+        if row == first_row:
+            shared = re.sub(r'<f>', f'<f t="shared" ref="{column}{first_row}:{column}{last_row}" si="0">', cell)
+        else:
+            shared = re.sub(r'<f>.*?</f>', '<f t="shared" si="0"/>', cell)
+        xml = xml.replace(cell, shared)
+    parts[sheet_part] = xml.encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, data in parts.items():
+            package.writestr(name, data)
+
+
+def links_by_type(links, link_type):
+    return [link for link in links if link.link_type == link_type]
+
+
+def test_cached_external_value_and_cell_formula(tmp_path):
+    path = str(tmp_path / "Report.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Summary"
+    index = add_external_book(wb, r"C:\Data\Source.xlsx", cached_values={"A1": 42})
+    wb.active["B2"] = f"=[{index}]Input!A1*2"
+    wb.active["C2"] = "=SUM(1,2)"
+    wb.active["D2"] = '="[1] is not a reference"'
+    wb.save(path)
+
+    links = OfflineLinkParser().parse_workbook(path)
+
+    [source] = links_by_type(links, "LinkSource")
+    assert source.target_file == "Source.xlsx"
+    assert source.formula == r"LinkSource: C:\Data\Source.xlsx"
+    [formula] = links_by_type(links, "Formula")
+    assert (formula.source_workbook, formula.source_sheet, formula.source_cell) == ("Report.xlsx", "Summary", "$B$2")
+    assert formula.formula == "=[Source.xlsx]Input!A1*2"
+    assert formula.target_file == "Source.xlsx"
+
+
+def test_defined_name_with_external_reference(tmp_path):
+    path = str(tmp_path / "Names.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Model"
+    index = add_external_book(wb, "file:///C:/Data/Rates.xlsx")
+    wb.defined_names.add(DefinedName("ExtRate", attr_text=f"[{index}]Input!$B$2"))
+    wb.defined_names.add(DefinedName("LocalRate", attr_text="Model!$A$1"))
+    wb.save(path)
+
+    links = OfflineLinkParser().parse_workbook(path)
+
+    [name] = links_by_type(links, "DefinedName")
+    assert name.source_cell == "ExtRate"
+    assert name.formula == "[Rates.xlsx]Input!$B$2"
+    assert name.target_file == "Rates.xlsx"
+    assert links_by_type(links, "LinkSource")[0].formula == "LinkSource: C:/Data/Rates.xlsx"
+
+
+def test_shared_formula_is_reported_once_on_its_range(tmp_path):
+    path = str(tmp_path / "Shared.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Data"
+    index = add_external_book(wb, r"\\server\share\Source.xlsx")
+    for row in range(2, 7):
+        wb.active[f"C{row}"] = f"=[{index}]Input!A{row}+1"
+    wb.save(path)
+    share_formulas(path, "xl/worksheets/sheet1.xml", 2, 6, "C")
+
+    formulas = links_by_type(OfflineLinkParser().parse_workbook(path), "Formula")
+
+    assert [(link.source_cell, link.formula) for link in formulas] == [
+        ("$C$2:$C$6", "=[Source.xlsx]Input!A2+1")
+    ]
+
+
+def test_relative_link_target_resolves_against_the_workbook_folder(tmp_path):
+    folder = tmp_path / "Reports"
+    folder.mkdir()
+    path = str(folder / "Relative.xlsx")
+    wb = openpyxl.Workbook()
+    index = add_external_book(wb, "../Inputs/Source%20Data.xlsx")
+    wb.active["A1"] = f"=[{index}]Input!A1"
+    wb.save(path)
+
+    links = OfflineLinkParser().parse_workbook(path)
+
+    expected = os.path.normpath(str(tmp_path / "Inputs" / "Source Data.xlsx"))
+    assert links_by_type(links, "LinkSource")[0].formula == f"LinkSource: {expected}"
+    assert {link.target_file for link in links} == {"Source Data.xlsx"}
+
+
+def test_link_sources_are_resolved_paths(tmp_path):
+    folder = tmp_path / "Reports"
+    folder.mkdir()
+    path = str(folder / "Sources.xlsx")
+    wb = openpyxl.Workbook()
+    first = add_external_book(wb, r"C:\Data\Rates.xlsx")
+    add_external_book(wb, "../Inputs/Source%20Data.xlsx")
+    wb.active["A1"] = f"=[{first}]Input!A1"
+    wb.save(path)
+
+    parser = OfflineLinkParser()
+    expected = [r"C:\Data\Rates.xlsx", os.path.normpath(str(tmp_path / "Inputs" / "Source Data.xlsx"))]
+    assert parser.link_sources(path) == expected
+    assert [link.formula for link in links_by_type(parser.parse_workbook(path), "LinkSource")] == [
+        f"LinkSource: {source}" for source in expected
+    ]
+    with pytest.raises(ValueError):
+        parser.link_sources(str(tmp_path / "Legacy.xls"))
+
+
+def test_workbook_without_links_and_unsupported_formats(tmp_path):
+    path = str(tmp_path / "Plain.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active["A1"] = "=1+1"
+    wb.save(path)
+
+    parser = OfflineLinkParser()
+    assert parser.parse_workbook(path) == []
+    with pytest.raises(ValueError):
+        parser.parse_workbook(str(tmp_path / "Legacy.xls"))
+
+    links, statistics = parser.parse_workbooks([path, str(tmp_path / "Missing.xlsx")])
+    assert links == []
+    assert statistics['total_workbooks'] == 2
+    assert statistics['failed_workbooks'] == 1
+
+
+def test_resolve_link_target():
+    assert resolve_link_target("file:///C:/Data/A.xlsx", "/x/Book.xlsx") == "C:/Data/A.xlsx"
+    assert resolve_link_target(r"\\srv\share\A.xlsx", "/x/Book.xlsx") == r"\\srv\share\A.xlsx"
+    assert resolve_link_target("A.xlsx", "/x/y/Book.xlsx") == os.path.normpath("/x/y/A.xlsx")
@@ -0,0 +1,59 @@
+"""
+Tests for the bounded read-ahead prefetcher.
+"""
+
+import time
+
+from core.read_ahead import MAX_WAIT_SECONDS, MIN_WAIT_SECONDS, SLOW_LINK_BYTES_PER_SECOND, ReadAheadPrefetcher
+
+
+def write_files(tmp_path, count, size=4096):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"Book{i}.xlsx"
+        path.write_bytes(b"x" * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_reads_files_ahead_but_not_the_first(tmp_path):
+    paths = write_files(tmp_path, 4)
+    read_ahead = ReadAheadPrefetcher(paths, read_ahead=3)
+    read_ahead.start()
+    try:
+        # The first file is marked done straight away
+        assert read_ahead.wait(0, timeout=0) < 0.01
+        read_ahead.advance(0)
+        for index in range(1, 4):
+            read_ahead.wait(index, timeout=5)
+        assert read_ahead.files_read == 3
+        assert read_ahead.bytes_read == 3 * 4096
+    finally:
+        read_ahead.close()
+
+
+def test_missing_files_are_skipped_without_reading(tmp_path):
+    paths = write_files(tmp_path, 3)
+    sizes = {paths[0]: 4096, paths[2]: 4096}
+    read_ahead = ReadAheadPrefetcher(paths, sizes, skip_first=False)
+    read_ahead.start()
+    try:
+        read_ahead.advance(0)
+        for index in range(3):
+            read_ahead.wait(index, timeout=5)
+        assert read_ahead.files_read == 2
+    finally:
+        read_ahead.close()
+
+
+def test_wait_is_bounded_by_the_file_size(tmp_path):
+    paths = write_files(tmp_path, 3)
+    sizes = {paths[0]: 0, paths[1]: 10 * SLOW_LINK_BYTES_PER_SECOND, paths[2]: 10 ** 12}
+    read_ahead = ReadAheadPrefetcher(paths, sizes)
+    assert read_ahead.wait_timeout(1) == MIN_WAIT_SECONDS + 10
+    assert read_ahead.wait_timeout(2) == MAX_WAIT_SECONDS
+
+    # Never started, so file 1 is never read: the wait gives up
+    started = time.perf_counter()
+    waited = read_ahead.wait(1, timeout=0.05)
+    assert 0.04 <= waited < 1 and time.perf_counter() - started < 1
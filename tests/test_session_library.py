@@ -0,0 +1,182 @@
+"""
+Tests for the session library index.
+"""
+
+import os
+import threading
+
+import pytest
+
+from core.session_library import SessionLibrary
+from core.session_store import XLSX_HEADERS, save_session_file
+from models.session import SessionEntry
+
+
+def write_session(path, members):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    save_session_file(path, [SessionEntry(member) for member in members])
+    return path
+
+
+def names(library):
+    return sorted(name for (name,) in library.conn.execute("SELECT name_key FROM names"))
+
+
+def test_refresh_only_rereads_changed_sessions(tmp_path):
+    root = str(tmp_path / "Sessions")
+    write_session(os.path.join(root, "2024", "a.jsonl"), [r"C:\Data\Budget.xlsx"])
+    write_session(os.path.join(root, "2025", "b.jsonl"), [r"C:\Data\Forecast.xlsx"])
+    library = SessionLibrary(str(tmp_path / "library.sqlite"))
+
+    first = library.refresh(root)
+    assert (first['folders'], first['listed'], first['indexed']) == (3, 3, 2)
+
+    unchanged = library.refresh(root)
+    assert (unchanged['listed'], unchanged['indexed'], unchanged['removed']) == (0, 0, 0)
+
+    write_session(os.path.join(root, "2025", "c.jsonl"), [r"C:\Data\Actuals.xlsx"])
+    added = library.refresh(root)
+    assert (added['listed'], added['indexed']) == (1, 1)
+    assert library.session_count() == 3
+    library.close()
+
+
+def test_session_rewritten_in_place_is_reindexed(tmp_path):
+    root = str(tmp_path / "Sessions")
+    path = write_session(os.path.join(root, "a.jsonl"), [r"C:\Data\Budget.xlsx"])
+    library = SessionLibrary(str(tmp_path / "library.sqlite"))
+    library.refresh(root)
+
+    folder_stat = os.stat(root)
+    file_mtime_ns = os.stat(path).st_mtime_ns
+    rewritten = write_session(str(tmp_path / "Elsewhere" / "a.jsonl"),
+                              [r"C:\Data\Budget.xlsx", r"C:\Data\Costs.xlsx"])
+    with open(rewritten, encoding="utf-8") as src, open(path, "w", encoding="utf-8") as dst:
+        dst.write(src.read())
+    # Same folder mtime as when it was indexed, as after an in-place overwrite
+    os.utime(path, ns=(file_mtime_ns + 10 ** 9, file_mtime_ns + 10 ** 9))
+    os.utime(root, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+
+    stats = library.refresh(root)
+
+    assert (stats['listed'], stats['indexed']) == (0, 1)
+    assert library.members(path) == [r"C:\Data\Budget.xlsx", r"C:\Data\Costs.xlsx"]
+    library.close()
+
+
+def test_removed_sessions_and_folders_leave_the_index(tmp_path):
+    root = str(tmp_path / "Sessions")
+    keep = write_session(os.path.join(root, "keep.jsonl"), [r"C:\Data\Budget.xlsx"])
+    gone = write_session(os.path.join(root, "gone.jsonl"), [r"C:\Data\Old Plan.xlsx"])
+    write_session(os.path.join(root, "Archive", "x.jsonl"), [r"C:\Data\Archive Only.xlsx"])
+    library = SessionLibrary(str(tmp_path / "library.sqlite"))
+    library.refresh(root)
+    assert names(library) == ["archive only.xlsx", "budget.xlsx", "old plan.xlsx"]
+
+    os.remove(gone)
+    os.remove(os.path.join(root, "Archive", "x.jsonl"))
+    os.rmdir(os.path.join(root, "Archive"))
+    stats = library.refresh(root)
+
+    assert stats['removed'] == 2
+    assert [s.path for s in library.search()] == [keep]
+    assert library.search("old plan") == []
+    assert names(library) == ["budget.xlsx"]
+    assert library.conn.execute("SELECT COUNT(*) FROM folders").fetchone()[0] == 1
+    library.close()
+
+
+def test_multi_term_search_needs_every_term(tmp_path):
+    root = str(tmp_path / "Sessions")
+    both = write_session(os.path.join(root, "both.jsonl"),
+                         [r"C:\Data\Budget 2025.xlsx", r"\\server\share\Forecast.xlsx"])
+    write_session(os.path.join(root, "budget.jsonl"), [r"C:\Data\Budget 2025.xlsx"])
+    library = SessionLibrary(str(tmp_path / "library.sqlite"))
+    library.refresh(root)
+
+    assert len(library.search("budget")) == 2
+    [result] = library.search("budget; FORECAST")
+    assert result.path == both
+    assert result.matches == [r"C:\Data\Budget 2025.xlsx", r"\\server\share\Forecast.xlsx"]
+    [by_path] = library.search(r"budget; \\SERVER\share\forecast.xlsx")
+    assert by_path.path == both
+    assert library.search("budget; missing") == []
+    assert library.search("%") == []
+    assert library.most_recent_with([r"c:\data\budget 2025.xlsx", r"\\server\share\Forecast.xlsx"]).path == both
+    library.close()
+
+
+def test_concurrent_refreshes_do_not_conflict(tmp_path):
+    root = str(tmp_path / "Sessions")
+    for i in range(20):
+        write_session(os.path.join(root, f"{i % 4}", f"s{i}.jsonl"), [rf"C:\Data\Book {i}.xlsx"])
+    db_path = str(tmp_path / "library.sqlite")
+    errors = []
+
+    def refresh():
+        library = SessionLibrary(db_path)
+        try:
+            library.refresh(root)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            library.close()
+
+    threads = [threading.Thread(target=refresh) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    library = SessionLibrary(db_path)
+    assert errors == []
+    assert library.session_count() == 20
+    assert len(names(library)) == 20
+    library.close()
+
+
+def test_only_session_workbooks_are_indexed(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    root = tmp_path / "Sessions"
+    session = write_session(str(root / "month end.jsonl"), [r"C:\Data\Budget.xlsx"])
+    legacy = str(root / "legacy.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.append(XLSX_HEADERS[:3])
+    wb.active.append([r"C:\Data\Forecast.xlsx", "Sheet1", "A1"])
+    wb.save(legacy)
+    report = str(root / "Report.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.append(["Account", "Amount"])
+    wb.active.append([r"C:\Data\Budget.xlsx", 100])
+    wb.save(report)
+    library = SessionLibrary(str(tmp_path / "library.sqlite"))
+
+    stats = library.refresh(str(root))
+
+    assert stats['indexed'] == 2
+    assert sorted(s.path for s in library.search()) == sorted([session, legacy])
+    assert [s.path for s in library.search("budget")] == [session]
+    assert library.members(legacy) == [r"C:\Data\Forecast.xlsx"]
+    # Checked once, then remembered by signature
+    assert library.refresh(str(root), full=True)['indexed'] == 0
+
+    os.remove(report)
+    library.refresh(str(root))
+    assert library.conn.execute("SELECT COUNT(*) FROM other_files").fetchone()[0] == 0
+    library.close()
+
+
+def test_index_from_an_older_version_is_rebuilt(tmp_path):
+    root = str(tmp_path / "Sessions")
+    write_session(os.path.join(root, "a.jsonl"), [r"C:\Data\Budget.xlsx"])
+    db_path = str(tmp_path / "library.sqlite")
+    library = SessionLibrary(db_path)
+    library.refresh(root)
+    library.conn.execute("PRAGMA user_version = 0")
+    library.conn.commit()
+    library.close()
+
+    library = SessionLibrary(db_path)
+    assert library.session_count() == 0
+    assert library.refresh(root)['indexed'] == 1
+    library.close()
@@ -0,0 +1,85 @@
+"""
+Tests for the session load scheduler and its open history.
+"""
+
+import pytest
+
+from core.session_scheduler import (DEFAULT_OPEN_OVERHEAD, PINNED_PRIORITY, OpenHistory, SessionLoadScheduler,
+                                    row_priority)
+
+
+def paths(rows):
+    return [row[0] for row in rows]
+
+
+def test_row_priority():
+    assert row_priority((r"C:\a.xlsx", "", "")) == 0.0
+    assert row_priority((r"C:\a.xlsx", "", "", "Pinned")) == PINNED_PRIORITY
+    assert row_priority((r"C:\a.xlsx", "", "", True)) == PINNED_PRIORITY
+    assert row_priority((r"C:\a.xlsx", "", "", "2.5")) == 2.5
+    assert row_priority((r"C:\a.xlsx", "", "", "soon")) == 0.0
+
+
+def test_history_round_trip_and_estimates(tmp_path):
+    history = OpenHistory(str(tmp_path / "history" / "open_history.json"))
+    for seconds in (2.0, 4.0):
+        history.record_open(r"C:\Models\Big.xlsx", seconds, size=60 * 1024 * 1024)
+    history.record_run('smallest_first', 3, 1.5, 9.0)
+    history.record_run('smallest_first', 3, None, 11.0)
+    history.save()
+
+    loaded = OpenHistory(history.file_path)
+    # Paths are matched case- and separator-insensitively
+    assert loaded.last_duration("c:/models/big.XLSX") == 4.0
+    assert loaded.estimated_duration(r"C:\Models\Big.xlsx") == 3.0
+    assert loaded.last_opened(r"C:\Models\Big.xlsx")
+    # Unknown files: overhead plus size at the throughput measured so far (20 MB/s)
+    assert loaded.estimated_duration(r"C:\New.xlsx", 20 * 1024 * 1024) == pytest.approx(DEFAULT_OPEN_OVERHEAD + 1)
+    assert loaded.policy_summary() == {'smallest_first': (2, 1.5, 10.0)}
+
+
+def test_unreadable_history_is_ignored(tmp_path):
+    path = tmp_path / "open_history.json"
+    path.write_text("{not json", encoding="utf-8")
+    history = OpenHistory(str(path))
+    assert history.files == {} and history.last_duration("any.xlsx") is None
+
+
+def test_order_policies(tmp_path):
+    history = OpenHistory(str(tmp_path / "open_history.json"))
+    history.record_open("Slow.xlsx", 9.0)
+    history.files["slow.xlsx"]['last_opened'] = "2026-10-01T09:00:00"
+    history.record_open("Quick.xlsx", 0.2)
+    history.files["quick.xlsx"]['last_opened'] = "2026-10-17T09:00:00"
+    sizes = {"Medium.xlsx": 40 * 1024 * 1024}
+    rows = [("Slow.xlsx", "", ""), ("Medium.xlsx", "", "", "pinned"), ("Quick.xlsx", "", ""),
+            ("Never.xlsx", "", "", 1)]
+    scheduler = SessionLoadScheduler(history, sizes)
+
+    assert paths(scheduler.order(rows)) == paths(rows)
+    assert paths(scheduler.order(rows, 'smallest_first')) == ["Quick.xlsx", "Never.xlsx", "Medium.xlsx", "Slow.xlsx"]
+    assert paths(scheduler.order(rows, 'priority_first')) == ["Medium.xlsx", "Never.xlsx", "Quick.xlsx", "Slow.xlsx"]
+    assert paths(scheduler.order(rows, 'recent_first')) == ["Quick.xlsx", "Slow.xlsx", "Medium.xlsx", "Never.xlsx"]
+    assert paths(scheduler.order(rows, 'unknown_policy')) == paths(rows)
+
+
+def test_dependency_order_opens_link_sources_first(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    from tests.test_offline_link_parser import add_external_book
+
+    source = str(tmp_path / "Source.xlsx")
+    report = str(tmp_path / "Report.xlsx")
+    openpyxl.Workbook().save(source)
+    wb = openpyxl.Workbook()
+    wb.active["A1"] = f"=[{add_external_book(wb, source)}]Input!A1"
+    wb.save(report)
+    history = OpenHistory(str(tmp_path / "open_history.json"))
+    # Without the link the report would open first, being quicker
+    history.record_open(report, 0.1)
+    history.record_open(source, 5.0)
+    rows = [(report, "Sheet", "A1"), (str(tmp_path / "Missing.xlsx"), "", ""), (source, "", "")]
+
+    ordered = paths(SessionLoadScheduler(history).order(rows, 'dependency_order'))
+
+    assert ordered.index(source) < ordered.index(report)
+    assert sorted(ordered) == sorted(paths(rows))
@@ -0,0 +1,113 @@
+"""
+Tests for reading and writing session files.
+"""
+
+import json
+
+import pytest
+
+from core.session_store import (SESSION_FORMAT, SESSION_FORMAT_VERSION, XLSX_HEADERS,
+                                load_session_file, save_session_file)
+from models.session import SessionEntry
+
+
+def full_entry(path=r"C:\Data\Model.xlsx"):
+    return SessionEntry(path=path, sheet="Summary", cell="$B$2", size=123456, mtime=1700000000.5,
+                        open_seconds=3.25, window_state=-4137, priority="pinned")
+
+
+def test_jsonl_round_trips_every_entry_field(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    entries = [full_entry(), SessionEntry(path=r"\\server\share\Plain.xlsx")]
+
+    saved = save_session_file(path, entries, metadata={"note": "month end"})
+    loaded = load_session_file(path)
+
+    assert loaded.entries == entries
+    assert loaded.version == SESSION_FORMAT_VERSION
+    assert loaded.created == saved.created
+    assert loaded.metadata == {"note": "month end"}
+    assert not (tmp_path / "session.jsonl.tmp").exists()
+
+
+def test_newer_version_is_rejected(tmp_path):
+    path = tmp_path / "future.jsonl"
+    header = {"format": SESSION_FORMAT, "version": SESSION_FORMAT_VERSION + 1}
+    path.write_text(json.dumps(header) + "\n" + json.dumps({"path": "A.xlsx"}) + "\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="newer"):
+        load_session_file(str(path))
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    path.write_text('{"format": "something-else"}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_session_file(str(path))
+
+    path.write_text("not json\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_session_file(str(path))
+
+
+def test_unknown_fields_and_blank_lines_are_ignored(tmp_path):
+    path = tmp_path / "extra.jsonl"
+    lines = [
+        json.dumps({"format": SESSION_FORMAT, "version": SESSION_FORMAT_VERSION, "future_header": 1}),
+        json.dumps({"path": "A.xlsx", "sheet": "Input", "zoom": 85, "colour": "red"}),
+        "",
+        json.dumps({"sheet": "no path"}),
+        json.dumps({"path": "B.xlsx", "priority": "2"}),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    session = load_session_file(str(path))
+
+    assert session.entries == [SessionEntry("A.xlsx", sheet="Input"), SessionEntry("B.xlsx", priority="2")]
+
+
+def test_xlsx_export_keeps_location_and_priority(tmp_path):
+    pytest.importorskip("openpyxl")
+    path = str(tmp_path / "shared.xlsx")
+    save_session_file(path, [full_entry(), SessionEntry("B.xlsx", priority="3"), SessionEntry("C.xlsx")])
+
+    loaded = load_session_file(path)
+
+    assert loaded.rows() == [(r"C:\Data\Model.xlsx", "Summary", "$B$2", "pinned", None),
+                             ("B.xlsx", "", "", "3", None),
+                             ("C.xlsx", "", "", None, None)]
+    assert loaded.metadata == {"source_format": "xlsx"}
+
+
+def test_legacy_xlsx_session_loads(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "legacy.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(XLSX_HEADERS[:3])
+    ws.append([r"C:\Data\Old.xlsx", "Sheet1", "A1"])
+    ws.append([None, "skipped", "A1"])
+    ws.append([r"C:\Data\NoLocation.xlsx"])
+    wb.save(path)
+
+    session = load_session_file(path)
+
+    assert session.version == 0
+    assert session.created
+    assert session.entries == [SessionEntry(r"C:\Data\Old.xlsx", "Sheet1", "A1"),
+                               SessionEntry(r"C:\Data\NoLocation.xlsx")]
+
+
+def test_legacy_xlsx_session_is_read_from_the_active_sheet(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "legacy.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.append(["Notes"])
+    wb.active.append(["not a workbook path"])
+    session_sheet = wb.create_sheet("Session")
+    session_sheet.append(XLSX_HEADERS[:3])
+    session_sheet.append([r"C:\Data\Saved.xlsx", "Sheet1", "B2"])
+    wb.active = 1
+    wb.save(path)
+
+    assert load_session_file(path).paths == [r"C:\Data\Saved.xlsx"]
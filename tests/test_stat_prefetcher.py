@@ -0,0 +1,97 @@
+"""
+Tests for the concurrent stat prefetcher and its per-host circuit breaker.
+"""
+
+import threading
+import time
+
+from core.stat_prefetcher import HostCircuitBreaker, StatPrefetcher, host_of
+
+
+class FakeStat:
+    """Stat function that hangs on one host until released and answers at once elsewhere."""
+
+    def __init__(self, hung_host):
+        self.hung_host = hung_host
+        self.release = threading.Event()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, path):
+        with self.lock:
+            self.calls.append(path)
+        if host_of(path) == self.hung_host:
+            self.release.wait(10)
+        return True, 1700000000.0, 100, None
+
+
+def timed_prefetch(prefetcher, paths):
+    started = time.perf_counter()
+    results = prefetcher.prefetch(paths)
+    return results, time.perf_counter() - started
+
+
+def test_host_of():
+    assert host_of(r"\\FileServer\share\a.xlsx") == r"\\fileserver"
+    assert host_of("//fileserver/share/a.xlsx") == r"\\fileserver"
+    assert host_of(r"d:\data\a.xlsx") == "D:"
+    assert host_of("relative.xlsx") == "local"
+
+
+def test_breaker_opens_after_consecutive_timeouts_only():
+    breaker = HostCircuitBreaker(threshold=2)
+    breaker.record_timeout(r"\\a")
+    breaker.record_success(r"\\a")
+    breaker.record_timeout(r"\\a")
+    assert not breaker.is_open(r"\\a")
+    breaker.record_timeout(r"\\a")
+    assert breaker.is_open(r"\\a")
+    assert not breaker.is_open(r"\\b")
+    assert HostCircuitBreaker(threshold=0).threshold == 1
+
+
+def test_hung_stat_times_out_and_its_worker_is_replaced():
+    stat = FakeStat(r"\\slow")
+    prefetcher = StatPrefetcher(max_workers=1, timeout=0.2, failure_threshold=5, stat_func=stat)
+    paths = [r"\\slow\share\Hung.xlsx", r"C:\Data\A.xlsx", r"C:\Data\B.xlsx"]
+
+    results, elapsed = timed_prefetch(prefetcher, paths)
+
+    assert elapsed < 2.0
+    assert results[paths[0]].error == "timed out after 0.2 sec"
+    assert not results[paths[0]].exists
+    assert results[paths[1]].exists and results[paths[2]].exists
+    assert prefetcher.host_stats[r"\\slow"].timeouts == 1
+
+    # The abandoned stat finishing late does not overwrite the timeout
+    stat.release.set()
+    time.sleep(0.1)
+    assert results[paths[0]].error.startswith("timed out")
+    assert len(results) == 3
+
+
+def test_tripped_host_skips_its_remaining_paths():
+    stat = FakeStat(r"\\dead")
+    prefetcher = StatPrefetcher(max_workers=2, timeout=0.2, failure_threshold=2, stat_func=stat)
+    dead = [rf"\\dead\share\Book{i}.xlsx" for i in range(6)]
+    local = [r"C:\Data\A.xlsx", r"C:\Data\B.xlsx"]
+
+    try:
+        results, elapsed = timed_prefetch(prefetcher, dead + local)
+    finally:
+        stat.release.set()
+
+    # Two timeouts in parallel, not six in turn
+    assert elapsed < 1.5
+    assert [path for path in stat.calls if path in dead] == dead[:2]
+    assert [results[path].error for path in dead[:2]] == ["timed out after 0.2 sec"] * 2
+    assert all(results[path].error == r"host \\dead not responding (skipped)" for path in dead[2:])
+    assert all(results[path].exists for path in local)
+    host = prefetcher.host_stats[r"\\dead"]
+    assert (host.files, host.timeouts, host.skipped) == (6, 2, 4)
+    assert any("4 skipped (host not responding)" in line for line in prefetcher.summary_lines())
+
+    # Later prefetches in the same run fail fast on the tripped host
+    results, elapsed = timed_prefetch(prefetcher, [r"\\dead\share\Later.xlsx"])
+    assert elapsed < 0.5
+    assert results[r"\\dead\share\Later.xlsx"].error.endswith("(skipped)")
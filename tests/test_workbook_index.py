@@ -0,0 +1,91 @@
+"""
+Tests for the per-batch workbook index and single workbook lookup.
+"""
+
+from core.workbook_index import WorkbookIndex, find_open_workbook, normalize_workbook_path
+
+
+class FakeWorkbook:
+    def __init__(self, name, full_name):
+        self.Name = name
+        self.FullName = full_name
+
+
+class FakeWorkbooks:
+    """excel.Workbooks stand-in that counts COM calls."""
+
+    def __init__(self, workbooks):
+        self.workbooks = workbooks
+        self.calls = 0
+
+    @property
+    def Count(self):
+        self.calls += 1
+        return len(self.workbooks)
+
+    def __iter__(self):
+        self.calls += 1
+        for wb in self.workbooks:
+            yield wb
+
+    def __call__(self, name):
+        self.calls += 1
+        for wb in self.workbooks:
+            if wb.Name.casefold() == name.casefold():
+                return wb
+        raise KeyError(name)
+
+
+class FakeExcel:
+    def __init__(self, *workbooks):
+        self.Workbooks = FakeWorkbooks(list(workbooks))
+
+
+def test_normalize_workbook_path():
+    assert normalize_workbook_path(r"C:\Data\Book.xlsx") == normalize_workbook_path("c:/data/BOOK.xlsx")
+    assert normalize_workbook_path(r"\\server\share\a\..\Book.xlsx") == "//server/share/book.xlsx"
+    assert normalize_workbook_path("") == ""
+
+
+def test_index_enumerates_once_per_batch():
+    excel = FakeExcel(*(FakeWorkbook(f"Book{i}.xlsx", f"C:\\Data\\Book{i}.xlsx") for i in range(50)))
+    index = WorkbookIndex(excel)
+
+    for i in range(50):
+        assert index.find(f"Book{i}.xlsx", f"c:/data/book{i}.xlsx").Name == f"Book{i}.xlsx"
+
+    assert index.builds == 1
+    assert excel.Workbooks.calls == 1
+
+
+def test_index_discard_and_invalidate():
+    first = FakeWorkbook("A.xlsx", r"C:\A.xlsx")
+    excel = FakeExcel(first, FakeWorkbook("B.xlsx", r"C:\B.xlsx"))
+    index = WorkbookIndex(excel)
+    assert index.has_path(r"c:\a.xlsx")
+
+    index.discard("A.xlsx", r"C:\A.xlsx")
+    excel.Workbooks.workbooks.remove(first)
+    assert not index.has_path(r"C:\A.xlsx")
+    assert index.get("A.xlsx") is None
+
+    excel.Workbooks.workbooks.append(FakeWorkbook("C.xlsx", r"C:\C.xlsx"))
+    index.invalidate()
+    assert index.has_path(r"C:\C.xlsx")
+    assert index.builds == 2
+
+
+def test_find_open_workbook_asks_for_the_name_directly():
+    excel = FakeExcel(*(FakeWorkbook(f"Book{i}.xlsx", f"C:\\Data\\Book{i}.xlsx") for i in range(50)))
+
+    assert find_open_workbook(excel, "Book7.xlsx").FullName == r"C:\Data\Book7.xlsx"
+    assert excel.Workbooks.calls == 1
+
+
+def test_find_open_workbook_falls_back_to_the_path_on_a_name_miss():
+    excel = FakeExcel(FakeWorkbook("Report.xlsx", r"C:\Old\Report.xlsx"),
+                      FakeWorkbook("Other.xlsx", r"C:\New\Other.xlsx"))
+
+    assert find_open_workbook(excel, "report (renamed).xlsx", r"c:/old/report.xlsx").Name == "Report.xlsx"
+    assert find_open_workbook(excel, "Missing.xlsx") is None
+    assert find_open_workbook(excel, "Missing.xlsx", r"C:\Missing.xlsx") is None
@@ -0,0 +1,295 @@
+"""
+Virtual List View component for Excel Session Manager
+
+This module contains a list widget for very large result sets. Only the
+rows that fit in the window exist as Treeview items; scrolling re-fills
+those items from a row provider by index, so memory and redraw cost do not
+grow with the number of rows.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+
+# Row provider result: (text, values, tags)
+RowData = Tuple[str, Tuple, Tuple]
+
+# Fallback row height in pixels before a row can be measured
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualListView(ttk.Frame):
+    """
+    Scrollable, sortable list that materializes only its visible rows.
+
+    Rows are supplied with ``set_rows`` as a count plus a function that
+    returns (text, values, tags) for a row index. Clicking a column heading
+    sorts by a key per row; the sort is an index permutation, so no rows
+    are re-inserted. Keys are best precomputed off the UI thread and passed
+    as a sequence, since computing them here blocks the UI.
+    """
+
+    def __init__(self, parent, columns: Sequence[str], headings: Dict[str, str],
+                 widths: Optional[Dict[str, int]] = None, **kwargs):
+        """
+        Initialize the virtual list view.
+
+        Args:
+            parent: Parent widget
+            columns: Data column ids (the tree column '#0' is always shown)
+            headings: Heading text per column id, including '#0'
+            widths: Optional column widths per column id
+        """
+        super().__init__(parent, **kwargs)
+        self.tree = ttk.Treeview(self, columns=tuple(columns), show="tree headings",
+                                 selectmode="browse")
+        for column in ("#0",) + tuple(columns):
+            self.tree.heading(column, text=headings.get(column, ""),
+                              command=lambda c=column: self.sort_by(c))
+            if widths and column in widths:
+                self.tree.column(column, width=widths[column])
+
+        self.scroll_y = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=scroll_x.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scroll_y.grid(row=0, column=1, sticky="ns")
+        scroll_x.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._headings = dict(headings)
+        self._count = 0
+        self._row_getter: Callable[[int], RowData] = lambda index: ("", (), ())
+        self._sort_keys: Dict[str, Union[Sequence[Any], Callable[[int], Any]]] = {}
+        self._sorted_orders: Dict[str, list] = {}
+        self._order: Optional[Sequence[int]] = None
+        self._sort_column: Optional[str] = None
+        self._sort_reverse = False
+
+        self._slots = []        # Treeview item ids reused for the visible window
+        self._hidden = set()    # Slots detached because they are past the last row
+        self._top = 0           # Position of the first visible row
+        self._row_height = DEFAULT_ROW_HEIGHT
+        self._header_height = DEFAULT_ROW_HEIGHT
+        self.selected_index: Optional[int] = None
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_units(3))
+        for key, delta in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                           ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda e, d=delta: self._on_key(d))
+
+    def set_rows(self, count: int, row_getter: Callable[[int], RowData],
+                 sort_keys: Optional[Dict[str, Union[Sequence[Any], Callable[[int], Any]]]] = None):
+        """
+        Replace the list contents.
+
+        Args:
+            count: Number of rows
+            row_getter: Function returning (text, values, tags) for a row index
+            sort_keys: Optional sort keys per column id: a sequence with one
+                precomputed key per row, or a function called once per row
+                the first time that column is sorted
+        """
+        self._count = count
+        self._row_getter = row_getter
+        self._sort_keys = dict(sort_keys or {})
+        self._sorted_orders = {}
+        self._order = None
+        self._sort_column = None
+        self._sort_reverse = False
+        self._top = 0
+        self.selected_index = None
+        self._update_heading_arrows()
+        self._refresh()
+
+    def set_sort_keys(self, sort_keys: Dict[str, Union[Sequence[Any], Callable[[int], Any]]]):
+        """
+        Replace the sort keys of the current rows, e.g. once they were computed in the background.
+
+        Args:
+            sort_keys: Sort keys per column id (see set_rows)
+        """
+        self._sort_keys = dict(sort_keys)
+        self._sorted_orders = {}
+        if self._sort_column is not None:
+            self.sort_by(self._sort_column, self._sort_reverse)
+
+    def clear(self):
+        """Remove all rows."""
+        self.set_rows(0, lambda index: ("", (), ()))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def sort_by(self, column: str, reverse: Optional[bool] = None):
+        """
+        Sort rows by a column; repeated calls on the same column toggle the direction.
+
+        Args:
+            column: Column id ('#0' or a data column)
+            reverse: Force the direction (default: toggle)
+        """
+        key = self._sort_keys.get(column)
+        if key is None or not self._count:
+            return
+        if reverse is None:
+            reverse = not self._sort_reverse if column == self._sort_column else False
+
+        order = self._sorted_orders.get(column)
+        if order is None:
+            keys = [key(index) for index in range(self._count)] if callable(key) else key
+            order = self._sorted_orders[column] = sorted(range(self._count), key=keys.__getitem__)
+        self._order = order[::-1] if reverse else order
+        self._sort_column = column
+        self._sort_reverse = reverse
+        self._update_heading_arrows()
+        self._refresh()
+
+    def see_index(self, index: int):
+        """Scroll so a row index (in data order) is visible."""
+        position = self._position_of(index)
+        if position is None:
+            return
+        visible = max(1, len(self._slots))
+        if position < self._top:
+            self._top = position
+        elif position >= self._top + visible:
+            self._top = position - visible + 1
+        self._refresh()
+
+    def _position_of(self, index: int) -> Optional[int]:
+        """Display position of a data row index."""
+        if index is None or not 0 <= index < self._count:
+            return None
+        if self._order is None:
+            return index
+        # Linear lookup is fine here: only used for keyboard navigation of one row
+        try:
+            return self._order.index(index)
+        except ValueError:
+            return None
+
+    def _index_at(self, position: int) -> int:
+        """Data row index at a display position."""
+        return self._order[position] if self._order is not None else position
+
+    def _refresh(self):
+        """Re-fill the visible slots from the row provider."""
+        visible = len(self._slots)
+        self._top = max(0, min(self._top, self._count - visible))
+
+        selected_slot = None
+        for offset, iid in enumerate(self._slots):
+            position = self._top + offset
+            if position < self._count:
+                index = self._index_at(position)
+                text, values, tags = self._row_getter(index)
+                self.tree.item(iid, text=text, values=values, tags=tags)
+                if iid in self._hidden:
+                    self.tree.move(iid, "", offset)
+                    self._hidden.discard(iid)
+                if index == self.selected_index:
+                    selected_slot = iid
+            elif iid not in self._hidden:
+                self.tree.detach(iid)
+                self._hidden.add(iid)
+
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+            self.tree.focus(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_set(())
+
+        if self._count:
+            self.scroll_y.set(self._top / self._count, min(1.0, (self._top + visible) / self._count))
+        else:
+            self.scroll_y.set(0.0, 1.0)
+
+    def _resize_slots(self, visible: int):
+        """Create or drop slot items so the window holds ``visible`` rows."""
+        while len(self._slots) < visible:
+            self._slots.append(self.tree.insert("", "end"))
+        while len(self._slots) > visible:
+            iid = self._slots.pop()
+            self._hidden.discard(iid)
+            self.tree.delete(iid)
+
+    def _on_configure(self, event):
+        """Fit the number of slots to the widget height."""
+        if self._slots:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                self._header_height, self._row_height = bbox[1], max(1, bbox[3])
+        visible = max(1, (event.height - self._header_height) // self._row_height)
+        if visible != len(self._slots):
+            self._resize_slots(visible)
+            self._refresh()
+
+    def _on_select(self, event=None):
+        """Remember the selected row by data index."""
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            position = self._top + self._slots.index(selection[0])
+            if position < self._count:
+                self.selected_index = self._index_at(position)
+
+    def _on_scrollbar(self, *args):
+        """Handle scrollbar drags and clicks."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * self._count)
+            self._refresh()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(1, len(self._slots) - 1)
+            self._scroll_units(amount)
+
+    def _scroll_units(self, amount: int):
+        """Scroll by a number of rows."""
+        self._top += amount
+        self._refresh()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        """Scroll on mouse wheel (Windows/macOS delta)."""
+        steps = -int(event.delta / 120) if abs(event.delta) >= 120 else (-1 if event.delta > 0 else 1)
+        return self._scroll_units(steps * 3)
+
+    def _on_key(self, delta):
+        """Move the selection with the keyboard, scrolling as needed."""
+        if not self._count:
+            return "break"
+        page = max(1, len(self._slots) - 1)
+        current = self._position_of(self.selected_index)
+        if current is None:
+            current = self._top - 1 if delta in (1, "page") else self._top
+        if delta == "home":
+            position = 0
+        elif delta == "end":
+            position = self._count - 1
+        elif delta == "page":
+            position = current + page
+        elif delta == "-page":
+            position = current - page
+        else:
+            position = current + delta
+        position = max(0, min(position, self._count - 1))
+        self.selected_index = self._index_at(position)
+        self.see_index(self.selected_index)
+        return "break"
+
+    def _update_heading_arrows(self):
+        """Show the sort direction in the sorted column heading."""
+        for column, text in self._headings.items():
+            if column == self._sort_column:
+                text = f"{text} {'▼' if self._sort_reverse else '▲'}"
+            self.tree.heading(column, text=text)
@@ -57,11 +57,14 @@ class DragSelectTreeview(ttk.Treeview):
         return "break"
 
 class FileSelectionDialog:
-    def __init__(self, parent, file_list, title="Select Files to Load"):
+    def __init__(self, parent, file_list, title="Select Files to Load", load_policies=None, load_policy=None):
         self.parent = parent
         self.file_list = file_list
         self.selected_files = []
         self.result = None
+        # Optional open order choice: {policy id: display name}
+        self.load_policies = load_policies or {}
+        self.load_policy = load_policy
         
         # Create dialog window
         self.dialog = tk.Toplevel(parent)
@@ -147,6 +150,17 @@ class FileSelectionDialog:
         self.file_treeview.bind("<Button-4>", lambda event: self.file_treeview.yview_scroll(-1, "units"))
         self.file_treeview.bind("<Button-5>", lambda event: self.file_treeview.yview_scroll(1, "units"))
         
+        # Open order (only when the caller offers policies)
+        if self.load_policies:
+            policy_frame = tk.Frame(main_frame)
+            policy_frame.pack(fill="x", pady=(10, 0))
+            tk.Label(policy_frame, text="Open order:", font=("Arial", 10, "bold")).pack(side="left")
+            names = list(self.load_policies.values())
+            self.policy_var = tk.StringVar(value=self.load_policies.get(self.load_policy, names[0]))
+            policy_combo = ttk.Combobox(policy_frame, textvariable=self.policy_var, values=names,
+                                        state="readonly", width=36, font=("Arial", 10))
+            policy_combo.pack(side="left", padx=(6, 0))
+        
         # Button frame
         button_frame = tk.Frame(main_frame)
         button_frame.pack(fill="x", pady=(10, 0))
@@ -199,6 +213,11 @@ class FileSelectionDialog:
             import tkinter.messagebox as messagebox
             messagebox.showwarning("Warning", "Please select at least one file to load.")
             return
+        
+        if self.load_policies:
+            chosen = self.policy_var.get()
+            self.load_policy = next((policy for policy, name in self.load_policies.items() if name == chosen),
+                                    self.load_policy)
             
         self.result = "ok"
         self.dialog.destroy()
@@ -38,7 +38,7 @@ class LinkUpdateOptionsDialog:
         """Show the link update options dialog."""
         top = tk.Toplevel(self.parent)
         top.title("Update Recent External Links Options")
-        top.geometry("600x380")
+        top.geometry("600x440")
         top.grab_set()
     
         frm = tk.Frame(top, padx=14, pady=12)
@@ -72,6 +72,8 @@ class LinkUpdateOptionsDialog:
         show_status_var = tk.BooleanVar(value=True)
         save_log_var = tk.BooleanVar(value=True)
         save_scan_summary_var = tk.BooleanVar(value=False)
+        dry_run_var = tk.BooleanVar(value=False)
+        resume_var = tk.BooleanVar(value=False)
     
         def on_full_path_check(*args):
             if show_full_path_var.get():
@@ -115,6 +117,10 @@ class LinkUpdateOptionsDialog:
         browse_summary_btn = tk.Button(frm, text="...", width=3, command=browse_summarydir, font=default_font)
         browse_summary_btn.grid(row=9, column=2, padx=(6,0), sticky="w", pady=(6,0))
     
+        # Run mode
+        tk.Checkbutton(frm, text="Dry run (plan only, save the plan to the log folder)", variable=dry_run_var, font=default_font).grid(row=10, column=0, columnspan=3, sticky="w", pady=(6,0))
+        tk.Checkbutton(frm, text="Resume an interrupted update from its checkpoint", variable=resume_var, font=default_font).grid(row=11, column=0, columnspan=3, sticky="w")
+    
         # Buttons
         btn_frame = tk.Frame(frm)
         btn_frame.grid(row=99, column=0, columnspan=3, pady=(18,0), sticky="w")
@@ -143,7 +149,9 @@ class LinkUpdateOptionsDialog:
                 "LOG_DIR": log_dir,
                 "SAVE_LOG": save_log_var.get(),
                 "SAVE_SCAN_SUMMARY": save_scan_summary_var.get(),
-                "SUMMARY_DIR": summary_dir
+                "SUMMARY_DIR": summary_dir,
+                "DRY_RUN": dry_run_var.get(),
+                "RESUME": resume_var.get()
             }
             popup = ConsolePopup(self.parent, title="Update Recent External Links Console")
     
@@ -0,0 +1,216 @@
+"""
+Session Search Dialog for Excel Session Manager
+
+This module contains the dialog that opens when loading a session. It
+searches the session library for sessions containing a workbook and lists
+the most recent matches first, while the library refreshes in the background.
+"""
+import tkinter as tk
+from tkinter import ttk
+import threading
+import time
+
+from core.session_library import SessionLibrary
+
+
+# Delay after the last keystroke before searching (ms)
+SEARCH_DELAY_MS = 150
+
+
+class SessionSearchDialog:
+    """
+    Search saved sessions by workbook name or path.
+
+    Several terms separated by ';' find sessions containing all of them, so
+    the first row is the most recent session with those files. ``show()``
+    returns ("ok", session path), ("browse", None) or ("cancel", None).
+    """
+
+    def __init__(self, parent, library_file, session_directory, title="Load Session"):
+        """
+        Initialize the dialog and start refreshing the library.
+
+        Args:
+            parent: Parent window
+            library_file: Session library SQLite file
+            session_directory: Folder of saved sessions to index
+            title: Window title
+        """
+        self.parent = parent
+        self.library_file = library_file
+        self.session_directory = session_directory
+        self.library = SessionLibrary(library_file)
+        self.result = "cancel"
+        self.selected_path = None
+        self._search_job = None
+        self._sessions = {}
+
+        self.dialog = tk.Toplevel(parent)
+        self.title = title
+        self.dialog.title(title)
+        self.dialog.geometry("900x560")
+        self.dialog.grab_set()
+        self.dialog.resizable(True, True)
+        self.dialog.transient(parent)
+
+        self.setup_ui()
+        self.search()
+        threading.Thread(target=self._refresh_thread, daemon=True).start()
+
+    def setup_ui(self):
+        main_frame = tk.Frame(self.dialog, padx=10, pady=10)
+        main_frame.pack(fill="both", expand=True)
+
+        tk.Label(main_frame, text="Find sessions containing (name or path; separate several with ';'):",
+                 font=("Arial", 12, "bold")).pack(anchor="w")
+
+        self.query_var = tk.StringVar()
+        self.query_var.trace_add("write", lambda *args: self._schedule_search())
+        query_entry = tk.Entry(main_frame, textvariable=self.query_var, font=("Consolas", 12))
+        query_entry.pack(fill="x", pady=(4, 8))
+        query_entry.bind("<Return>", lambda event: self.on_open())
+        query_entry.bind("<Down>", lambda event: self._focus_results())
+        query_entry.focus_set()
+
+        treeview_frame = tk.Frame(main_frame)
+        treeview_frame.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(treeview_frame, columns=("saved", "session", "files", "matches"),
+                                 show="headings", selectmode="browse")
+        self.tree.heading("saved", text="Saved")
+        self.tree.heading("session", text="Session")
+        self.tree.heading("files", text="Files")
+        self.tree.heading("matches", text="Matching workbooks")
+        self.tree.column("saved", width=150, stretch=False)
+        self.tree.column("session", width=280)
+        self.tree.column("files", width=60, anchor="e", stretch=False)
+        self.tree.column("matches", width=380)
+        scrollbar = ttk.Scrollbar(treeview_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.bind("<Double-1>", lambda event: self.on_open())
+        self.tree.bind("<Return>", lambda event: self.on_open())
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self._show_members())
+
+        self.members_label = tk.Label(main_frame, text="", font=("Consolas", 10), anchor="w",
+                                      justify="left", fg="gray25")
+        self.members_label.pack(fill="x", pady=(6, 0))
+
+        button_frame = tk.Frame(main_frame)
+        button_frame.pack(fill="x", pady=(8, 0))
+
+        tk.Button(button_frame, text="Cancel", command=self.on_cancel,
+                  font=("Arial", 12), width=10).pack(side="right")
+        tk.Button(button_frame, text="Open", command=self.on_open,
+                  font=("Arial", 12, "bold"), width=10).pack(side="right", padx=(0, 10))
+        tk.Button(button_frame, text="Browse...", command=self.on_browse,
+                  font=("Arial", 12), width=10).pack(side="right", padx=(0, 10))
+
+        self.status_label = tk.Label(button_frame, text="", font=("Arial", 10), fg="blue")
+        self.status_label.pack(side="left")
+
+        self.dialog.bind("<Escape>", lambda event: self.on_cancel())
+        self.dialog.protocol("WM_DELETE_WINDOW", self.on_cancel)
+
+    def _schedule_search(self):
+        if self._search_job:
+            self.dialog.after_cancel(self._search_job)
+        self._search_job = self.dialog.after(SEARCH_DELAY_MS, self.search)
+
+    def search(self):
+        """Run the current query against the library and show the results."""
+        self._search_job = None
+        started = time.perf_counter()
+        try:
+            sessions = self.library.search(self.query_var.get())
+        except Exception as e:
+            self.status_label.config(text=f"Search failed: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.tree.delete(*self.tree.get_children())
+        self._sessions = {}
+        for session in sessions:
+            matches = "; ".join(session.matches) if session.matches else (session.error or "")
+            iid = self.tree.insert("", "end", values=(session.created.replace("T", " "), session.name,
+                                                      session.entry_count, matches))
+            self._sessions[iid] = session
+        children = self.tree.get_children()
+        if children:
+            self.tree.selection_set(children[0])
+        self.status_label.config(text=f"{len(sessions)} session(s) in {elapsed_ms:.1f} ms")
+
+    def _show_members(self):
+        session = self._selected_session()
+        if not session:
+            self.members_label.config(text="")
+            return
+        members = self.library.members(session.path)
+        text = "\n".join(members[:5])
+        if len(members) > 5:
+            text += f"\n... and {len(members) - 5} more"
+        self.members_label.config(text=f"{session.path}\n{text}")
+
+    def _focus_results(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.focus_set()
+            self.tree.focus(self.tree.selection()[0] if self.tree.selection() else children[0])
+        return "break"
+
+    def _selected_session(self):
+        selection = self.tree.selection()
+        return self._sessions.get(selection[0]) if selection else None
+
+    def _refresh_thread(self):
+        # SQLite connections belong to the thread that opened them
+        try:
+            library = SessionLibrary(self.library_file)
+            try:
+                stats = library.refresh(self.session_directory)
+            finally:
+                library.close()
+            message = (f"Library: {stats['folders']} folder(s), {stats['indexed']} updated "
+                       f"in {stats['elapsed']:.2f}s")
+        except Exception as e:
+            stats = None
+            message = f"Library refresh failed: {e}"
+        self.parent.after(0, lambda: self._on_refreshed(stats, message))
+
+    def _on_refreshed(self, stats, message):
+        if not self.dialog.winfo_exists():
+            return
+        if stats and (stats['indexed'] or stats['removed']):
+            self.search()
+        self.dialog.title(f"{self.title} - {message}")
+
+    def on_open(self):
+        session = self._selected_session()
+        if not session:
+            return
+        self.selected_path = session.path
+        self.result = "ok"
+        self._close()
+
+    def on_browse(self):
+        self.result = "browse"
+        self._close()
+
+    def on_cancel(self):
+        self.result = "cancel"
+        self._close()
+
+    def _close(self):
+        self.library.close()
+        self.dialog.destroy()
+
+    def show(self):
+        # Center the dialog
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (self.dialog.winfo_width() // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (self.dialog.winfo_height() // 2)
+        self.dialog.geometry(f"+{x}+{y}")
+
+        self.dialog.wait_window()
+        return self.result, self.selected_path
@@ -8,11 +8,60 @@ including searching for specific links and batch updating functionality.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
+import time
+from array import array
 from datetime import datetime
+from config.settings import settings
 from core.external_links_manager import ExternalLinksManager
+from core.link_search_index import SearchCancelled
+from ui.components.virtual_list_view import VirtualListView
 from utils.external_links_utils import ExcelNavigator, ExternalLinksExporter, DataFormatter
 
 
+# Delay after the last keystroke before a search runs
+SEARCH_DEBOUNCE_MS = 150
+
+# Time spent inserting tree rows per UI tick, so the dialog stays responsive
+INSERT_SLICE_SECONDS = 0.03
+
+# Child rows created per expand / "load more" in grouped mode
+GROUP_PAGE_SIZE = 2000
+
+
+def _cell_sort_key(address):
+    """Sort key for an A1 address or range: (column width, column letters, row)."""
+    cell = address.replace('$', '').split(':')[0]
+    letters = cell.rstrip('0123456789')
+    row = cell[len(letters):]
+    return (len(letters), letters, int(row) if row else 0)
+
+
+def _flat_sort_keys(links, is_cancelled):
+    """
+    Precompute the flat list's sort keys from pooled-string ranks (query worker thread).
+    
+    Args:
+        links: LinkStore or LinkStoreView shown in the flat list
+        is_cancelled: Cancel callback of the query
+        
+    Returns:
+        Dictionary of column id to an array of integer keys, one per row
+    """
+    sort_keys = {}
+    for column, field in (("#0", 'source_workbook'), ("type", 'target_file'), ("formula", 'formula')):
+        if is_cancelled():
+            raise SearchCancelled()
+        sort_keys[column] = links.rank_keys(field)
+    if is_cancelled():
+        raise SearchCancelled()
+    # Sheet first, then cell: combine both ranks into one integer
+    sheets = links.rank_keys('source_sheet')
+    cells = links.rank_keys('source_cell', _cell_sort_key)
+    width = max(cells, default=0) + 1
+    sort_keys["details"] = array('Q', (sheet * width + cell for sheet, cell in zip(sheets, cells)))
+    return sort_keys
+
+
 class ExternalLinksDialog:
     """
     Dialog for managing external links in Excel workbooks.
@@ -30,9 +79,16 @@ class ExternalLinksDialog:
         """
         self.parent = parent
         self.dialog = None
-        self.links_manager = ExternalLinksManager()
+        self.links_manager = ExternalLinksManager(compress_ranges=settings.compress_link_ranges)
         self.current_search_results = {}
         self.display_mode = 'grouped'  # 'grouped' or 'flat'
+        self._search_generation = 0  # Bumped by every query; stale results are dropped
+        self._debounce_id = None
+        self._query_request = None   # Latest (generation, keyword, field, grouped) for the query worker
+        self._query_ready = threading.Event()
+        self._query_thread = None
+        self._lazy_groups = {}       # Group item id -> [links, number of children created]
+        self._load_more_items = {}   # "Load more" item id -> group item id
         
     def show(self):
         """Show the external links manager dialog."""
@@ -77,14 +133,16 @@ class ExternalLinksDialog:
         self.search_entry = ttk.Entry(search_input_frame, textvariable=self.search_var, width=30)
         self.search_entry.pack(side="left", padx=(0, 10))
         self.search_entry.bind("<Return>", lambda e: self._search_links())
+        self.search_var.trace_add("write", self._on_search_changed)
         
         # Search field selection
         ttk.Label(search_input_frame, text="Search in:").pack(side="left", padx=(10, 5))
         self.search_field_var = tk.StringVar(value="external_file")
         search_field_combo = ttk.Combobox(search_input_frame, textvariable=self.search_field_var, 
-                                        values=["external_file", "formula", "source_workbook", "all"],
+                                        values=["external_file", "formula", "source_workbook", "source_sheet", "all"],
                                         state="readonly", width=15)
         search_field_combo.pack(side="left", padx=(0, 10))
+        search_field_combo.bind("<<ComboboxSelected>>", self._on_search_changed)
         
         # Search buttons row 2
         search_btn_frame = ttk.Frame(search_frame)
@@ -108,8 +166,9 @@ class ExternalLinksDialog:
         results_frame = ttk.LabelFrame(main_frame, text="Search Results", padding="10")
         results_frame.pack(fill="both", expand=True, pady=(0, 10))
         
-        # Results tree (using tree view for hierarchical display)
-        self.results_tree = ttk.Treeview(results_frame, show="tree headings", height=15)
+        # Grouped view: tree view for hierarchical display
+        self.grouped_frame = ttk.Frame(results_frame)
+        self.results_tree = ttk.Treeview(self.grouped_frame, show="tree headings", height=15)
         
         # Configure columns for tree view
         self.results_tree["columns"] = ("type", "details", "formula")
@@ -124,8 +183,8 @@ class ExternalLinksDialog:
         self.results_tree.column("formula", width=350)
         
         # Scrollbars for tree
-        tree_scroll_y = ttk.Scrollbar(results_frame, orient="vertical", command=self.results_tree.yview)
-        tree_scroll_x = ttk.Scrollbar(results_frame, orient="horizontal", command=self.results_tree.xview)
+        tree_scroll_y = ttk.Scrollbar(self.grouped_frame, orient="vertical", command=self.results_tree.yview)
+        tree_scroll_x = ttk.Scrollbar(self.grouped_frame, orient="horizontal", command=self.results_tree.xview)
         self.results_tree.configure(yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
         
         # Pack tree and scrollbars
@@ -133,11 +192,28 @@ class ExternalLinksDialog:
         tree_scroll_y.grid(row=0, column=1, sticky="ns")
         tree_scroll_x.grid(row=1, column=0, sticky="ew")
         
+        self.grouped_frame.grid_rowconfigure(0, weight=1)
+        self.grouped_frame.grid_columnconfigure(0, weight=1)
+        
+        # Flat view: virtual list that only materializes the visible rows
+        self.flat_view = VirtualListView(
+            results_frame, columns=("type", "details", "formula"),
+            headings={"#0": "Source", "type": "External File", "details": "Location", "formula": "Formula"},
+            widths={"#0": 250, "type": 150, "details": 150, "formula": 350}
+        )
+        
+        self.grouped_frame.grid(row=0, column=0, sticky="nsew")
+        self.flat_view.grid(row=0, column=0, sticky="nsew")
+        self._show_results_view(grouped=True)
+        
         results_frame.grid_rowconfigure(0, weight=1)
         results_frame.grid_columnconfigure(0, weight=1)
         
         # Bind double-click event
         self.results_tree.bind("<Double-1>", self._on_result_double_click)
+        self.results_tree.bind("<Return>", self._on_result_double_click)
+        self.results_tree.bind("<<TreeviewOpen>>", self._on_group_open)
+        self.flat_view.tree.bind("<Double-1>", self._on_result_double_click)
         
         # Status frame
         status_frame = ttk.Frame(main_frame)
@@ -186,10 +262,15 @@ class ExternalLinksDialog:
         self.progress.stop()
         
         self.status_label.config(
-            text=f"Scan complete: {statistics['total_workbooks']} workbooks, "
+            text=f"Scan complete: {statistics['total_workbooks']} workbooks "
+                 f"({statistics.get('cached_workbooks', 0)} from cache), "
                  f"{statistics['workbooks_with_links']} with links, "
                  f"{statistics['total_links']} total links, "
-                 f"{statistics['unique_external_files']} unique external files"
+                 f"{statistics['unique_external_files']} unique external files; "
+                 f"{statistics.get('distinct_formulas', 0)} distinct of "
+                 f"{statistics.get('formula_cells', 0)} formulas "
+                 f"({statistics.get('distinct_formula_ratio', 0.0):.1%}), "
+                 f"analyzer cache hits {statistics.get('analyzer_cache_hit_ratio', 0.0):.0%}"
         )
         
         # Show all links initially
@@ -197,17 +278,14 @@ class ExternalLinksDialog:
     
     def _display_all_links(self):
         """Display all external links in the tree."""
-        # Clear existing items
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-        
-        if self.display_mode_var.get() == "grouped":
-            self._display_grouped_links(self.links_manager.grouped_links)
-        else:
-            self._display_flat_links(self.links_manager.external_links)
+        self._run_query("", self.search_field_var.get())
     
     def _display_grouped_links(self, grouped_links):
-        """Display links grouped by external file."""
+        """
+        Insert one parent per external file (generator; yields after each row).
+        
+        Children are created when a group is expanded, see _on_group_open.
+        """
         for external_file, group in grouped_links.items():
             # Create parent node for external file
             file_icon = DataFormatter.get_link_type_icon('Formula')
@@ -215,56 +293,197 @@ class ExternalLinksDialog:
             parent_id = self.results_tree.insert("", "end", text=parent_text, 
                                                 values=("External File", "", ""))
             
-            # Add child nodes for each reference
-            for link in group.links:
-                child_text = f"📄 {link.source_workbook}"
-                location = f"{link.source_sheet}!{DataFormatter.format_cell_address(link.source_cell)}" if link.source_sheet else "LinkSource"
-                formula = DataFormatter.truncate_formula(link.formula, 80)
-                
-                self.results_tree.insert(parent_id, "end", text=child_text,
-                                       values=(link.link_type, location, formula),
-                                       tags=(link.source_workbook, link.source_sheet, link.source_cell))
+            # Placeholder child so the group shows an expand button
+            if group.links:
+                self.results_tree.insert(parent_id, "end", text="Loading...")
+                self._lazy_groups[parent_id] = [group.links, 0]
+            yield
     
-    def _display_flat_links(self, external_links):
-        """Display links in flat list format."""
-        for link in external_links:
-            text = f"{DataFormatter.get_link_type_icon(link.link_type)} {link.source_workbook}"
+    def _on_group_open(self, event=None):
+        """Create the first page of children when a group is expanded."""
+        parent_id = self.results_tree.focus()
+        entry = self._lazy_groups.get(parent_id)
+        if entry is None or entry[1]:
+            return
+        # Remove the placeholder
+        self.results_tree.delete(*self.results_tree.get_children(parent_id))
+        self._load_group_page(parent_id)
+    
+    def _load_group_page(self, parent_id):
+        """Append the next page of child rows to a group, plus a "load more" row if needed."""
+        links, loaded = self._lazy_groups[parent_id]
+        end = min(loaded + GROUP_PAGE_SIZE, len(links))
+        
+        # Add child nodes for each reference
+        for link in links[loaded:end]:
+            child_text = f"📄 {link.source_workbook}"
             location = f"{link.source_sheet}!{DataFormatter.format_cell_address(link.source_cell)}" if link.source_sheet else "LinkSource"
             formula = DataFormatter.truncate_formula(link.formula, 80)
             
-            self.results_tree.insert("", "end", text=text,
-                                   values=(link.target_file, location, formula),
+            self.results_tree.insert(parent_id, "end", text=child_text,
+                                   values=(link.link_type, location, formula),
                                    tags=(link.source_workbook, link.source_sheet, link.source_cell))
+        self._lazy_groups[parent_id][1] = end
+        
+        if end < len(links):
+            more_id = self.results_tree.insert(
+                parent_id, "end", text=f"⋯ Load more ({len(links) - end} remaining)",
+                values=("", "Double-click to load", ""))
+            self._load_more_items[more_id] = parent_id
+    
+    def _clear_results_tree(self):
+        """Remove all grouped rows and their lazy-loading state."""
+        self.results_tree.delete(*self.results_tree.get_children())
+        self._lazy_groups = {}
+        self._load_more_items = {}
+    
+    def _display_flat_links(self, external_links):
+        """
+        Show links in the flat virtual list; rows are formatted only when visible.
+        
+        Columns become sortable when the query worker delivers their keys,
+        see _apply_sort_keys.
+        """
+        def row(index):
+            link = external_links[index]
+            text = f"{DataFormatter.get_link_type_icon(link.link_type)} {link.source_workbook}"
+            location = f"{link.source_sheet}!{DataFormatter.format_cell_address(link.source_cell)}" if link.source_sheet else "LinkSource"
+            formula = DataFormatter.truncate_formula(link.formula, 80)
+            return text, (link.target_file, location, formula), (link.source_workbook, link.source_sheet, link.source_cell)
+        
+        self.flat_view.set_rows(len(external_links), row)
+    
+    def _apply_sort_keys(self, generation, sort_keys):
+        """Make the flat list sortable with keys computed by the query worker (UI thread)."""
+        if generation == self._search_generation and self.dialog:
+            self.flat_view.set_sort_keys(sort_keys)
+    
+    def _show_results_view(self, grouped):
+        """Show the grouped tree or the flat virtual list."""
+        if grouped:
+            self.flat_view.grid_remove()
+            self.grouped_frame.grid()
+        else:
+            self.grouped_frame.grid_remove()
+            self.flat_view.grid()
+    
+    def _on_search_changed(self, *args):
+        """Schedule a search after the user stops typing."""
+        if not self.dialog:
+            return
+        if self._debounce_id is not None:
+            self.dialog.after_cancel(self._debounce_id)
+        self._debounce_id = self.dialog.after(SEARCH_DEBOUNCE_MS, self._search_links)
+    
+    def _cancel_pending_search(self):
+        """Cancel a debounced search that has not started yet."""
+        if self._debounce_id is not None and self.dialog:
+            self.dialog.after_cancel(self._debounce_id)
+        self._debounce_id = None
     
     def _search_links(self):
         """Search for external links containing the keyword."""
-        keyword = self.search_var.get().strip()
-        search_field = self.search_field_var.get()
+        self._cancel_pending_search()
+        self._run_query(self.search_var.get().strip(), self.search_field_var.get())
+    
+    def _run_query(self, keyword, search_field):
+        """
+        Hand a search to the query worker and stream its results into the tree.
         
-        if not keyword:
-            self._display_all_links()
+        Every query takes a new generation number. The worker runs only the
+        latest request; a query that is superseded while running stops inside
+        the index lookup, and rows still being inserted for it are discarded.
+        
+        Args:
+            keyword: Search keyword (empty shows all links)
+            search_field: Field to search in
+        """
+        self._search_generation += 1
+        self._query_request = (self._search_generation, keyword, search_field,
+                               self.display_mode_var.get() == "grouped")
+        if self._query_thread is None:
+            self._query_thread = threading.Thread(target=self._query_loop, daemon=True)
+            self._query_thread.start()
+        self._query_ready.set()
+    
+    def _query_loop(self):
+        """Run queued searches one at a time until the dialog closes (query worker thread)."""
+        worker = threading.current_thread()
+        while True:
+            self._query_ready.wait()
+            if self._query_thread is not worker:
+                return
+            self._query_ready.clear()
+            request, self._query_request = self._query_request, None
+            if request is None:
+                continue
+            generation, keyword, search_field, grouped = request
+            
+            def is_cancelled():
+                return generation != self._search_generation or not self.dialog
+            
+            try:
+                if grouped:
+                    results = self.links_manager.get_grouped_search_results(keyword, search_field, is_cancelled)
+                    results_count = sum(group.reference_count for group in results.values())
+                else:
+                    results = self.links_manager.search_links(keyword, search_field, is_cancelled)
+                    results_count = len(results)
+                dialog = self.dialog
+                if not dialog or is_cancelled():
+                    continue
+                dialog.after(0, lambda request=request, results=results, count=results_count:
+                             self._show_query_results(*request, results, count))
+                
+                # Sort keys come after the rows, so showing results is not delayed
+                if not grouped:
+                    sort_keys = _flat_sort_keys(results, is_cancelled)
+                    dialog = self.dialog
+                    if dialog and not is_cancelled():
+                        dialog.after(0, lambda generation=generation, keys=sort_keys:
+                                     self._apply_sort_keys(generation, keys))
+            except SearchCancelled:
+                continue
+            except Exception as e:
+                dialog = self.dialog
+                if dialog:
+                    message = f"Search failed: {str(e)}"
+                    dialog.after(0, lambda message=message: self._show_error(message))
+    
+    def _show_query_results(self, generation, keyword, search_field, grouped, results, results_count):
+        """Replace the tree contents with query results (UI thread)."""
+        if generation != self._search_generation or not self.dialog:
             return
         
         # Clear existing items
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-        
-        if self.display_mode_var.get() == "grouped":
-            # Get grouped search results
-            grouped_results = self.links_manager.get_grouped_search_results(keyword, search_field)
-            self._display_grouped_links(grouped_results)
-            results_count = sum(group.reference_count for group in grouped_results.values())
-        else:
-            # Get flat search results
-            matching_links = self.links_manager.search_links(keyword, search_field)
-            self._display_flat_links(matching_links)
-            results_count = len(matching_links)
+        self._clear_results_tree()
+        self.flat_view.clear()
+        self._show_results_view(grouped)
+        
+        if keyword:
+            self.status_label.config(text=f"Search '{keyword}' in {search_field}: found {results_count} matching links")
         
-        self.status_label.config(text=f"Search '{keyword}' in {search_field}: found {results_count} matching links")
+        if grouped:
+            self._stream_rows(generation, self._display_grouped_links(results))
+        else:
+            self._display_flat_links(results)
+    
+    def _stream_rows(self, generation, inserts):
+        """Insert tree rows in time-bounded batches until done or superseded."""
+        if generation != self._search_generation or not self.dialog:
+            return
+        deadline = time.perf_counter() + INSERT_SLICE_SECONDS
+        for _ in inserts:
+            if generation != self._search_generation:
+                return
+            if time.perf_counter() >= deadline:
+                self.dialog.after(1, lambda: self._stream_rows(generation, inserts))
+                return
     
     def _clear_search(self):
         """Clear search and show all links."""
         self.search_var.set("")
+        self._cancel_pending_search()
         self._display_all_links()
         
         statistics = self.links_manager.get_statistics()
@@ -280,11 +499,19 @@ class ExternalLinksDialog:
     
     def _on_result_double_click(self, event):
         """Handle double-click on result item."""
-        selection = self.results_tree.selection()
+        tree = event.widget
+        selection = tree.selection()
         if not selection:
             return
         
-        item = self.results_tree.item(selection[0])
+        # "Load more" row in a grouped result
+        parent_id = self._load_more_items.pop(selection[0], None)
+        if parent_id is not None:
+            self.results_tree.delete(selection[0])
+            self._load_group_page(parent_id)
+            return "break"
+        
+        item = tree.item(selection[0])
         tags = item.get('tags', [])
         
         if len(tags) >= 3:
@@ -305,49 +532,58 @@ class ExternalLinksDialog:
             messagebox.showerror("Navigation Error", message)
     
     def _export_results(self):
-        """Export search results to file."""
+        """Export search results to file (streamed on a background thread)."""
         try:
             file_path = filedialog.asksaveasfilename(
                 title="Export External Links Results",
                 defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+                filetypes=[("CSV files", "*.csv"), ("Compressed CSV files", "*.csv.gz"),
+                           ("NDJSON files", "*.ndjson"), ("Excel files", "*.xlsx"),
+                           ("All files", "*.*")]
             )
             
             if file_path:
                 # Get current search results or all data
                 keyword = self.search_var.get().strip()
-                if keyword:
-                    search_field = self.search_field_var.get()
-                    if self.display_mode_var.get() == "grouped":
-                        grouped_results = self.links_manager.get_grouped_search_results(keyword, search_field)
-                        success, message = ExternalLinksExporter.export_grouped_to_csv(grouped_results, file_path)
-                    else:
-                        matching_links = self.links_manager.search_links(keyword, search_field)
-                        export_data = [
-                            {
-                                'Source Workbook': link.source_workbook,
-                                'Source Sheet': link.source_sheet,
-                                'Source Cell': link.source_cell,
-                                'External File': link.target_file,
-                                'Formula': link.formula,
-                                'Link Type': link.link_type
-                            }
-                            for link in matching_links
-                        ]
-                        success, message = ExternalLinksExporter.export_to_csv(export_data, file_path)
-                else:
-                    # Export all data
-                    export_data = self.links_manager.export_to_dict()
-                    success, message = ExternalLinksExporter.export_to_csv(export_data, file_path)
+                search_field = self.search_field_var.get()
+                grouped = bool(keyword) and self.display_mode_var.get() == "grouped"
                 
-                if success:
-                    messagebox.showinfo("Export Success", message)
-                else:
-                    messagebox.showerror("Export Error", message)
+                self.status_label.config(text=f"Exporting to {file_path}...")
+                self.progress.start()
+                
+                def progress(written, total):
+                    text = f"Exporting: {written:,} of {total:,} rows" if total else f"Exporting: {written:,} rows"
+                    if self.dialog:
+                        self.dialog.after(0, lambda: self.status_label.config(text=text))
+                
+                def export_thread():
+                    try:
+                        if grouped:
+                            grouped_results = self.links_manager.get_grouped_search_results(keyword, search_field)
+                            result = ExternalLinksExporter.export_grouped(grouped_results, file_path, progress)
+                        else:
+                            # Stream straight from the link store (or a view of it)
+                            links = self.links_manager.search_links(keyword, search_field)
+                            result = ExternalLinksExporter.export_links(links, file_path, progress_callback=progress)
+                    except Exception as e:
+                        result = (False, f"Export failed:\n{str(e)}")
+                    if self.dialog:
+                        self.dialog.after(0, lambda: self._export_finished(*result))
+                
+                threading.Thread(target=export_thread, daemon=True).start()
         
         except Exception as e:
             messagebox.showerror("Export Error", f"Export failed:\n{str(e)}")
     
+    def _export_finished(self, success, message):
+        """Report the result of a background export."""
+        self.progress.stop()
+        self.status_label.config(text=message.splitlines()[0] if message else "")
+        if success:
+            messagebox.showinfo("Export Success", message)
+        else:
+            messagebox.showerror("Export Error", message)
+    
     def _show_batch_update(self):
         """Show batch update dialog."""
         messagebox.showinfo("Batch Update", "Batch update functionality will be available in the next version")
@@ -368,5 +604,10 @@ class ExternalLinksDialog:
     def _on_close(self):
         """Handle dialog close event."""
         if self.dialog:
+            self._cancel_pending_search()
+            self._search_generation += 1
             self.dialog.destroy()
-            self.dialog = None
\ No newline at end of file
+            self.dialog = None
+            # Stop the query worker
+            self._query_thread = None
+            self._query_ready.set()
\ No newline at end of file
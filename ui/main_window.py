@@ -19,6 +19,7 @@ from ui.performance_dialog import PerformanceDialog
 
 # Import core components
 from core.session_manager import SessionManager
+from core.session_store import load_session_file
 from core.excel_manager import ExcelManager
 from core.process_manager import ProcessManager
 
@@ -77,6 +78,7 @@ class MainWindow:
         """Initialize application variables."""
         self.last_log_dir = settings.log_directory
         self.is_mini = False
+        self._refresh_generation = 0
         self.normal_geometry = settings.get("ui.window.normal_geometry", NORMAL_GEOMETRY)
         self.mini_side = settings.mini_widget_size
         self.mini_geometry = f"{self.mini_side}x{self.mini_side}+{settings.mini_widget_position}"
@@ -243,6 +245,11 @@ class MainWindow:
             font=("Arial", 10)
         )
         console_cb.pack(side=tk.RIGHT)
+        
+        # Refresh status; the list is read on a background thread while Excel may be busy
+        self.status_var = tk.StringVar()
+        status_label = tk.Label(self.bottom_frame, textvariable=self.status_var, font=("Arial", 10), fg="blue")
+        status_label.pack(side=tk.LEFT, padx=(10, 0))
     
     def _initial_refresh(self):
         """Perform initial refresh of the file list."""
@@ -271,9 +278,9 @@ class MainWindow:
             print(f"Error updating font: {e}")
     
     # Delegate methods to managers
-    def get_open_excel_files(self):
+    def get_open_excel_files(self, timeout=None):
         """Get open Excel files using ExcelManager."""
-        return self.excel_manager.get_open_workbooks()
+        return self.excel_manager.get_open_workbooks(timeout)
     
     def save_selected_workbooks(self):
         """Save selected workbooks using ExcelManager."""
@@ -392,13 +399,33 @@ class MainWindow:
     
     # UI helper methods
     def show_names(self):
-        """Refresh the file list display."""
+        """
+        Refresh the file list display.
+        
+        The workbook list is read on a background thread, because the COM
+        worker may be busy with a long job (loading a session, updating
+        links); the tree is filled in when the newest refresh returns.
+        """
+        self._refresh_generation += 1
+        generation = self._refresh_generation
+        self.status_var.set("Refreshing...")
+        
+        def thread_job():
+            file_list, sheet_list, cell_list, path_list = self.get_open_excel_files()
+            workbook_details = self.excel_manager.get_workbook_details(file_list, sheet_list, cell_list, path_list)
+            self.root.after(0, lambda: self._show_workbook_details(generation, workbook_details))
+            
+        threading.Thread(target=thread_job, daemon=True).start()
+    
+    def _show_workbook_details(self, generation, workbook_details):
+        """Fill the file list with the result of a refresh (UI thread)."""
+        if generation != self._refresh_generation:
+            # A newer refresh was started; its result will arrive later
+            return
+        self.status_var.set("")
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        file_list, sheet_list, cell_list, path_list = self.get_open_excel_files()
-        workbook_details = self.excel_manager.get_workbook_details(file_list, sheet_list, cell_list, path_list)
-        
         for name, path, sheet, cell, mtime_str in workbook_details:
             self.tree.insert("", "end", values=(name, mtime_str), tags=(name, path, sheet, cell))
         
@@ -503,20 +530,17 @@ class MainWindow:
     def load_session_from_path(self, path):
         """Load session from specific path."""
         try:
-            import openpyxl
-            wb = openpyxl.load_workbook(path)
-            ws = wb.active
+            session = load_session_file(path)
             
             # Display session contents in a simple dialog
             session_info = []
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row and row[0]:
-                    session_info.append(f"File: {row[0]}")
-                    if len(row) > 1 and row[1]:
-                        session_info.append(f"  Sheet: {row[1]}")
-                    if len(row) > 2 and row[2]:
-                        session_info.append(f"  Cell: {row[2]}")
-                    session_info.append("")
+            for entry in session.entries:
+                session_info.append(f"File: {entry.path}")
+                if entry.sheet:
+                    session_info.append(f"  Sheet: {entry.sheet}")
+                if entry.cell:
+                    session_info.append(f"  Cell: {entry.cell}")
+                session_info.append("")
             
             info_text = "\n".join(session_info[:20])  # Limit to first 20 lines
             if len(session_info) > 20:
@@ -5,14 +5,17 @@ This module provides utility functions for external links management,
 including Excel navigation, file operations, and data formatting.
 """
 
-import pythoncom
-import win32com.client
 import win32gui
 import win32con
-from typing import Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 import os
 import csv
+import gzip
+import json
 from datetime import datetime
+from core.com_worker import get_com_worker
+from core.workbook_index import find_open_workbook
+from utils.formula_tokenizer import tokenize_external_references
 
 
 class ExcelNavigator:
@@ -32,15 +35,19 @@ class ExcelNavigator:
             Tuple of (success, message)
         """
         try:
-            pythoncom.CoInitialize()
-            excel = win32com.client.Dispatch("Excel.Application")
-            
+            return get_com_worker().call(
+                ExcelNavigator._navigate_impl, workbook_name, sheet_name, cell_address,
+                operation="navigate_to_cell"
+            )
+        except Exception as e:
+            return False, f"Excel navigation error: {str(e)}"
+    
+    @staticmethod
+    def _navigate_impl(excel, workbook_name: str, sheet_name: str, cell_address: str) -> Tuple[bool, str]:
+        """Navigate to a cell (runs on the COM worker thread)."""
+        try:
             # Find the workbook
-            workbook = None
-            for wb in excel.Workbooks:
-                if wb.Name == workbook_name:
-                    workbook = wb
-                    break
+            workbook = find_open_workbook(excel, workbook_name)
             
             if not workbook:
                 return False, f"Workbook '{workbook_name}' not found"
@@ -81,13 +88,215 @@ class ExcelNavigator:
                 
         except Exception as e:
             return False, f"Excel navigation error: {str(e)}"
-        finally:
-            pythoncom.CoUninitialize()
+
+
+# Export formats by file name suffix (longest suffix first)
+EXPORT_FORMATS = (
+    ('.csv.gz', 'csv.gz'),
+    ('.gz', 'csv.gz'),
+    ('.ndjson', 'ndjson'),
+    ('.jsonl', 'ndjson'),
+    ('.xlsx', 'xlsx'),
+    ('.csv', 'csv'),
+)
+
+# Columns of a flat link export
+LINK_EXPORT_COLUMNS = ['Source Workbook', 'Source Sheet', 'Source Cell', 'External File', 'Formula', 'Link Type']
+
+# Columns of a grouped link export
+GROUPED_EXPORT_COLUMNS = [
+    'External File', 'Reference Count', 'Source Workbook',
+    'Source Sheet', 'Source Cell', 'Formula', 'Link Type'
+]
+
+# Rows written between progress callbacks
+EXPORT_PROGRESS_INTERVAL = 10000
 
 
 class ExternalLinksExporter:
     """Utility class for exporting external links data."""
     
+    @staticmethod
+    def export_format(file_path: str) -> str:
+        """
+        Get the export format for a file name.
+        
+        Args:
+            file_path: Output file path
+            
+        Returns:
+            'csv', 'csv.gz', 'ndjson' or 'xlsx' (CSV for unknown suffixes)
+        """
+        lower_path = file_path.lower()
+        for suffix, export_format in EXPORT_FORMATS:
+            if lower_path.endswith(suffix):
+                return export_format
+        return 'csv'
+    
+    @staticmethod
+    def iter_link_rows(links: Iterable, scan_time: Optional[str] = None) -> Iterator[Tuple]:
+        """
+        Yield flat export rows, one per link, in LINK_EXPORT_COLUMNS order.
+        
+        Args:
+            links: ExternalLink records (a LinkStore or view streams without copying)
+            scan_time: Optional scan time appended to every row
+        """
+        for link in links:
+            row = (link.source_workbook, link.source_sheet, link.source_cell,
+                   link.target_file, link.formula, link.link_type)
+            yield row + (scan_time,) if scan_time else row
+    
+    @staticmethod
+    def iter_grouped_rows(grouped_data: Dict, records: bool = False) -> Iterator[Tuple]:
+        """
+        Yield grouped export rows in GROUPED_EXPORT_COLUMNS order.
+        
+        In the report layout (CSV) the file name and count are only shown on
+        the first row of each group, and groups are separated by an empty
+        row. In the record layout (NDJSON, xlsx) every row is a complete
+        record: each carries its file name and count, and there are no
+        separator rows.
+        
+        Args:
+            grouped_data: Dictionary of ExternalFileGroup objects
+            records: Use the record layout
+        """
+        separator = ('',) * len(GROUPED_EXPORT_COLUMNS)
+        for external_file, group in grouped_data.items():
+            for i, link in enumerate(group.links):
+                first = records or i == 0
+                yield (
+                    external_file if first else '',  # Report layout: filename on first row only
+                    group.reference_count if first else '',
+                    link.source_workbook,
+                    link.source_sheet,
+                    link.source_cell,
+                    link.formula,
+                    link.link_type
+                )
+            
+            # Add empty row between groups
+            if not records and len(grouped_data) > 1:
+                yield separator
+    
+    @staticmethod
+    def export_rows(rows: Iterable[Sequence], columns: Sequence[str], file_path: str,
+                    total: Optional[int] = None,
+                    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Tuple[bool, str]:
+        """
+        Stream rows to a CSV, gzip CSV, NDJSON or write-only xlsx file.
+        
+        Rows are written as they are produced, so memory use does not depend
+        on the number of rows. The format follows the file suffix.
+        
+        Args:
+            rows: Row sequences in column order
+            columns: Column names
+            file_path: Output file path
+            total: Optional expected row count, passed to the progress callback
+            progress_callback: Optional function called with (rows_written, total)
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        export_format = ExternalLinksExporter.export_format(file_path)
+        written = 0
+        
+        def report():
+            if progress_callback:
+                progress_callback(written, total)
+        
+        try:
+            if export_format == 'xlsx':
+                from openpyxl import Workbook
+                workbook = Workbook(write_only=True)
+                worksheet = workbook.create_sheet("External Links")
+                worksheet.append(list(columns))
+                for row in rows:
+                    worksheet.append(list(row))
+                    written += 1
+                    if written % EXPORT_PROGRESS_INTERVAL == 0:
+                        report()
+                workbook.save(file_path)
+            else:
+                if export_format == 'csv.gz':
+                    output = gzip.open(file_path, 'wt', newline='', encoding='utf-8')
+                else:
+                    encoding = 'utf-8-sig' if export_format == 'csv' else 'utf-8'
+                    output = open(file_path, 'w', newline='', encoding=encoding)
+                with output:
+                    if export_format == 'ndjson':
+                        for row in rows:
+                            output.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                            output.write('\n')
+                            written += 1
+                            if written % EXPORT_PROGRESS_INTERVAL == 0:
+                                report()
+                    else:
+                        writer = csv.writer(output)
+                        writer.writerow(columns)
+                        for row in rows:
+                            writer.writerow(row)
+                            written += 1
+                            if written % EXPORT_PROGRESS_INTERVAL == 0:
+                                report()
+            
+            report()
+            return True, f"{written} rows exported successfully to {file_path}"
+            
+        except Exception as e:
+            return False, f"Export failed: {str(e)}"
+    
+    @staticmethod
+    def export_links(links: Sequence, file_path: str, include_timestamp: bool = True,
+                     progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Tuple[bool, str]:
+        """
+        Stream external links to a file, one row per link.
+        
+        Args:
+            links: ExternalLink records (LinkStore, view or list)
+            file_path: Output file path (.csv, .csv.gz, .ndjson or .xlsx)
+            include_timestamp: Whether to include scan timestamp
+            progress_callback: Optional function called with (rows_written, total)
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        if not len(links):
+            return False, "No data to export"
+        columns = list(LINK_EXPORT_COLUMNS)
+        scan_time = None
+        if include_timestamp:
+            columns.append('Scan Time')
+            scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = ExternalLinksExporter.iter_link_rows(links, scan_time)
+        return ExternalLinksExporter.export_rows(rows, columns, file_path, len(links), progress_callback)
+    
+    @staticmethod
+    def export_grouped(grouped_data: dict, file_path: str,
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Tuple[bool, str]:
+        """
+        Stream grouped external links to a file.
+        
+        CSV files use the grouped report layout; NDJSON and xlsx files get
+        one complete record per link (see iter_grouped_rows).
+        
+        Args:
+            grouped_data: Dictionary of ExternalFileGroup objects
+            file_path: Output file path (.csv, .csv.gz, .ndjson or .xlsx)
+            progress_callback: Optional function called with (rows_written, total)
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        records = ExternalLinksExporter.export_format(file_path) in ('ndjson', 'xlsx')
+        total = sum(group.reference_count for group in grouped_data.values())
+        if not records and len(grouped_data) > 1:
+            total += len(grouped_data)
+        rows = ExternalLinksExporter.iter_grouped_rows(grouped_data, records)
+        return ExternalLinksExporter.export_rows(rows, GROUPED_EXPORT_COLUMNS, file_path, total, progress_callback)
+    
     @staticmethod
     def export_to_csv(data: list, file_path: str, include_timestamp: bool = True) -> Tuple[bool, str]:
         """
@@ -137,37 +346,8 @@ class ExternalLinksExporter:
         Returns:
             Tuple of (success, message)
         """
-        try:
-            with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                fieldnames = [
-                    'External File', 'Reference Count', 'Source Workbook', 
-                    'Source Sheet', 'Source Cell', 'Formula', 'Link Type'
-                ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                for external_file, group in grouped_data.items():
-                    for i, link in enumerate(group.links):
-                        writer.writerow({
-                            'External File': external_file if i == 0 else '',  # Only show filename on first row
-                            'Reference Count': group.reference_count if i == 0 else '',
-                            'Source Workbook': link.source_workbook,
-                            'Source Sheet': link.source_sheet,
-                            'Source Cell': link.source_cell,
-                            'Formula': link.formula,
-                            'Link Type': link.link_type
-                        })
-                    
-                    # Add empty row between groups
-                    if len(grouped_data) > 1:
-                        writer.writerow({field: '' for field in fieldnames})
-            
-            return True, f"Grouped data exported successfully to {file_path}"
-            
-        except Exception as e:
-            return False, f"Export failed: {str(e)}"
+        success, message = ExternalLinksExporter.export_grouped(grouped_data, file_path)
+        return success, f"Grouped data exported successfully to {file_path}" if success else message
 
 
 class FormulaAnalyzer:
@@ -184,23 +364,14 @@ class FormulaAnalyzer:
         Returns:
             List of external file references
         """
-        import re
-        
-        # Pattern to match external references like [filename.xlsx]SheetName!Range
-        pattern = r'\[([^\]]+\.xlsx?m?)\]([^!]*!)?([\w\$:]+)'
-        matches = re.findall(pattern, formula, re.IGNORECASE)
-        
         references = []
-        for match in matches:
-            filename = match[0]
-            sheet = match[1].rstrip('!') if match[1] else ''
-            range_ref = match[2] if match[2] else ''
-            
+        for ref in tokenize_external_references(formula):
             references.append({
-                'filename': filename,
-                'sheet': sheet,
-                'range': range_ref,
-                'full_reference': f"[{filename}]{sheet}!{range_ref}" if sheet else f"[{filename}]{range_ref}"
+                'filename': ref.filename,
+                'path': ref.path,
+                'sheet': ref.sheet,
+                'range': ref.range,
+                'full_reference': f"[{ref.filename}]{ref.sheet}!{ref.range}" if ref.sheet else f"[{ref.filename}]{ref.range}"
             })
         
         return references
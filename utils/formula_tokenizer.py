@@ -0,0 +1,160 @@
+"""
+Formula Tokenizer for External References
+
+This module finds external workbook references in Excel formulas with a
+single precompiled regular expression. One pass over the formula returns
+the file name, path, sheet and range of every reference, including quoted
+paths with spaces such as 'C:\\My Dir\\[a.xlsx]Sheet 1'!A1. String literals
+are consumed by the same pattern so text like "[a.xlsx]" is not reported.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+from typing import List, Tuple
+
+
+# Distinct formulas remembered by cached_external_files
+ANALYZER_CACHE_SIZE = 65536
+
+
+ExternalReference = namedtuple(
+    "ExternalReference", ["filename", "path", "sheet", "range", "book"]
+)
+ExternalReference.__doc__ = """External reference found in a formula.
+
+filename: Workbook file name (e.g., 'a.xlsx'), or the index for stored [n] references
+path: Directory part of the reference, if any
+sheet: Sheet name (empty for workbook-level names)
+range: Cell range, R1C1 reference or defined name
+book: Raw text between the brackets
+"""
+
+# Cell range, R1C1 reference, whole row/column, #REF! or defined name
+_RANGE = r"""(?:
+      [Rr](?:\[-?\d+\]|\d+)?[Cc](?:\[-?\d+\]|\d+)?(?::[Rr](?:\[-?\d+\]|\d+)?[Cc](?:\[-?\d+\]|\d+)?)?
+    | \$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?
+    | \$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}
+    | \$?\d+:\$?\d+
+    | \#REF!
+    | [A-Za-z_\\][\w.]*
+)"""
+
+# Workbook name inside brackets: file with an Excel extension, or a stored index
+_BOOK = r"""(?:(?:[^\]\['"]|'')+?\.[Xx][Ll][A-Za-z]{1,2}|\d+)"""
+
+# Characters that end an unquoted path or sheet name
+_STOP = r"""\s'"\[\]!(),;=+\-*/&^<>{}"""
+_STOP_CHARS = frozenset(' \t\r\n\'"[]!(),;=+-*/&^<>{}')
+
+# Every alternative starts with ", ' or [ so the regex engine can skip ahead
+# to those characters; an unquoted path before [book] is recovered afterwards.
+_EXTERNAL_REFERENCE_PATTERN = re.compile(rf"""
+      "[^"]*(?:""[^"]*)*"                                     # string literal (skipped)
+    | '(?P<qpath>[^'\[]*(?:''[^'\[]*)*)
+       \[(?P<qbook>{_BOOK})\]
+       (?P<qsheet>[^']*(?:''[^']*)*)'!(?P<qrange>{_RANGE})    # '[path\][book]sheet'!range
+    | '(?P<npath>(?:[^'\[]|'')*?[\\/])?(?P<nbook>[^'\[\\/]+?\.[Xx][Ll][A-Za-z]{{1,2}})'
+       !(?P<nrange>{_RANGE})                                  # 'path\book.xlsx'!name
+    | \[(?P<ubook>{_BOOK})\]
+       (?P<usheet>[^{_STOP}:]*)!(?P<urange>{_RANGE})          # [book]sheet!range
+""", re.VERBOSE)
+
+
+def _split_book(book: str):
+    """Split '[C:\\dir\\a.xlsx]'-style bracket text into (directory, filename)."""
+    cut = max(book.rfind('\\'), book.rfind('/'))
+    if cut < 0:
+        return '', book
+    return book[:cut + 1], book[cut + 1:]
+
+
+def _unquoted_path(formula: str, end: int) -> str:
+    """Return the unquoted path (e.g. C:\\dir\\) that ends right before [book]."""
+    if end == 0 or formula[end - 1] != '\\':
+        return ''
+    start = end - 1
+    while start > 0 and formula[start - 1] not in _STOP_CHARS:
+        start -= 1
+    path = formula[start:end]
+    if path.startswith('\\\\') or (path[1:3] == ':\\' and path[0].isalpha()):
+        return path
+    return ''
+
+
+def tokenize_external_references(formula: str) -> List[ExternalReference]:
+    """
+    Extract all external references from a formula in one pass.
+
+    Args:
+        formula: Excel formula string (A1 or R1C1 notation)
+
+    Returns:
+        List of ExternalReference tuples in formula order
+    """
+    # Every external reference form contains '!' and either '[' or a quote
+    if not formula or '!' not in formula or ('[' not in formula and "'" not in formula):
+        return []
+
+    references = []
+    for match in _EXTERNAL_REFERENCE_PATTERN.finditer(formula):
+        qpath, qbook, qsheet, qrange, npath, nbook, nrange, ubook, usheet, urange = match.groups()
+
+        if qbook is not None:
+            if "''" in match.group(0):
+                qpath, qbook, qsheet = (part.replace("''", "'") for part in (qpath, qbook, qsheet))
+            book_dir, filename = _split_book(qbook)
+            references.append(ExternalReference(filename, qpath + book_dir, qsheet, qrange, qbook))
+        elif nbook is not None:
+            path = npath.replace("''", "'") if npath else ''
+            references.append(ExternalReference(nbook, path, '', nrange, nbook))
+        elif ubook is not None:
+            book_dir, filename = _split_book(ubook)
+            path = _unquoted_path(formula, match.start()) + book_dir
+            references.append(ExternalReference(filename, path, usheet, urange, ubook))
+        # Otherwise the match was a string literal, which is skipped
+
+    return references
+
+
+def has_external_reference(formula: str) -> bool:
+    """
+    Check if a formula contains at least one external reference.
+
+    Args:
+        formula: Excel formula string
+
+    Returns:
+        True if an external reference was found
+    """
+    return bool(tokenize_external_references(formula))
+
+
+def external_files_in_formula(formula: str) -> List[str]:
+    """
+    Get the distinct external file names referenced by a formula.
+
+    Args:
+        formula: Excel formula string
+
+    Returns:
+        File names in order of first appearance
+    """
+    return list(dict.fromkeys(ref.filename for ref in tokenize_external_references(formula)))
+
+
+@lru_cache(maxsize=ANALYZER_CACHE_SIZE)
+def cached_external_files(formula: str) -> Tuple[str, ...]:
+    """
+    Memoized external_files_in_formula for repeated formula text.
+
+    Used with R1C1 text, where every copy of a filled-down formula is
+    identical. Hit counts are available from cached_external_files.cache_info().
+
+    Args:
+        formula: Excel formula string
+
+    Returns:
+        Tuple of distinct file names in order of first appearance
+    """
+    return tuple(external_files_in_formula(formula))